@@ -0,0 +1,87 @@
+"""
+Tracks parse time and peak memory of the MACSIM/XML parser over synthetic inputs (sequences x features x
+sub-alignments).
+
+    $ python -m benchmarks.parse --save baseline.json
+    $ python -m benchmarks.parse --compare baseline.json
+
+When comparing, the command exits with a non-zero status if any case got slower (or used more memory) than the
+allowed tolerance.
+"""
+
+import itertools
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import click
+
+from benchmarks.synthetic import write_macsim_xml
+from salon.command.parse import iter_triples
+
+SEQUENCES = (100, 1000, 5000)
+FEATURES = (0, 10)
+SUBALIGNMENTS = (1, 5)
+
+
+def run(filepath: str, repeat: int) -> dict:
+    """
+    Parses `filepath`, discarding the triples, and returns the best elapsed time (seconds) out of `repeat` runs and
+    the peak traced memory (KiB). Memory is traced in a separate run, so that tracing overhead does not skew timings.
+    """
+    elapsed, triples = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        triples = sum(1 for _ in iter_triples(filepath))
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    tracemalloc.start()
+    for _ in iter_triples(filepath):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"triples": triples, "seconds": elapsed, "peak_kib": peak // 1024}
+
+
+@click.command()
+@click.option("--save", type=click.Path(dir_okay=False), help="Write results to JSON file.")
+@click.option("--compare", type=click.Path(exists=True, dir_okay=False), help="Compare against JSON results file.")
+@click.option("--tolerance", default=0.25, help="Allowed relative regression when comparing.")
+@click.option("--repeat", "-r", default=3, help="Number of timed runs per case (best is reported).")
+def main(save: str, compare: str, tolerance: float, repeat: int):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'case':<24} {'triples':>10} {'seconds':>10} {'peak KiB':>10}")
+        for sequences, features, subalignments in itertools.product(SEQUENCES, FEATURES, SUBALIGNMENTS):
+            case = f"{sequences}x{features}x{subalignments}"
+            filepath = str(Path(tmp, f"{case}.xml"))
+            write_macsim_xml(filepath, sequences=sequences, features=features, subalignments=subalignments)
+            results[case] = result = run(filepath, repeat)
+            print(f"{case:<24} {result['triples']:>10} {result['seconds']:>10.3f} {result['peak_kib']:>10}")
+
+    if save:
+        with open(save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if compare:
+        with open(compare) as f:
+            baseline = json.load(f)
+
+        regressions = []
+        for case, result in results.items():
+            if case not in baseline:
+                continue
+            for metric in ("seconds", "peak_kib"):
+                if result[metric] > baseline[case][metric] * (1 + tolerance):
+                    regressions.append(f"{case}: {metric} {baseline[case][metric]} -> {result[metric]}")
+
+        if regressions:
+            print("Regressions found:", *regressions, sep="\n\t")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
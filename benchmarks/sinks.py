@@ -0,0 +1,46 @@
+"""
+Compares the throughput (triples per second) of the triple sinks used by ``saloncli parse``.
+
+    $ python -m benchmarks.sinks --sequences 5000
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import click
+
+from benchmarks.synthetic import write_macsim_xml
+from salon.command.parse import iter_triples
+from salon.sink import GraphSink, NTriplesSink
+
+
+@click.command()
+@click.option("--sequences", "-n", default=2000, help="Number of sequences.")
+@click.option("--features", "-f", default=5, help="Number of features per sequence.")
+@click.option("--repeat", "-r", default=3, help="Number of runs per sink (best is reported).")
+def main(sequences: int, features: int, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = str(Path(tmp, "synthetic.xml"))
+        write_macsim_xml(input_path, sequences=sequences, features=features)
+
+        sinks = {
+            "graph (turtle)": lambda: GraphSink(str(Path(tmp, "out.ttl")), format="turtle"),
+            "graph (nt)": lambda: GraphSink(str(Path(tmp, "out.graph.nt")), format="nt"),
+            "n-triples": lambda: NTriplesSink(str(Path(tmp, "out.nt"))),
+            "n-triples (gzip)": lambda: NTriplesSink(str(Path(tmp, "out.nt.gz"))),
+        }
+
+        print(f"{'sink':<20} {'triples':>10} {'seconds':>10} {'triples/s':>12}")
+        for name, factory in sinks.items():
+            best, count = float("inf"), 0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                with factory() as sink:
+                    count = sink.addN(iter_triples(input_path))
+                best = min(best, time.perf_counter() - start)
+            print(f"{name:<20} {count:>10} {best:>10.3f} {count / best:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
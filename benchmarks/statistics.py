@@ -0,0 +1,80 @@
+"""
+Tracks the time taken to compute alignment metrics (``saloncli parse --stats``) over synthetic alignments of growing
+size (sequences x columns), and to emit them as RDF triples.
+
+    $ python -m benchmarks.statistics
+    $ python -m benchmarks.statistics --save baseline.json
+    $ python -m benchmarks.statistics --compare baseline.json
+
+When comparing, the command exits with a non-zero status if any case got slower than the allowed tolerance.
+"""
+
+import json
+import sys
+import time
+
+import click
+
+from benchmarks.synthetic import random_alignment
+from salon.command.parse import statistics_triples
+from salon.statistics import AlignmentStatistics
+
+CASES = ((100, 500), (1000, 1000), (2000, 2000), (5000, 2000))
+
+
+def run(sequences: int, length: int, repeat: int) -> dict:
+    """
+    Returns the best elapsed time (seconds) out of `repeat` runs to compute the metrics of a synthetic alignment, and
+    to both compute and emit them as triples.
+    """
+    alignment = random_alignment(sequences, length=length)
+
+    compute, total, triples = float("inf"), float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        AlignmentStatistics(alignment)
+        compute = min(compute, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        triples = sum(1 for _ in statistics_triples(alignment))
+        total = min(total, time.perf_counter() - start)
+
+    return {"triples": triples, "seconds": compute, "total_seconds": total}
+
+
+@click.command()
+@click.option("--save", type=click.Path(dir_okay=False), help="Write results to JSON file.")
+@click.option("--compare", type=click.Path(exists=True, dir_okay=False), help="Compare against JSON results file.")
+@click.option("--tolerance", default=0.25, help="Allowed relative regression when comparing.")
+@click.option("--repeat", "-r", default=3, help="Number of timed runs per case (best is reported).")
+def main(save: str, compare: str, tolerance: float, repeat: int):
+    results = {}
+    print(f"{'case':<16} {'triples':>10} {'seconds':>10} {'total (s)':>10}")
+    for sequences, length in CASES:
+        case = f"{sequences}x{length}"
+        results[case] = result = run(sequences, length, repeat)
+        print(f"{case:<16} {result['triples']:>10} {result['seconds']:>10.3f} {result['total_seconds']:>10.3f}")
+
+    if save:
+        with open(save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if compare:
+        with open(compare) as f:
+            baseline = json.load(f)
+
+        regressions = []
+        for case, result in results.items():
+            if case not in baseline:
+                continue
+            for metric in ("seconds", "total_seconds"):
+                if result[metric] > baseline[case][metric] * (1 + tolerance):
+                    regressions.append(f"{case}: {metric} {baseline[case][metric]:.3f} -> {result[metric]:.3f}")
+
+        if regressions:
+            print("Regressions found:", *regressions, sep="\n\t")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import random
+
+import numpy as np
+
+from salon.alignment import Alignment
+
+RESIDUES = "ACDEFGHIKLMNPQRSTVWY"
+
+
+def write_macsim_xml(
+    filepath: str,
+    sequences: int,
+    features: int = 3,
+    subalignments: int = 1,
+    length: int = 200,
+    gap_ratio: float = 0.1,
+    seed: int = 0,
+) -> None:
+    """
+    Writes a synthetic alignment in MACSIM/XML format.
+
+    :param filepath: Output file path.
+    :param sequences: Number of sequences.
+    :param features: Number of features (``fitem``) per sequence.
+    :param subalignments: Number of ``aln-name`` elements.
+    :param length: Number of alignment columns.
+    :param gap_ratio: Probability of a gap in any position.
+    :param seed: Random seed.
+    """
+    rand = random.Random(seed)
+
+    with open(filepath, "w") as f:
+        f.write('<?xml version="1.0"?>\n<macsim>\n<alignment>\n')
+        for i in range(subalignments):
+            f.write(f"<aln-name>ref1/v1/synthetic_{i}</aln-name>\n")
+        f.write("<aln-score>0.00</aln-score>\n")
+
+        for i in range(sequences):
+            residues = "".join("-" if rand.random() < gap_ratio else rand.choice(RESIDUES) for _ in range(length))
+            f.write(f'<sequence seq-type="Protein">\n<seq-name>seq{i}</seq-name>\n<seq-info>\n')
+            f.write(f"<accession>{i:04x}</accession>\n<ftable>\n")
+            for j in range(features):
+                start = rand.randrange(1, length)
+                stop = min(length, start + rand.randrange(1, 20))
+                f.write(
+                    f"<fitem><ftype>STRUCT</ftype><fstart>{start}</fstart><fstop>{stop}</fstop>"
+                    f"<fcolor>3</fcolor><fscore>0.00</fscore><fnote>HELIX</fnote></fitem>\n"
+                )
+            f.write(f"</ftable>\n<length>{length}</length>\n</seq-info>\n")
+            f.write(f"<seq-data>{residues}\n</seq-data></sequence>\n")
+
+        f.write("</alignment>\n</macsim>\n")
+
+
+def write_fasta(filepath: str, sequences: int, length: int = 200, gap_ratio: float = 0.1, seed: int = 0) -> None:
+    """
+    Writes a synthetic alignment in FASTA format.
+    """
+    rand = random.Random(seed)
+
+    with open(filepath, "w") as f:
+        for i in range(sequences):
+            residues = "".join("-" if rand.random() < gap_ratio else rand.choice(RESIDUES) for _ in range(length))
+            f.write(f">seq{i}\n")
+            for j in range(0, length, 60):
+                f.write(residues[j : j + 60] + "\n")
+
+
+def random_alignment(sequences: int, length: int = 200, gap_ratio: float = 0.1, seed: int = 0) -> Alignment:
+    """
+    Returns a synthetic alignment, built in memory (i.e., without going through any parser).
+    """
+    rand = np.random.default_rng(seed)
+
+    alphabet = np.frombuffer(RESIDUES.encode("ascii"), dtype=np.uint8)
+    residues = alphabet[rand.integers(len(alphabet), size=(sequences, length))]
+    residues[rand.random((sequences, length)) < gap_ratio] = ord("-")
+
+    alignment = Alignment("synthetic")
+    for i, row in enumerate(residues):
+        alignment.append(row.tobytes().decode("ascii"), name=f"seq{i}")
+    return alignment.close()
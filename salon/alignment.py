@@ -0,0 +1,291 @@
+import hashlib
+import re
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# characters denoting gaps in aligned sequences
+GAP_CHARACTERS = b"-."
+
+# padding of sequences shorter than the alignment (i.e., not part of the sequence)
+PADDING = 0
+
+# runs of gaps, as <residue position><gap character><length> (see `format_gap_runs`)
+_GAP_RUN = re.compile(r"(\d+)(\D)(\d+)")
+
+
+class Feature:
+    """
+    Sequence feature (e.g., secondary structure element) as annotated in the input alignment.
+    """
+
+    __slots__ = ("ftype", "fnote", "fstart", "fstop", "fscore")
+
+    def __init__(self, ftype: str, fnote: str, fstart: str, fstop: str, fscore: str):
+        self.ftype = ftype
+        self.fnote = fnote
+        self.fstart = fstart
+        self.fstop = fstop
+        self.fscore = fscore
+
+
+class SubAlignment:
+    """
+    Named subset of the sequences of an alignment. `name` identifies the sub-alignment (i.e., its URI) and `label` is
+    its human-readable name.
+    """
+
+    __slots__ = ("name", "label")
+
+    def __init__(self, name: str, label: str = None):
+        self.name = name
+        self.label = label or name
+
+
+class Sequence:
+    """
+    Metadata of an aligned sequence. Residues are kept by the alignment, in row `row` of its residue matrix.
+    """
+
+    __slots__ = ("name", "row", "seq_type", "accession", "definition", "organism", "features", "subalignments")
+
+    def __init__(
+        self,
+        name: str,
+        row: int,
+        seq_type: str = "Protein",
+        accession: str = None,
+        definition: str = None,
+        organism: str = None,
+        features: List[Feature] = None,
+        subalignments: Tuple[SubAlignment, ...] = (),
+    ):
+        self.name = name
+        self.row = row
+        self.seq_type = seq_type
+        self.accession = accession
+        self.definition = definition
+        self.organism = organism
+        self.features = features or []
+        self.subalignments = subalignments
+
+
+class Alignment:
+    """
+    Columnar in-memory multiple sequence alignment. Residues of every sequence are stored as ASCII codes in a 2-D
+    `uint8` matrix (one row per sequence, one column per alignment column), so that gap masks and per-column
+    statistics are computed with vectorized NumPy operations instead of per-residue Python objects. Rows shorter than
+    the alignment are padded with `PADDING`.
+
+    Alignments are built incrementally with `append` and `close`.
+    """
+
+    __slots__ = ("name", "gap", "sequences", "subalignments", "scores", "residues", "lengths", "_rows")
+
+    def __init__(self, name: str, gap: str = "-"):
+        self.name = name
+        self.gap = gap
+
+        self.sequences: List[Sequence] = []
+        self.subalignments: List[SubAlignment] = []
+        # alignment scores, as tuples of the sub-alignment they follow (if any) and score
+        self.scores: List[Tuple[Optional[SubAlignment], str]] = []
+
+        self.residues = np.zeros((0, 0), dtype=np.uint8)
+        self.lengths = np.zeros(0, dtype=np.int64)
+        self._rows: List[bytes] = []
+
+    def append(self, residues: str, **kwargs) -> Sequence:
+        """
+        Adds a sequence to the alignment. Residues are only moved into the residue matrix on `close`.
+
+        :param residues: Aligned sequence.
+        :param kwargs: Sequence metadata (see `Sequence`).
+        """
+        sequence = Sequence(row=len(self.sequences), **kwargs)
+        self.sequences.append(sequence)
+        self._rows.append(residues.encode("ascii"))
+        return sequence
+
+    def close(self) -> "Alignment":
+        """
+        Builds the residue matrix from the sequences appended so far.
+        """
+        rows = self._rows
+        self.lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+        self.residues = np.full((len(rows), int(self.lengths.max(initial=0))), PADDING, dtype=np.uint8)
+        for i, row in enumerate(rows):
+            self.residues[i, : len(row)] = np.frombuffer(row, dtype=np.uint8)
+        self._rows = []
+        return self
+
+    def __len__(self) -> int:
+        return len(self.sequences)
+
+    @property
+    def width(self) -> int:
+        """
+        Number of alignment columns.
+        """
+        return self.residues.shape[1]
+
+    def sequence(self, row: int) -> str:
+        """
+        Returns the aligned sequence in row `row` (with gaps).
+        """
+        return self.residues[row, : self.lengths[row]].tobytes().decode("ascii")
+
+    def ungapped(self, row: int) -> str:
+        """
+        Returns the sequence in row `row` without gaps.
+        """
+        residues = self.residues[row, : self.lengths[row]]
+        return residues[~self._is_gap(residues)].tobytes().decode("ascii")
+
+    def gap_runs(self, row: int) -> List[Tuple[int, str, int]]:
+        """
+        Returns the runs of consecutive (and equal) gap characters of the sequence in row `row`, so that it can be
+        rebuilt from its ungapped residues (see `insert_gaps`).
+
+        :return: List of tuples of the number of residues before each run, its gap character and length.
+        """
+        residues = self.residues[row, : self.lengths[row]]
+        gaps = self._is_gap(residues)
+        if not gaps.any():
+            return []
+
+        # runs break wherever gaps start or end, or the gap character changes
+        breaks = np.flatnonzero((gaps[1:] != gaps[:-1]) | (gaps[1:] & (residues[1:] != residues[:-1]))) + 1
+        starts = np.concatenate(([0], breaks))
+        lengths = np.diff(np.append(starts, len(residues)))
+        before = np.concatenate(([0], np.cumsum(~gaps)))[starts]
+
+        runs = gaps[starts]
+        return [
+            (int(position), chr(residues[start]), int(length))
+            for position, start, length in zip(before[runs], starts[runs], lengths[runs])
+        ]
+
+    def _is_gap(self, residues: np.ndarray) -> np.ndarray:
+        codes = np.frombuffer(GAP_CHARACTERS + self.gap.encode("ascii"), dtype=np.uint8)
+        return np.isin(residues, codes) | (residues == PADDING)
+
+    def gap_mask(self) -> np.ndarray:
+        """
+        Returns a boolean matrix, with the shape of the residue matrix, that is `True` at gaps (padding included).
+        """
+        return self._is_gap(self.residues)
+
+    def residue_mask(self) -> np.ndarray:
+        """
+        Returns a boolean matrix, with the shape of the residue matrix, that is `True` at residues.
+        """
+        return ~self.gap_mask()
+
+    def gap_fraction(self) -> np.ndarray:
+        """
+        Returns the fraction of sequences with a gap at each column.
+        """
+        if not len(self):
+            return np.zeros(self.width)
+        return self.gap_mask().mean(axis=0)
+
+    def column_counts(self, ignore_case: bool = True) -> Tuple[bytes, np.ndarray]:
+        """
+        Counts residues per column.
+
+        :param ignore_case: Whether lowercase and uppercase residues are counted together (as uppercase).
+        :return: Alphabet of residues found (one character per symbol) and matrix of counts, with one row per symbol in
+            the alphabet and one column per alignment column.
+        """
+        residues = self.residues
+        if ignore_case:
+            residues = np.where((residues >= ord("a")) & (residues <= ord("z")), residues - 32, residues)
+
+        symbols = np.unique(residues[self.residue_mask()]).astype(np.uint8)
+        counts = np.empty((len(symbols), self.width), dtype=np.int64)
+        for k, symbol in enumerate(symbols):
+            counts[k] = (residues == symbol).sum(axis=0)
+        return symbols.tobytes(), counts
+
+    def column_frequencies(self, ignore_case: bool = True) -> Tuple[bytes, np.ndarray]:
+        """
+        Returns the relative frequency of each residue per column, among non-gap positions (see `column_counts`).
+        """
+        symbols, counts = self.column_counts(ignore_case=ignore_case)
+        totals = counts.sum(axis=0)
+        return symbols, np.divide(counts, totals, out=np.zeros(counts.shape), where=totals > 0)
+
+    def consensus(self, ignore_case: bool = True) -> str:
+        """
+        Returns the most frequent residue of each column (gap if the column has no residues).
+        """
+        symbols, counts = self.column_counts(ignore_case=ignore_case)
+        if not symbols:
+            return self.gap * self.width
+
+        consensus = np.frombuffer(symbols, dtype=np.uint8)[counts.argmax(axis=0)]
+        consensus[counts.sum(axis=0) == 0] = ord(self.gap)
+        return consensus.tobytes().decode("ascii")
+
+    def residue_positions(self, row: int) -> np.ndarray:
+        """
+        Maps the columns of the alignment to (0-based) positions in the ungapped sequence of row `row`.
+
+        :return: Array with the residue position at each column (-1 at gaps).
+        """
+        residues = ~self._is_gap(self.residues[row])
+        positions = np.cumsum(residues) - 1
+        positions[~residues] = -1
+        return positions
+
+    def residue_columns(self, row: int) -> np.ndarray:
+        """
+        Maps the (0-based) positions of the ungapped sequence in row `row` to alignment columns.
+
+        :return: Array with the column of each residue.
+        """
+        return np.flatnonzero(~self._is_gap(self.residues[row]))
+
+    def rows(self, subalignment: SubAlignment = None) -> Iterable[int]:
+        """
+        Returns the rows of the sequences in a sub-alignment (every row if not given).
+        """
+        if subalignment is None:
+            return range(len(self))
+        return [sequence.row for sequence in self.sequences if subalignment in sequence.subalignments]
+
+
+def residues_digest(residues: str) -> str:
+    """
+    Returns the content hash of an ungapped sequence, which identifies it across alignments.
+    """
+    return hashlib.blake2b(residues.encode("ascii"), digest_size=16).hexdigest()
+
+
+def format_gap_runs(runs: Iterable[Tuple[int, str, int]]) -> str:
+    """
+    Encodes gap runs (see `Alignment.gap_runs`) as a compact string, e.g., `0-3,45.2` for three leading dashes and
+    two dots after the 45th residue.
+    """
+    return ",".join(f"{position}{gap}{length}" for position, gap, length in runs)
+
+
+def parse_gap_runs(runs: str) -> List[Tuple[int, str, int]]:
+    """
+    Decodes gap runs encoded by `format_gap_runs`.
+    """
+    return [(int(position), gap, int(length)) for position, gap, length in _GAP_RUN.findall(runs)]
+
+
+def insert_gaps(residues: str, runs: Iterable[Tuple[int, str, int]]) -> str:
+    """
+    Rebuilds an aligned sequence from its ungapped residues and gap runs (see `Alignment.gap_runs`).
+    """
+    parts, last = [], 0
+    for position, gap, length in runs:
+        parts.append(residues[last:position])
+        parts.append(gap * length)
+        last = position
+    parts.append(residues[last:])
+    return "".join(parts)
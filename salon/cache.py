@@ -0,0 +1,117 @@
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from salon.config import settings
+
+# maximum number of host parameters per SQLite statement
+_CHUNK_SIZE = 500
+
+
+class UniProtCache:
+    """
+    Persistent SQLite-backed cache for UniProt lookups, keyed by PDB identifier (``pdb:<id>``) or UniProt accession
+    (``uniprot:<accession>``). Entries expire after `ttl` seconds, and the least recently used ones are evicted
+    whenever the cache holds more than `max_entries`.
+    """
+
+    def __init__(self, path: str, ttl: float = 30 * 24 * 60 * 60, max_entries: int = 100000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self.connection.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Returns the cached value of every key found (and not expired) in the cache.
+        """
+        keys = list(dict.fromkeys(keys))
+        now = time.time()
+
+        found = {}
+        for i in range(0, len(keys), _CHUNK_SIZE):
+            chunk = keys[i : i + _CHUNK_SIZE]
+            rows = self.connection.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({','.join('?' * len(chunk))}) AND created >= ?",
+                (*chunk, now - self.ttl),
+            )
+            found.update((key, json.loads(value)) for key, value in rows)
+
+        if found:
+            self.connection.executemany("UPDATE entries SET accessed = ? WHERE key = ?", ((now, k) for k in found))
+            self.connection.commit()
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, Any]) -> None:
+        """
+        Stores every key-value pair in `items`, evicting old entries if needed.
+        """
+        now = time.time()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO entries (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+            ((key, json.dumps(value), now, now) for key, value in items.items()),
+        )
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes expired entries, and least recently used ones above `max_entries`.
+        """
+        self.connection.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,))
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > self.max_entries:
+            self.connection.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,),
+            )
+        self.connection.commit()
+
+    @property
+    def stats(self) -> str:
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.0%} hit rate)"
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+@contextmanager
+def open_uniprot_cache(enabled: bool = True) -> Iterator[Optional[UniProtCache]]:
+    """
+    Opens the UniProt cache configured in settings, or yields `None` if disabled.
+    """
+    if not enabled:
+        yield None
+        return
+
+    cache = UniProtCache(
+        settings.UNIPROT_CACHE_PATH,
+        ttl=settings.UNIPROT_CACHE_TTL,
+        max_entries=settings.UNIPROT_CACHE_MAX_ENTRIES,
+    )
+    with cache:
+        yield cache
@@ -1,18 +1,26 @@
 import click
 
-from salon.command import enrich, header, load, parse
+from salon.client import main
+from salon.command import enrich, features, header, load, parse, serve
 
 
 @click.group()
 def entry_point():
+    """
+    Commands can be run on a `saloncli serve` service instead, by giving its address (e.g., http://127.0.0.1:8421 or
+    unix:///tmp/salon.sock) as leading --server option or in the SALON_SERVER environment variable.
+    """
     pass
 
 
+entry_point.add_command(load.compile_ontology)
 entry_point.add_command(load.init)
 entry_point.add_command(load.load)
 entry_point.add_command(enrich.enrich)
 entry_point.add_command(header.header)
 entry_point.add_command(parse.parse)
+entry_point.add_command(features.features)
+entry_point.add_command(serve.serve)
 
 if __name__ == "__main__":
-    entry_point()
+    main()
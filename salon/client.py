@@ -0,0 +1,101 @@
+import http.client
+import json
+import os
+import socket
+import sys
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# address of a running `saloncli serve` service, e.g., http://127.0.0.1:8421 or unix:///tmp/salon.sock
+SERVER_ENV = "SALON_SERVER"
+
+# token of the service, if it requires one (see `saloncli serve --token`)
+TOKEN_ENV = "SALON_TOKEN"
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def _connection(server: str, timeout: float = None) -> http.client.HTTPConnection:
+    url = urlsplit(server)
+    if url.scheme == "unix":
+        return _UnixHTTPConnection(url.path, timeout=timeout)
+    if url.scheme == "https":
+        return http.client.HTTPSConnection(url.netloc, timeout=timeout)
+    return http.client.HTTPConnection(url.netloc, timeout=timeout)
+
+
+def request(server: str, method: str, path: str, body: dict = None, timeout: float = None) -> dict:
+    """
+    Sends a request to a `saloncli serve` service and returns its JSON response.
+    """
+    connection = _connection(server, timeout=timeout)
+    headers = {"Content-Type": "application/json"}
+    if os.environ.get(TOKEN_ENV):
+        headers["Authorization"] = f"Bearer {os.environ[TOKEN_ENV]}"
+    try:
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        connection.request(method, path, body=payload, headers=headers)
+        response = connection.getresponse()
+        result = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(result.get("error", f"HTTP {response.status}"))
+        return result
+    finally:
+        connection.close()
+
+
+def run_remote(server: str, argv: List[str]) -> int:
+    """
+    Runs a command on a `saloncli serve` service, within the current working directory, and writes its output.
+
+    :return: Exit code of the command.
+    """
+    result = request(server, "POST", "/run", {"argv": argv, "cwd": os.getcwd()})
+    sys.stdout.write(result["stdout"])
+    sys.stderr.write(result["stderr"])
+    return result["exit_code"]
+
+
+def split_server(argv: List[str]) -> Tuple[Optional[str], List[str]]:
+    """
+    Returns the service address given as leading `--server` option (or in the `SALON_SERVER` environment variable),
+    and the remaining arguments.
+    """
+    if argv[:1] == ["--server"] and len(argv) > 1:
+        return argv[1], argv[2:]
+    if argv and argv[0].startswith("--server="):
+        return argv[0].split("=", 1)[1], argv[1:]
+    return os.environ.get(SERVER_ENV) or None, argv
+
+
+def main(argv: List[str] = None) -> None:
+    """
+    Entry point of `saloncli`. Commands are forwarded to a running service if one is given (see `split_server`),
+    without importing any of them (nor their dependencies), so that calls start in a few milliseconds; otherwise, they
+    are run in process.
+    """
+    server, argv = split_server(sys.argv[1:] if argv is None else argv)
+    if server and argv[:1] not in (["serve"], ["--help"], []):
+        try:
+            sys.exit(run_remote(server, argv))
+        except (OSError, RuntimeError) as e:
+            sys.stderr.write(f"Error: cannot run command on service at {server} ({e})\n")
+            sys.exit(1)
+
+    from salon.cli import entry_point
+
+    entry_point(args=argv, prog_name="saloncli")
+
+
+if __name__ == "__main__":
+    main()
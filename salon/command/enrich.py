@@ -1,109 +1,244 @@
+import asyncio
+import functools
+from typing import Dict, List, Optional
+
 import click
+from rdflib import RDF, RDFS, Literal, Namespace, URIRef
 
+from salon.cache import UniProtCache, open_uniprot_cache
 from salon.config import settings
-from salon.database.stardog import Stardog
-
-try:
-    import xml.etree.cElementTree as ET
-except ImportError:
-    import xml.etree.ElementTree as ET
+from salon.database.backends import open_repository
+from salon.database.queries import IRI, QueryTemplate, batches, is_iri
+from salon.database.repository import RDFRepository, gather_bounded
+from salon.database.uniprot import PDB_IRI, UniProt
+from salon.sink import nt_term
 
 
-@click.command()
-@click.option(
-    "--uri",
-    "-x",
-    help="Source URI to enhance (i.e., sequence).",
-)
-def enrich(uri: str):
+@functools.lru_cache(maxsize=None)
+def _accessions_template(uris: bool, alignment: bool, unenriched: bool, graph: bool) -> QueryTemplate:
     """
-    Adds information to sequences in the database following the ontology specification.
-    TODO: This function ONLY WORKS for *protein sequences*.
+    Returns the (compiled) query for the accession numbers of the selected protein sequences, i.e., those in `$uris`,
+    members of (sub-)alignment `$alignment` and/or not enriched yet. Sequences are only looked up in named graph
+    `$graph`, if given, while enrichments are looked up in the whole database.
     """
-    query = (
+    patterns = []
+    if uris:
+        patterns.append("VALUES ?seq { $uris }")
+    members = []
+    if alignment:
+        members.append("$alignment salon:hasSubAlignment?/salon:hasSequence ?seq .")
+    members.append("?seq a salon:ProteinAlignmentSequence .")
+    members.append("OPTIONAL { ?seq salon:accessionNumber ?ac }")
+    if graph:
+        members = ["GRAPH $graph { " + " ".join(members) + " }"]
+    patterns.extend(members)
+    if unenriched:
+        patterns.append("FILTER NOT EXISTS { ?seq salon:hasAssociationWith ?protein }")
+
+    return QueryTemplate(
         """
         PREFIX salon:<"""
         + settings.ONTOLOGY_IRI
         + """>
-        SELECT ?ac
+        SELECT ?seq ?ac
         WHERE {
-            <"""
-        + uri
-        + """> a salon:ProteinAlignmentSequence .
-            OPTIONAL{<"""
-        + uri
-        + """> salon:accessionNumber ?ac} .
+            """
+        + "\n            ".join(patterns)
+        + """
         }
     """
     )
 
-    management = Stardog(
-        endpoint=settings.STARDOG_ENDPOINT,
-        database=settings.STARDOG_DATABASE,
-        username=settings.STARDOG_USERNAME,
-        password=settings.STARDOG_PASSWORD,
-    )
-    res = management.query(query)
 
-    try:
-        # TODO: Only the first ocurrence?
-        bindings = res["results"]["bindings"][0]
-    except IndexError:
-        print(f"Accession number not found for sequence {uri}")
-        return
+def _accessions_query(
+    uris: List[str] = None, alignment: str = None, unenriched: bool = False, graph: str = None
+) -> str:
+    """
+    Returns the query for the accession numbers of the selected protein sequences (see `_accessions_template`).
+    """
+    template = _accessions_template(bool(uris), bool(alignment), unenriched, bool(graph))
+    return template.render(uris=uris or (), alignment=alignment or (), graph=graph or ())
 
-    # We _assume_ that the ac number is linked to the PDB identifier of the sequence's protein
-    pdb = bindings["ac"]
-    pdb_value = pdb.get("value")
 
-    if pdb_value:
-        query = (
-            """
-            PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-            PREFIX up:<http://purl.uniprot.org/core/>
-            PREFIX pdb:<http://rdf.wwpdb.org/pdb/>
-            PREFIX salon:<"""
-            + settings.ONTOLOGY_IRI
-            + """>
-            INSERT {
-                <"""
-            + uri
-            + """> salon:organism ?ncbi . 
-                <"""
-            + uri
-            + """> salon:hasAssociationWith ?protein_uri .
-                ?protein_uri a salon:Protein .
-                ?protein_uri salon:description ?protfullname .
-                ?protein_uri salon:keyword ?protmnemonic .
-                ?protein_uri salon:proteinName ?protfullname .
-                ?protein_uri rdfs:seeAlso ?organism .
-                ?protein_uri rdfs:seeAlso ?protein .
-                ?protein_uri rdfs:seeAlso ?pdb .
-            }
-            WHERE {
-                <"""
-            + uri
-            + """> rdf:type salon:ProteinAlignmentSequence .
-                SERVICE <http://sparql.uniprot.org/sparql> {
-                    BIND(pdb:"""
-            + pdb_value.upper()
-            + """ AS ?pdb) .
-                    ?protein a up:Protein;
-                             rdfs:seeAlso ?pdb ;
-                             up:recommendedName ?protname ;
-                             up:mnemonic ?protmnemonic ;
-                             up:organism ?organism .
-                    ?protname up:fullName ?protfullname .
-                    ?organism up:mnemonic ?orgmnemonic ;
-                              up:scientificName ?orgscientific .
-                    BIND(STRAFTER(STR(?protein), "http://purl.uniprot.org/uniprot/") AS ?ac) .
-                    BIND(STRAFTER(STR(?organism), "http://purl.uniprot.org/taxonomy/") AS ?ncbi)
-                    BIND(URI(CONCAT("salon:", STR(?ac))) AS ?protein_uri)
-                }
-            }
-        """
+def _enrichment_update(accessions: Dict[str, str], proteins: Dict[str, List[dict]]) -> Optional[str]:
+    """
+    Returns the update that enriches every sequence in `accessions` (mapping sequence URI to the PDB identifier of its
+    protein) given the UniProt records of each PDB identifier, or `None` if there is nothing to add.
+    """
+    namespace = Namespace(settings.ONTOLOGY_IRI)
+
+    triples = []
+    for uri, pdb_value in accessions.items():
+        seq_uri = URIRef(uri)
+        pdb_uri = URIRef(f"{PDB_IRI}{pdb_value.upper()}")
+        # accession numbers come from the input alignments, so they are checked before building IRIs out of them
+        if not is_iri(pdb_uri):
+            continue
+        for protein in proteins.get(pdb_value.upper(), []):
+            if not protein["name"]:
+                continue
+            protein_uri = URIRef(f"salon:{protein['accession']}")
+            triples += [
+                (seq_uri, namespace.organism, Literal(protein["organism_id"])),
+                (seq_uri, namespace.hasAssociationWith, protein_uri),
+                (protein_uri, RDF.type, namespace.Protein),
+                (protein_uri, namespace.description, Literal(protein["name"])),
+                (protein_uri, namespace.keyword, Literal(protein["mnemonic"])),
+                (protein_uri, namespace.proteinName, Literal(protein["name"])),
+                (protein_uri, RDFS.seeAlso, URIRef(protein["organism"])),
+                (protein_uri, RDFS.seeAlso, URIRef(protein["protein"])),
+                (protein_uri, RDFS.seeAlso, pdb_uri),
+            ]
+
+    if not triples:
+        return None
+    return "INSERT DATA { " + " .\n".join(" ".join(map(nt_term, triple)) for triple in triples) + " }"
+
+
+async def find_accessions(
+    management: RDFRepository,
+    uris: List[str] = None,
+    alignment: str = None,
+    unenriched: bool = False,
+    graph: str = None,
+    batch_size: int = 1000,
+    concurrency: int = 8,
+) -> Dict[str, Optional[str]]:
+    """
+    Fetches the accession numbers of every selected protein sequence (see `_accessions_query`), in a single query
+    per `batch_size` URIs (if any), with at most `concurrency` queries in flight at once.
+
+    :return: Mapping of sequence URI to accession number (`None` if not found).
+    """
+    uri_batches = batches(uris, batch_size) if uris else [None]
+    queries = [_accessions_query(batch, alignment, unenriched, graph) for batch in uri_batches]
+    results = await gather_bounded((management.aquery(query) for query in queries), concurrency=concurrency)
+
+    accessions = {}
+    for res in results:
+        for bindings in res["results"]["bindings"]:
+            uri = bindings["seq"]["value"]
+            # TODO: Only the first ocurrence?
+            if not accessions.get(uri):
+                accessions[uri] = bindings.get("ac", {}).get("value")
+    return accessions
+
+
+async def enrich_sequences(management: RDFRepository, uniprot: UniProt, accessions: Dict[str, str]) -> None:
+    """
+    Enriches a batch of protein sequences given their accession numbers. UniProt is only queried for PDB identifiers
+    not found in its client's cache.
+    """
+    proteins = await uniprot.proteins_by_pdb(accessions.values())
+
+    update = _enrichment_update(accessions, proteins)
+    if update:
+        await management.aupdate(update)
+
+
+async def _enrich(
+    uris: List[str],
+    alignment: str,
+    graph: str,
+    unenriched: bool,
+    batch_size: int,
+    concurrency: int,
+    cache: UniProtCache,
+) -> Dict[str, Optional[str]]:
+    async with UniProt(
+        settings.UNIPROT_ENDPOINT, cache=cache, timeout=settings.HTTP_TIMEOUT
+    ) as uniprot, open_repository() as management:
+        accessions = await find_accessions(management, uris, alignment, unenriched, graph, concurrency=concurrency)
+
+        # We _assume_ that the ac number is linked to the PDB identifier of the sequence's protein
+        found = [(uri, ac) for uri, ac in accessions.items() if ac]
+        await gather_bounded(
+            (enrich_sequences(management, uniprot, dict(batch)) for batch in batches(found, batch_size)),
+            concurrency=concurrency,
         )
-        management.update(query)
+
+    return accessions
+
+
+@click.command()
+@click.option(
+    "--uri",
+    "-x",
+    type=IRI,
+    multiple=True,
+    help="Source URI to enhance (i.e., sequence). Can be given many times.",
+)
+@click.option(
+    "--uri-file",
+    type=click.File(),
+    help="File with one source URI per line.",
+)
+@click.option(
+    "--alignment",
+    "-a",
+    type=IRI,
+    help="Alignment (or sub-alignment) URI whose sequences will be enhanced.",
+)
+@click.option(
+    "--graph",
+    "-g",
+    type=IRI,
+    help="Named graph (i.e., alignment URI) the sequences are loaded into, to scope the query to.",
+)
+@click.option(
+    "--unenriched",
+    is_flag=True,
+    help="Enhance every sequence (of the alignment, if given) not enriched yet.",
+)
+@click.option(
+    "--batch-size",
+    "-b",
+    default=100,
+    show_default=True,
+    help="Maximum number of sequences per UniProt lookup.",
+)
+@click.option(
+    "--concurrency",
+    "-c",
+    default=settings.CONCURRENCY,
+    show_default=True,
+    help="Maximum number of requests in flight at once.",
+)
+@click.option("--cache/--no-cache", default=True, show_default=True, help="Use local cache for UniProt lookups.")
+def enrich(
+    uri: List[str],
+    uri_file,
+    alignment: str,
+    graph: str,
+    unenriched: bool,
+    batch_size: int,
+    concurrency: int,
+    cache: bool,
+):
+    """
+    Adds information to sequences in the database following the ontology specification.
+    TODO: This function ONLY WORKS for *protein sequences*.
+    """
+    uris = list(uri)
+    if uri_file:
+        uris.extend(line.strip() for line in uri_file if line.strip())
+    invalid = [value for value in uris if not is_iri(value)]
+    if invalid:
+        raise click.BadParameter(f"{invalid[0]!r} is not a valid IRI", param_hint="--uri-file")
+
+    if not (uris or alignment or unenriched):
+        raise click.UsageError("Either --uri, --uri-file, --alignment or --unenriched is required.")
+
+    with open_uniprot_cache(cache) as uniprot_cache:
+        accessions = asyncio.run(_enrich(uris, alignment, graph, unenriched, batch_size, concurrency, uniprot_cache))
+
+    for uri in uris:
+        if not accessions.get(uri):
+            print(f"Accession number not found for sequence {uri}")
+
+    print(f"Requested enrichment of {sum(1 for ac in accessions.values() if ac)} sequence(s)")
+    if uniprot_cache:
+        print(f"UniProt cache: {uniprot_cache.stats}")
 
 
 if __name__ == "__main__":
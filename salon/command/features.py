@@ -0,0 +1,75 @@
+from typing import Tuple
+
+import click
+
+from salon.config import settings
+from salon.intervals import FeatureIndex
+
+
+def _range(value: str) -> Tuple[int, int]:
+    first, _, last = value.partition("-")
+    return int(first), int(last or first)
+
+
+@click.command()
+@click.option(
+    "--index",
+    "-i",
+    "index_file",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Feature index written by `parse --index`.",
+)
+@click.option("--alignment", "-a", help="Alignment name (every alignment in the index if not given).")
+@click.option("--columns", help="Range of alignment columns (1-based, inclusive), e.g., 40-60.")
+@click.option("--type", "ftype", help="Feature type, e.g., STRUCT.")
+@click.option("--note", "fnote", help="Feature note, e.g., HELIX.")
+@click.option("--sequence", "-s", help="Sequence identifier, to translate coordinates with --column or --residue.")
+@click.option("--column", type=int, help="Alignment column to translate into a residue position of --sequence.")
+@click.option("--residue", type=int, help="Residue position of --sequence to translate into an alignment column.")
+def features(
+    index_file: str,
+    alignment: str,
+    columns: str,
+    ftype: str,
+    fnote: str,
+    sequence: str,
+    column: int,
+    residue: int,
+):
+    """
+    Finds the sequence features overlapping a range of alignment columns, or translates between alignment columns
+    and residue positions, from a local feature index.
+    """
+    index = FeatureIndex.load(index_file)
+    names = [alignment] if alignment else sorted(index.alignments)
+    for name in names:
+        if name not in index.alignments:
+            raise click.BadParameter(f"Alignment {name} not found in index", param_hint="--alignment")
+
+    if sequence:
+        for name in names:
+            maps = index[name].maps
+            if sequence not in maps:
+                continue
+            if column is not None:
+                click.echo(f"{name}\t{sequence}\tcolumn {column}\tresidue {maps[sequence].to_residue(column)}")
+            if residue is not None:
+                click.echo(f"{name}\t{sequence}\tresidue {residue}\tcolumn {maps[sequence].to_column(residue)}")
+        return
+
+    if not columns:
+        raise click.UsageError("Either --columns or --sequence is required.")
+
+    first, last = _range(columns)
+    for name in names:
+        for record in index[name].overlap(first, last, ftype=ftype, fnote=fnote):
+            click.echo(
+                f"{settings.ONTOLOGY_IRI}{name}_{record.sequence}_f{record.position}\t{record.sequence}\t"
+                f"{record.ftype}\t{record.fnote}\tresidues {record.start}-{record.stop}\t"
+                f"columns {record.first_column}-{record.last_column}"
+            )
+
+
+if __name__ == "__main__":
+    features()
@@ -1,94 +1,329 @@
+import asyncio
+import functools
+from typing import Dict, List, Optional, TextIO
+
 import click
 
+from salon.alignment import insert_gaps, parse_gap_runs
+from salon.cache import UniProtCache, open_uniprot_cache
 from salon.config import settings
-from salon.database.stardog import Stardog
+from salon.database.backends import open_repository
+from salon.database.queries import IRI, QueryTemplate, batches
+from salon.database.repository import RDFRepository, gather_bounded
+from salon.database.uniprot import UNIPROT_IRI, UniProt
 
+# UniProt protein existence levels
+PROTEIN_EXISTENCE = {
+    "http://purl.uniprot.org/core/Evidence_at_Protein_Level_Existence": 1,
+    "http://purl.uniprot.org/core/Evidence_at_Transcript_Level_Existence": 2,
+    "http://purl.uniprot.org/core/Inferred_from_Homology_Existence": 3,
+    "http://purl.uniprot.org/core/Predicted_Existence": 4,
+    "http://purl.uniprot.org/core/Uncertain_Existence": 5,
+}
 
-@click.command()
-@click.option(
-    "--uri",
-    "-x",
-    help="Protein alignment sequence URI.",
-)
-def header(uri: str):
+
+@functools.lru_cache(maxsize=None)
+def _header_template() -> QueryTemplate:
     """
-    Returns FASTA description line for a protein sequence in the ontology.
+    Returns the (compiled) query for the fields of the description lines of every protein sequence in `$uris`.
     """
-    query = (
+    return QueryTemplate(
         """
         PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX skos:<http://www.w3.org/2004/02/skos/core#> 
-        PREFIX up:<http://purl.uniprot.org/core/>
         PREFIX salon:<"""
         + settings.ONTOLOGY_IRI
-        + """">
-        SELECT DISTINCT ?db ?UniqueIdentifier ?EntryName 
-               ?OrganismName ?OrganismIdentifier ?ProteinName 
-               ?GeneName ?ProteinExistence
+        + """>
+        SELECT DISTINCT ?seq ?UniqueIdentifier ?OrganismIdentifier ?ProteinName ?pdb
         WHERE{
-            <"""
-        + uri
-        + """> a salon:ProteinAlignmentSequence ;
-                              salon:identifier ?UniqueIdentifier ;
-                              salon:organism ?OrganismIdentifier ;
-                              salon:hasAssociationWith ?protein .
+            VALUES ?seq { $uris }
+            ?seq a salon:ProteinAlignmentSequence ;
+                 salon:identifier ?UniqueIdentifier ;
+                 salon:organism ?OrganismIdentifier ;
+                 salon:hasAssociationWith ?protein .
             ?protein a salon:Protein ;
                      salon:proteinName ?ProteinName ;
                      rdfs:seeAlso ?pdb .
-            SERVICE <http://sparql.uniprot.org/sparql> {
-                ?pdb a up:Protein ;
-                         up:reviewed ?db ;
-                         up:encodedBy ?gene ;
-                         up:mnemonic ?EntryName ;
-                         up:existence ?ProteinExistence ;
-                         up:organism ?organism .
-                ?gene skos:prefLabel ?GeneName .
-                ?organism a up:Taxon;
-                          up:scientificName ?OrganismName .
+            FILTER(STRSTARTS(STR(?pdb), STR(<"""
+        + UNIPROT_IRI
+        + """>)))
+        }
+    """
+    )
+
+
+def _header_query(uris: List[str]) -> str:
+    return _header_template().render(uris=uris)
+
+
+@functools.lru_cache(maxsize=None)
+def _alignment_template(graph: bool) -> QueryTemplate:
+    """
+    Returns the (compiled) query for every member sequence of alignment `$alignment`, optionally scoped to named
+    graph `$graph`.
+    """
+    members = (
+        "$alignment salon:hasSubAlignment?/salon:hasSequence ?seq .\n"
+        "            ?seq salon:identifier ?UniqueIdentifier .\n"
+        "            OPTIONAL { ?seq salon:sequence ?Sequence }"
+    )
+    # sequences parsed with `--dedup` link to their (shared) residues instead
+    gaps = "?seq salon:hasResidues ?residues ; salon:gapRuns ?GapRuns ."
+    if graph:
+        # only member sequences are scoped to the alignment graph, enrichments (and shared residues) may be anywhere
+        members = f"GRAPH $graph {{\n            {members}\n            }}"
+        gaps = f"GRAPH $graph {{ {gaps} }}"
+
+    return QueryTemplate(
+        """
+        PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
+        PREFIX salon:<"""
+        + settings.ONTOLOGY_IRI
+        + """>
+        SELECT ?seq ?UniqueIdentifier ?Sequence ?Residues ?GapRuns ?OrganismIdentifier ?ProteinName ?pdb
+        WHERE{
+            """
+        + members
+        + """
+            OPTIONAL {
+                """
+        + gaps
+        + """
+                ?residues salon:residues ?Residues .
+            }
+            OPTIONAL {
+                ?seq salon:organism ?OrganismIdentifier ;
+                     salon:hasAssociationWith ?protein .
+                ?protein a salon:Protein ;
+                         salon:proteinName ?ProteinName ;
+                         rdfs:seeAlso ?pdb .
+                FILTER(STRSTARTS(STR(?pdb), STR(<"""
+        + UNIPROT_IRI
+        + """>)))
             }
         }
+        ORDER BY ?seq ?pdb
     """
     )
-    management = Stardog(
-        endpoint=settings.STARDOG_ENDPOINT,
-        database=settings.STARDOG_DATABASE,
-        username=settings.STARDOG_USERNAME,
-        password=settings.STARDOG_PASSWORD,
+
+
+def _alignment_query(alignment: str, graph: str = None) -> str:
+    return _alignment_template(bool(graph)).render(alignment=alignment, graph=graph or ())
+
+
+def _format_header(seq: dict, protein: Optional[dict]) -> Optional[str]:
+    """
+    Returns the UniProtKB-style FASTA description line for a sequence binding and its UniProt protein record, or
+    `None` if the record lacks any required field.
+    """
+    if not protein or not protein["gene"]:
+        return None
+
+    db = "sp" if protein["reviewed"] else "tl"
+    unique_identifier = seq["UniqueIdentifier"]["value"]
+    entry_name = protein["mnemonic"]
+    protein_name = seq["ProteinName"]["value"]
+    organism_name = protein["organism_name"]
+    organism_identifier = seq["OrganismIdentifier"]["value"]
+    gene_name = protein["gene"]
+    # the level is left out of the line if UniProt reports one not known here
+    protein_existence = PROTEIN_EXISTENCE.get(protein["existence"])
+
+    # UniprotKb template FASTA header specification
+    header = (
+        f">{db}|{unique_identifier}|{entry_name} {protein_name} "
+        f"OS={organism_name} OX={organism_identifier} GN={gene_name}"
     )
-    res = management.query(query)
+    return f"{header} PE={protein_existence}" if protein_existence else header
+
+
+def _sequence(seq: dict) -> str:
+    """
+    Returns the aligned sequence of a sequence binding, rebuilding it from its residues and gap runs if needed (empty
+    if neither is found, e.g., if its shared residues are not loaded).
+    """
+    if "Sequence" in seq:
+        return seq["Sequence"]["value"]
+    if "Residues" in seq and "GapRuns" in seq:
+        return insert_gaps(seq["Residues"]["value"], parse_gap_runs(seq["GapRuns"]["value"]))
+    return ""
 
-    try:
-        bindings = res["results"]["bindings"]
-    except IndexError:
-        bindings = {}
 
+def _accession(seq: dict) -> Optional[str]:
+    pdb = seq.get("pdb")
+    return pdb["value"][len(UNIPROT_IRI) :] if pdb else None
+
+
+async def describe_sequences(management: RDFRepository, uniprot: UniProt, uris: List[str]) -> Dict[str, List[str]]:
+    """
+    Returns the FASTA description line(s) found for a batch of protein sequences, looked up in a single query. UniProt
+    fields are only fetched remotely for proteins not found in its client's cache.
+
+    :return: Mapping of sequence URI to description lines.
+    """
+    res = await management.aquery(_header_query(uris))
+    bindings = res["results"]["bindings"]
+
+    proteins = await uniprot.proteins(_accession(seq) for seq in bindings)
+
+    templates = {uri: [] for uri in uris}
     for seq in bindings:
-        db = "sp" if seq["db"]["value"] else "tl"
-        unique_identifier = seq["UniqueIdentifier"]["value"]
-        entry_name = seq["EntryName"]["value"]
-        protein_name = seq["ProteinName"]["value"]
-        organism_name = seq["OrganismName"]["value"]
-        organism_identifier = seq["OrganismIdentifier"]["value"]
-        gene_name = seq["GeneName"]["value"]
-
-        mapping = {
-            "http://purl.uniprot.org/core/Evidence_at_Protein_Level_Existence": 1,
-            "http://purl.uniprot.org/core/Evidence_at_Transcript_Level_Existence": 2,
-            "http://purl.uniprot.org/core/Inferred_from_Homology_Existence": 3,
-            "http://purl.uniprot.org/core/Predicted_Existence": 4,
-            "http://purl.uniprot.org/core/Uncertain_Existence": 5,
-        }
-        protein_existence = seq["ProteinExistence"]["value"]
-        protein_existence = mapping[protein_existence]
+        template = _format_header(seq, proteins[_accession(seq)])
+        if template:
+            templates[seq["seq"]["value"]].append(template)
 
-        # UniprotKb template FASTA header specification
-        template = (
-            f">{db}|{unique_identifier}|{entry_name} {protein_name} "
-            f"OS={organism_name} OX={organism_identifier} GN={gene_name} PE={protein_existence}"
+    return templates
+
+
+async def describe_sequence(management: RDFRepository, uniprot: UniProt, uri: str) -> List[str]:
+    """
+    Returns the FASTA description line(s) found for a protein sequence (see `describe_sequences`).
+    """
+    return (await describe_sequences(management, uniprot, [uri]))[uri]
+
+
+async def _write_entries(uniprot: UniProt, rows: List[dict], output: TextIO) -> None:
+    proteins = await uniprot.proteins(_accession(seq) for seq in rows if _accession(seq))
+    for seq in rows:
+        template = _format_header(seq, proteins.get(_accession(seq)))
+        output.write((template or f">{seq['UniqueIdentifier']['value']}") + "\n")
+
+        sequence = _sequence(seq)
+        for i in range(0, len(sequence), 60):
+            output.write(sequence[i : i + 60] + "\n")
+
+
+async def export_alignment(
+    management: RDFRepository,
+    uniprot: UniProt,
+    alignment: str,
+    output: TextIO,
+    page_size: int = 1000,
+    graph: str = None,
+) -> int:
+    """
+    Writes a UniProtKB-style FASTA entry for every member sequence of an alignment (or sub-alignment). Sequences are
+    streamed from a single (paginated) query and written to `output` in chunks of `page_size`, so that memory usage
+    does not depend on the size of the alignment. Sequences not enriched yet are written with their identifier as
+    description line.
+
+    :param graph: Named graph the alignment is loaded into, if known, to scope the query to.
+    :return: Number of entries written.
+    """
+    entries, last, rows = 0, None, []
+    async for seq in management.aquery_iter(_alignment_query(alignment, graph), page_size=page_size):
+        # rows are sorted by sequence, so only the first row of proteins linked to many UniProt entries is kept
+        if seq["seq"]["value"] == last:
+            continue
+        last = seq["seq"]["value"]
+        entries += 1
+
+        rows.append(seq)
+        if len(rows) >= page_size:
+            await _write_entries(uniprot, rows, output)
+            rows = []
+
+    await _write_entries(uniprot, rows, output)
+    return entries
+
+
+async def _header(uris: List[str], batch_size: int, concurrency: int, cache: UniProtCache) -> None:
+    async with _uniprot(cache) as uniprot, open_repository() as management:
+        results = await gather_bounded(
+            (describe_sequences(management, uniprot, batch) for batch in batches(uris, batch_size)),
+            concurrency=concurrency,
         )
 
-        print(f"Potential description line(s) found for sequence {uri}:")
-        print(f"\t{template}")
+    templates = {uri: lines for result in results for uri, lines in result.items()}
+    for uri in uris:
+        for template in templates[uri]:
+            print(f"Potential description line(s) found for sequence {uri}:")
+            print(f"\t{template}")
+
+
+async def _export(alignment: str, graph: str, output_path: str, page_size: int, cache: UniProtCache) -> int:
+    async with _uniprot(cache) as uniprot, open_repository() as management:
+        with open(output_path, "w") as output:
+            return await export_alignment(management, uniprot, alignment, output, page_size=page_size, graph=graph)
+
+
+def _uniprot(cache: UniProtCache) -> UniProt:
+    return UniProt(settings.UNIPROT_ENDPOINT, cache=cache, timeout=settings.HTTP_TIMEOUT)
+
+
+@click.command()
+@click.option(
+    "--uri",
+    "-x",
+    type=IRI,
+    multiple=True,
+    help="Protein alignment sequence URI. Can be given many times.",
+)
+@click.option(
+    "--alignment",
+    "-a",
+    type=IRI,
+    help="Alignment (or sub-alignment) URI to export as FASTA file.",
+)
+@click.option(
+    "--graph",
+    "-g",
+    type=IRI,
+    help="Named graph (i.e., alignment URI) the alignment is loaded into, to scope the query to (with --alignment).",
+)
+@click.option(
+    "--output-path",
+    "-o",
+    default="output.fasta",
+    show_default=True,
+    help="Output FASTA file path (with --alignment).",
+)
+@click.option(
+    "--page-size",
+    default=1000,
+    show_default=True,
+    help="Number of sequences fetched per query (with --alignment).",
+)
+@click.option(
+    "--batch-size",
+    "-b",
+    default=100,
+    show_default=True,
+    help="Maximum number of sequences looked up per query (with --uri).",
+)
+@click.option(
+    "--concurrency",
+    "-c",
+    default=settings.CONCURRENCY,
+    show_default=True,
+    help="Maximum number of requests in flight at once.",
+)
+@click.option("--cache/--no-cache", default=True, show_default=True, help="Use local cache for UniProt lookups.")
+def header(
+    uri: List[str],
+    alignment: str,
+    graph: str,
+    output_path: str,
+    page_size: int,
+    batch_size: int,
+    concurrency: int,
+    cache: bool,
+):
+    """
+    Returns FASTA description line for a protein sequence in the ontology, or exports every sequence of an
+    alignment as FASTA file.
+    """
+    if not (uri or alignment):
+        raise click.UsageError("Either --uri or --alignment is required.")
+
+    with open_uniprot_cache(cache) as uniprot_cache:
+        if uri:
+            asyncio.run(_header(list(uri), batch_size, concurrency, uniprot_cache))
+        if alignment:
+            entries = asyncio.run(_export(alignment, graph, output_path, page_size, uniprot_cache))
+            print(f"Exported {entries} sequence(s) to {output_path}")
+
+    if uniprot_cache:
+        print(f"UniProt cache: {uniprot_cache.stats}")
 
 
 if __name__ == "__main__":
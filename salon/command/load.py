@@ -1,10 +1,284 @@
+import json
+import re
+import time
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import click
-from rdflib import Graph
+from rdflib import RDF, ConjunctiveGraph
 
+from salon import schema
 from salon.config import settings
-from salon.database.stardog import Stardog
+from salon.database.backends import open_repository
+from salon.database.repository import RDFRepository
+from salon.manifest import Manifest, Unit, combine, statement_hash, unit_hash
+from salon.sink import FORMATS, nt_term, open_text, split_suffix
+
+# RDF term in N-Triples/N-Quads syntax: IRI, blank node or literal (with optional language tag or datatype)
+_TERM_PATTERN = re.compile(r'<[^>]*>|_:\S+|"(?:[^"\\]|\\.)*"(?:@[\w-]+|\^\^<[^>]*>)?')
+
+Statement = Tuple[str, Optional[str]]
+
+
+def iter_statements(filename: str) -> Iterator[Statement]:
+    """
+    Yields every statement in an RDF file as a tuple of N-Triples line (without the trailing dot) and named graph
+    (if any). N-Triples and N-Quads files (optionally compressed) are streamed line by line; any other RDF syntax is
+    parsed in memory first.
+    """
+    extension, _ = split_suffix(filename)
+
+    if extension in ("nt", "nq"):
+        with open_text(filename) as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                terms = _TERM_PATTERN.findall(line)
+                if len(terms) == 4:
+                    yield " ".join(terms[:3]), terms[3]
+                else:
+                    yield " ".join(terms), None
+    else:
+        graph = ConjunctiveGraph()
+        graph.parse(location=filename, format=FORMATS.get(extension, extension))
+        for s, p, o, context in graph.quads():
+            identifier = context.identifier if context is not None else None
+            name = nt_term(identifier) if identifier != graph.default_context.identifier else None
+            yield f"{nt_term(s)} {nt_term(p)} {nt_term(o)}", name
+
+
+def _alignment_graph(subject: str, alignments: Set[str]) -> Optional[str]:
+    # URIs of alignment members extend that of their alignment, e.g., `salon:BB11001_1aab__f0` for `salon:BB11001`
+    candidate = subject
+    while candidate not in alignments:
+        cut = candidate.rfind("_")
+        if cut < 0:
+            return None
+        candidate = candidate[:cut] + ">"
+    return candidate
+
+
+def iter_alignment_statements(filename: str) -> Iterator[Statement]:
+    """
+    Yields every statement in an RDF file (see `iter_statements`), moving those in the default graph into the named
+    graph of the alignment they describe, i.e., the graph named after the `salon:Alignment` whose URI prefixes their
+    subject. Statements already in a named graph, or not about any alignment, are left as they are. The file is read
+    twice: first to find the alignments in it.
+    """
+    suffix = f" {nt_term(RDF.type)} <{settings.ONTOLOGY_IRI}Alignment>"
+    alignments = {
+        triple.split(" ", 1)[0]
+        for triple, graph in iter_statements(filename)
+        if graph is None and triple.endswith(suffix)
+    }
+    if not alignments:
+        yield from iter_statements(filename)
+        return
+
+    for triple, graph in iter_statements(filename):
+        if graph is None:
+            graph = _alignment_graph(triple.split(" ", 1)[0], alignments)
+        yield triple, graph
+
+
+def read_statements(filename: str, by_alignment: bool = True) -> Iterator[Statement]:
+    """
+    Yields every statement in an RDF file, either in the named graph of their alignment (see
+    `iter_alignment_statements`) or as they are in the file.
+    """
+    if by_alignment:
+        return iter_alignment_statements(filename)
+    return iter_statements(filename)
+
+
+def iter_batches(
+    statements: Iterator[Statement], batch_size: int = None, batch_bytes: int = None
+) -> Iterator[List[Statement]]:
+    """
+    Groups statements into batches of at most `batch_size` statements and `batch_bytes` bytes (whichever limit is
+    reached first).
+    """
+    batch, size = [], 0
+    for statement in statements:
+        batch.append(statement)
+        size += len(statement[0]) + 3
+        if (batch_size and len(batch) >= batch_size) or (batch_bytes and size >= batch_bytes):
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def group_by_graph(batch: List[Statement]) -> Dict[Optional[str], List[str]]:
+    """
+    Groups a batch of statements by named graph (`None` for the default graph).
+    """
+    graphs = {}
+    for triple, graph in batch:
+        graphs.setdefault(graph, []).append(triple)
+    return graphs
+
+
+def to_insert_data(batch: List[Statement], operation: str = "INSERT DATA") -> str:
+    """
+    Returns the SPARQL `INSERT DATA` (or `DELETE DATA`) update for a batch of statements.
+    """
+    blocks = []
+    for graph, triples in group_by_graph(batch).items():
+        if graph is None:
+            blocks.append(" .\n".join(triples))
+        else:
+            blocks.append("GRAPH " + graph + " { " + " .\n".join(triples) + " }")
+    return operation + " { " + " .\n".join(blocks) + " }"
+
+
+def to_delete_data(batch: List[Statement]) -> str:
+    """
+    Returns the SPARQL `DELETE DATA` update for a batch of statements.
+    """
+    return to_insert_data(batch, operation="DELETE DATA")
+
+
+def _unit(statement: Statement) -> Unit:
+    triple, graph = statement
+    return graph or "", triple.split(" ", 1)[0]
+
+
+def _is_shared(unit: Unit) -> bool:
+    # content-addressed resources (i.e., deduplicated residues, see `salon.command.parse.residues_uri`) may be loaded
+    # from many files, and their statements never change
+    return unit[1].startswith(f"<{settings.ONTOLOGY_IRI}residues-")
+
+
+def iter_deltas(
+    filename: str, manifest: Manifest, by_alignment: bool = True
+) -> Iterator[Tuple[Unit, Set[str], Set[str], Set[str]]]:
+    """
+    Compares the statements in an RDF file against those loaded from it before (as recorded in `manifest`), unit by
+    unit (i.e., per named graph and subject). The file is read twice: first to hash every unit, and then to collect
+    the statements of the units whose hash changed, so that only changed units are ever held in memory. Units are
+    compared by the hash of their (deduplicated) statements, as recorded, so units whose hash only changed because of
+    duplicated statements in the file are not yielded.
+
+    Statements of shared units (i.e., deduplicated residues) are never removed, as other files may still reference
+    them.
+
+    :param by_alignment: Whether statements in the default graph are moved into the named graph of their alignment.
+
+    :return: Iterator of tuples of changed unit, its current statements, and statements to add and to remove.
+    """
+    source = str(Path(filename).resolve())
+    previous = manifest.hashes(source)
+
+    hashes = {}
+    for statement in read_statements(filename, by_alignment):
+        unit = _unit(statement)
+        hashes[unit] = hashes.get(unit, 0) + statement_hash(statement[0])
+    hashes = {unit: combine([value]) for unit, value in hashes.items()}
+
+    changed = {unit for unit, value in hashes.items() if previous.get(unit) != value}
+    current = {unit: set() for unit in changed}
+    if changed:
+        for statement in read_statements(filename, by_alignment):
+            unit = _unit(statement)
+            if unit in changed:
+                current[unit].add(statement[0])
+
+    for unit, statements in current.items():
+        if previous.get(unit) == unit_hash(statements):
+            continue
+        loaded = manifest.statements(source, unit)
+        yield unit, statements, statements - loaded, set() if _is_shared(unit) else loaded - statements
+
+    # units no longer in the file
+    for unit in previous.keys() - hashes.keys():
+        yield unit, set(), set(), set() if _is_shared(unit) else manifest.statements(source, unit)
+
+
+def load_incremental(
+    management: RDFRepository, filename: str, manifest: Manifest, batch_size: int = 10000, by_alignment: bool = True
+) -> dict:
+    """
+    Loads an RDF file incrementally: only statements added to (or removed from) the file since its last load are
+    sent, as SPARQL `DELETE DATA`/`INSERT DATA` updates of at most `batch_size` statements each. The manifest is
+    updated as soon as each update succeeds, so that an interrupted load can be resumed by running it again.
+
+    :return: Number of changed named graphs (i.e., alignments) and units, and of statements added and removed.
+    """
+    source = str(Path(filename).resolve())
+    summary = {"graphs": 0, "units": 0, "added": 0, "removed": 0}
+
+    units, added, removed = {}, [], []
+
+    def flush():
+        updates = []
+        if removed:
+            updates.append(to_delete_data(removed))
+        if added:
+            updates.append(to_insert_data(added))
+        if updates:
+            management.update(" ;\n".join(updates))
+        for unit, statements in units.items():
+            manifest.put(source, unit, statements)
+        manifest.commit()
+
+        summary["units"] += len(units)
+        summary["added"] += len(added)
+        summary["removed"] += len(removed)
+        units.clear(), added.clear(), removed.clear()
+
+    for unit, statements, additions, removals in iter_deltas(filename, manifest, by_alignment):
+        graph = unit[0] or None
+        units[unit] = statements
+        added.extend((triple, graph) for triple in additions)
+        removed.extend((triple, graph) for triple in removals)
+        if len(added) + len(removed) >= batch_size:
+            flush()
+    flush()
+
+    previous = manifest.graph_hashes(source)
+    graphs = {}
+    for (graph, _), value in manifest.hashes(source).items():
+        graphs[graph] = combine([graphs.get(graph, 0), value])
+    summary["graphs"] = sum(previous.get(graph) != value for graph, value in graphs.items())
+    summary["graphs"] += len(previous.keys() - graphs.keys())
+    manifest.put_graphs(source, graphs)
+    manifest.commit()
+
+    return summary
+
+
+class Checkpoint:
+    """
+    Keeps track of the statements of a file already committed to the database (and of the named graphs already
+    replaced), so that an interrupted load can be resumed from the last committed batch. The checkpoint is invalidated
+    if the file changes.
+    """
+
+    def __init__(self, path: str, filename: str):
+        self.path = Path(path)
+
+        stat = Path(filename).stat()
+        self.source = {"filename": str(Path(filename).resolve()), "size": stat.st_size, "mtime": stat.st_mtime}
+        self.committed = 0
+        self.replaced: Set[str] = set()
+
+        if self.path.exists():
+            with self.path.open() as f:
+                data = json.load(f)
+            if data.get("source") == self.source:
+                self.committed = data["committed"]
+                self.replaced = set(data.get("replaced", []))
+
+    def commit(self, statements: int, replaced: Iterable[str] = ()) -> None:
+        self.committed += statements
+        self.replaced.update(replaced)
+        with self.path.open("w") as f:
+            json.dump({"source": self.source, "committed": self.committed, "replaced": sorted(self.replaced)}, f)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
 
 
 @click.command()
@@ -17,13 +291,29 @@ def init(filename: str):
     """
     Initialise the database.
     """
-    management = Stardog(
-        endpoint=settings.STARDOG_ENDPOINT,
-        database=settings.STARDOG_DATABASE,
-        username=settings.STARDOG_USERNAME,
-        password=settings.STARDOG_PASSWORD,
+    with open_repository() as management:
+        management.init(filename=filename)
+
+
+@click.command("compile")
+@click.option(
+    "--filename",
+    "-i",
+    default="SALON.owl",
+    show_default=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Ontology file (RDF/XML).",
+)
+def compile_ontology(filename: str):
+    """
+    Compiles the ontology into a snapshot (hierarchies, rules and N-Triples payload) used by every other command.
+    """
+    start = time.perf_counter()
+    snapshot, path = schema.compile_ontology(filename)
+    click.echo(
+        f"Compiled {len(snapshot.facts)} triples and {len(snapshot.rules)} rules into {path} in "
+        f"{time.perf_counter() - start:.2f}s"
     )
-    management.init(filename=filename)
 
 
 @click.command()
@@ -32,30 +322,114 @@ def init(filename: str):
     "-i",
     help="Input file name.",
 )
-def load(filename: str):
+@click.option("--batch-size", "-b", default=10000, show_default=True, help="Maximum number of triples per batch.")
+@click.option("--batch-bytes", type=int, default=None, help="Maximum size of each batch (in bytes).")
+@click.option(
+    "--checkpoint",
+    default=None,
+    help="Checkpoint file used to resume interrupted loads.  [default: <filename>.checkpoint]",
+)
+@click.option("--restart", is_flag=True, help="Ignore any previous checkpoint and load the whole file.")
+@click.option(
+    "--sparql",
+    is_flag=True,
+    help="Send batches as SPARQL `INSERT DATA` updates instead of through the repository's bulk-load API (e.g., "
+    "Stardog's transactional HTTP API).",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Only send the triples added or removed since the file was last loaded (as SPARQL `DELETE DATA`/"
+    "`INSERT DATA` updates), according to the manifest.",
+)
+@click.option(
+    "--manifest",
+    default=None,
+    help="Manifest of previously loaded triples, used with --incremental.  [default: MANIFEST_PATH setting]",
+)
+@click.option(
+    "--graph-per-alignment/--default-graph",
+    default=None,
+    help="Load the triples of each alignment into its own named graph (named after the alignment URI), or leave "
+    "triples without a named graph in the default graph.  [default: --graph-per-alignment on backends whose default "
+    "graph is the union of every named graph (Oxigraph, and Stardog databases with query.all.graphs set, e.g., by "
+    "init), --default-graph otherwise]",
+)
+@click.option(
+    "--replace",
+    is_flag=True,
+    help="Drop every named graph (i.e., alignment) in the file before loading it, so that re-loaded alignments are "
+    "replaced instead of merged.",
+)
+def load(
+    filename: str,
+    batch_size: int,
+    batch_bytes: int,
+    checkpoint: str,
+    restart: bool,
+    sparql: bool,
+    incremental: bool,
+    manifest: str,
+    graph_per_alignment: Optional[bool],
+    replace: bool,
+):
     """
-    Inserts data to RDF repository.
+    Inserts data to RDF repository in batches.
     """
-    file_extension = Path(filename).suffix[1:].lower()
+    with open_repository() as management:
+        if graph_per_alignment is None:
+            # otherwise, alignments loaded into named graphs would not be found by (unscoped) queries
+            graph_per_alignment = management.union_default_graph
 
-    management = Stardog(
-        endpoint=settings.STARDOG_ENDPOINT,
-        database=settings.STARDOG_DATABASE,
-        username=settings.STARDOG_USERNAME,
-        password=settings.STARDOG_PASSWORD,
-    )
+        if incremental:
+            start = time.perf_counter()
+            database = f"{management.endpoint}/{management.database}"
+            with Manifest(manifest or settings.MANIFEST_PATH, database) as records:
+                summary = load_incremental(
+                    management, filename, records, batch_size=batch_size, by_alignment=graph_per_alignment
+                )
+            click.echo(
+                f"Updated {summary['units']} subjects in {summary['graphs']} graphs: {summary['added']} triples "
+                f"added and {summary['removed']} removed in {time.perf_counter() - start:.2f}s"
+            )
+            return
 
-    graph = Graph()
-    graph.parse(location=filename, format=file_extension)
-    graph_as_ttl = graph.serialize(format="nt").decode("UTF-8")
+        progress = Checkpoint(checkpoint or f"{filename}.checkpoint", filename)
+        if restart:
+            progress.committed, progress.replaced = 0, set()
+        elif progress.committed:
+            click.echo(f"Resuming load of {filename} after {progress.committed} triples")
 
-    if isinstance(management, Stardog):
-        query_string = "INSERT DATA { " + graph_as_ttl + " }"
-    else:
-        # TODO: Add support for other databases, e.g. Virtuoso.
-        query_string = "INSERT DATA { GRAPH { " + management.database + " } " + graph_as_ttl + " }"
+        statements = read_statements(filename, by_alignment=graph_per_alignment)
+        for _ in range(progress.committed):
+            next(statements, None)
+
+        start, loaded = time.perf_counter(), 0
+        for i, batch in enumerate(iter_batches(statements, batch_size=batch_size, batch_bytes=batch_bytes)):
+            graphs = group_by_graph(batch)
+            # named graphs seen for the first time are dropped along with (i.e., in the same request as) their first
+            # batch of triples
+            replaced = [graph for graph in graphs if graph and graph not in progress.replaced] if replace else []
+            if sparql:
+                management.update(
+                    " ;\n".join([*(f"DROP SILENT GRAPH {graph}" for graph in replaced), to_insert_data(batch)])
+                )
+            else:
+                # a single transaction per batch, so that the checkpoint never lags behind committed graphs
+                management.bulk_add_graphs(
+                    {graph[1:-1] if graph else None: triples for graph, triples in graphs.items()},
+                    replaced=[graph[1:-1] for graph in replaced],
+                )
+            progress.commit(len(batch), replaced)
+
+            loaded += len(batch)
+            elapsed = time.perf_counter() - start
+            click.echo(f"Batch {i + 1}: {loaded} triples loaded ({loaded / elapsed:.0f} triples/s)")
+
+        progress.clear()
 
-    management.update(query_string)
+        elapsed = time.perf_counter() - start
+        click.echo(f"Loaded {loaded} triples in {elapsed:.2f}s ({loaded / elapsed if elapsed else 0:.0f} triples/s)")
 
 
 if __name__ == "__main__":
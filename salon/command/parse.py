@@ -1,186 +1,566 @@
-from collections import defaultdict
+import glob
+import itertools
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from decimal import Decimal
 from pathlib import Path
+from typing import Dict, Iterator, List, Set, TextIO, Tuple
 
 import click
-from Bio import AlignIO
-from rdflib import RDF, Graph, Literal, Namespace, URIRef
+from rdflib import RDF, XSD, Graph, Literal, Namespace, URIRef
 
+from salon.alignment import Alignment, Sequence, format_gap_runs, residues_digest
 from salon.config import settings
+from salon.intervals import FeatureIndex, index_path
+from salon.readers import (
+    alignment_name,
+    get_streaming_reader,
+    is_supported,
+    read_alignments,
+)
+from salon.schema import load_reasoner
+from salon.sink import GraphSink, Triple, open_sink, open_text, split_suffix
+from salon.statistics import AlignmentStatistics
 
-try:
-    import xml.etree.cElementTree as ET
-except ImportError:
-    import xml.etree.ElementTree as ET
-
-
-def _etree_to_dict(t):
-    """Transform an XML to a Python dictionary."""
-    d = {t.tag: {} if t.attrib else None}
-    children = list(t)
-    if children:
-        dd = defaultdict(list)
-        for dc in map(_etree_to_dict, children):
-            for k, v in dc.items():
-                dd[k].append(v)
-        d = {t.tag: {k: v[0] if len(v) == 1 else v for k, v in dd.items()}}
-    if t.attrib:
-        d[t.tag].update(("@" + k, v) for k, v in t.attrib.items())
-    if t.text:
-        text = t.text.strip()
-        if children or t.attrib:
-            if text:
-                d[t.tag]["#text"] = text
-        else:
-            d[t.tag] = text
-    return d
 
+def residues_uri(digest: str) -> URIRef:
+    """
+    Returns the URI of the (shared) ungapped residues with the given content hash.
+    """
+    # no underscores, as they would tie it to an alignment when loading (see `salon.command.load`)
+    return URIRef(f"{settings.ONTOLOGY_IRI}residues-{digest}")
 
-def from_macsim_xml_instance(filepath: str) -> Graph:
+
+def alignment_triples(alignment: Alignment, dedup: bool = False) -> Iterator[Triple]:
     """
-    Creates an RDF graph for given input alignment in MACSIM/XML format.
+    Yields RDF triples for given alignment, following the ontology specification.
 
-    :param filepath: Input file in MACSIM/XML format.
-    :return: RDF graph.
+    :param alignment: Alignment.
+    :param dedup: Whether sequences link to their (shared) ungapped residues plus their gap runs, instead of holding
+        the aligned sequence (see `residue_triples`).
+    :return: Iterator over RDF triples.
     """
-    root = ET.parse(filepath).getroot()
-    instance = Path(filepath).stem
+    instance = alignment.name
+    namespace = Namespace(settings.ONTOLOGY_IRI)
+
+    # alignment data
+    alignment_uri = URIRef(f"{namespace}{instance}")
+    yield alignment_uri, RDF.type, namespace.Alignment
+    yield alignment_uri, namespace.gapCharacter, Literal(alignment.gap)
+
+    # sub alignment data
+    for subalignment in alignment.subalignments:
+        subalignment_uri = URIRef(f"{namespace}{instance}_{subalignment.name}")
+        yield alignment_uri, namespace.hasSubAlignment, subalignment_uri
+        yield subalignment_uri, RDF.type, namespace.SubAlignment
+        yield subalignment_uri, namespace.subAlignmentName, Literal(subalignment.label)
+
+    for subalignment, score in alignment.scores:
+        score_name = f"{instance}_{subalignment.name}" if subalignment else instance
+        alignment_score_uri = URIRef(f"{namespace}{score_name}_score")
+        yield alignment_uri, namespace.hasAlignmentScore, alignment_score_uri
+        yield alignment_score_uri, namespace.score, Literal(score)
 
-    # rdf graph
-    graph = Graph()
+    for sequence in alignment.sequences:
+        yield from sequence_triples(alignment, sequence, dedup=dedup)
 
-    # bind namespace
+
+def sequence_triples(alignment: Alignment, sequence: Sequence, dedup: bool = False) -> Iterator[Triple]:
+    """
+    Yields RDF triples for a sequence of given alignment (see `alignment_triples`).
+
+    :param alignment: Alignment holding the residues of the sequence.
+    :param sequence: Sequence.
+    :return: Iterator over RDF triples.
+    """
+    instance = alignment.name
     namespace = Namespace(settings.ONTOLOGY_IRI)
-    graph.bind(settings.ONTOLOGY_NAMESPACE, namespace)
-
-    for alignment in root:
-        alignment_uri = URIRef(f"{namespace}{instance}")
-        graph.add((alignment_uri, RDF.type, namespace.Alignment))
-        graph.add((alignment_uri, namespace.gapCharacter, Literal("-")))
-
-        for item in alignment.iterfind("aln-name"):
-            subalignment_name = item.text.replace("/", "-")
-            subalignment_uri = URIRef(f"{namespace}{instance}_{subalignment_name}")
-            graph.add((alignment_uri, namespace.hasSubAlignment, subalignment_uri))
-            graph.add((subalignment_uri, RDF.type, namespace.SubAlignment))
-            graph.add((subalignment_uri, namespace.subAlignmentName, Literal(subalignment_name)))
-
-            for item in alignment.iterfind("aln-score"):
-                alignment_score_uri = URIRef(f"{namespace}{instance}_{subalignment_name}_score")
-                graph.add((alignment_uri, namespace.hasAlignmentScore, alignment_score_uri))
-                graph.add((alignment_score_uri, namespace.score, Literal(item.text)))
-
-            for sequence in alignment.iter("sequence"):
-                seq_name, seq_uri = "", ""
-                for item in sequence.iterfind("seq-name"):
-                    seq_name = item.text
-                    seq_uri = URIRef(f"{namespace}{instance}_{seq_name}")
-
-                graph.add((subalignment_uri, namespace.hasSequence, seq_uri))
-                graph.add((seq_uri, namespace.identifier, Literal(seq_name)))
-
-                if sequence.attrib["seq-type"] == "Protein":
-                    graph.add((seq_uri, RDF.type, namespace.ProteinAlignmentSequence))
-                else:
-                    graph.add((seq_uri, RDF.type, namespace.DNAAlignmentSequence))
-
-                for item in sequence.iterfind("seq-data"):
-                    graph.add((seq_uri, namespace.sequence, Literal(item.text.strip())))
-                    graph.add((seq_uri, namespace.length, Literal(len(item.text.strip()))))
-
-                for i, item in enumerate(sequence.iter("fitem")):
-                    blocks = _etree_to_dict(item)["fitem"]
-                    feature_uri = URIRef(f"{namespace}{instance}_{seq_name}_f{i}")
-                    graph.add((seq_uri, namespace.hasFeature, feature_uri))
-                    graph.add((feature_uri, namespace.FType, Literal(blocks["ftype"])))
-                    graph.add((feature_uri, namespace.FNote, Literal(blocks["fnote"])))
-                    graph.add((feature_uri, namespace.FStop, Literal(blocks["fstop"])))
-                    graph.add((feature_uri, namespace.FStart, Literal(blocks["fstart"])))
-                    graph.add((feature_uri, namespace.FScore, Literal(blocks["fscore"])))
-
-                for info in sequence.iter("seq-info"):
-                    for item in info.iterfind("accession"):
-                        # item_alpha = re.sub(r'[\W_]+', '', item.text)  # keep only alphanumeric
-                        graph.add(
-                            (
-                                seq_uri,
-                                namespace.accessionNumber,
-                                Literal(item.text),
-                            )
-                        )
-
-                    for item in info.iterfind("definition"):
-                        graph.add((seq_uri, namespace.description, Literal(item.text.strip())))
-
-                    for item in info.iterfind("organism"):
-                        graph.add((seq_uri, namespace.organism, Literal(item.text.strip())))
-
-    return graph
-
-
-def from_fasta(filepath: str) -> Graph:
-    """
-    Transform input alignment into RDF graph.
-
-    :param filepath: Input file in FASTA-like format.
-    :return: RDF graph.
+
+    seq_uri = URIRef(f"{namespace}{instance}_{sequence.name}")
+    for subalignment in sequence.subalignments:
+        yield URIRef(f"{namespace}{instance}_{subalignment.name}"), namespace.hasSequence, seq_uri
+    yield seq_uri, namespace.identifier, Literal(sequence.name)
+
+    if sequence.seq_type == "Protein":
+        yield seq_uri, RDF.type, namespace.ProteinAlignmentSequence
+    else:
+        yield seq_uri, RDF.type, namespace.DNAAlignmentSequence
+
+    if dedup:
+        yield seq_uri, namespace.hasResidues, residues_uri(residues_digest(alignment.ungapped(sequence.row)))
+        yield seq_uri, namespace.gapRuns, Literal(format_gap_runs(alignment.gap_runs(sequence.row)))
+    else:
+        yield seq_uri, namespace.sequence, Literal(alignment.sequence(sequence.row))
+    yield seq_uri, namespace.length, Literal(int(alignment.lengths[sequence.row]))
+
+    for i, feature in enumerate(sequence.features):
+        feature_uri = URIRef(f"{namespace}{instance}_{sequence.name}_f{i}")
+        yield seq_uri, namespace.hasFeature, feature_uri
+        yield feature_uri, namespace.FType, Literal(feature.ftype)
+        yield feature_uri, namespace.FNote, Literal(feature.fnote)
+        yield feature_uri, namespace.FStop, _typed(feature.fstop, int)
+        yield feature_uri, namespace.FStart, _typed(feature.fstart, int)
+        yield feature_uri, namespace.FScore, _typed(feature.fscore, Decimal)
+
+    if sequence.accession is not None:
+        yield seq_uri, namespace.accessionNumber, Literal(sequence.accession)
+    if sequence.definition is not None:
+        yield seq_uri, namespace.description, Literal(sequence.definition)
+    if sequence.organism is not None:
+        yield seq_uri, namespace.organism, Literal(sequence.organism)
+
+
+def residue_triples(alignment: Alignment, seen: Set[str] = None) -> Iterator[Triple]:
     """
-    instance = Path(filepath).stem
+    Yields RDF triples for the ungapped residues of every sequence in an alignment, as resources identified by their
+    content hash, so that sequences found in many alignments are stored once.
 
-    # rdf graph
-    graph = Graph()
+    :param seen: Content hashes already written, which are skipped (and updated).
+    :return: Iterator over RDF triples.
+    """
+    namespace = Namespace(settings.ONTOLOGY_IRI)
+    seen = set() if seen is None else seen
+    for sequence in alignment.sequences:
+        residues = alignment.ungapped(sequence.row)
+        digest = residues_digest(residues)
+        if digest in seen:
+            continue
+        seen.add(digest)
+        yield residues_uri(digest), RDF.type, namespace.ResidueSequence
+        yield residues_uri(digest), namespace.residues, Literal(residues)
+
+
+def statistics_triples(alignment: Alignment) -> Iterator[Triple]:
+    """
+    Yields RDF triples with the metrics of given alignment: gap fraction, mean percent identity and sum-of-pairs
+    score of the alignment, gap fraction and mean percent identity of each sequence, and consensus character, gap
+    fraction, sum-of-pairs score and Shannon entropy (conservation) of each column.
 
-    # creates and bind namespace
+    :param alignment: Alignment.
+    :return: Iterator over RDF triples.
+    """
+    instance = alignment.name
     namespace = Namespace(settings.ONTOLOGY_IRI)
-    graph.bind(settings.ONTOLOGY_NAMESPACE, namespace)
+    stats = AlignmentStatistics(alignment)
+
+    def scores(subject: URIRef, predicate: URIRef, values: dict) -> Iterator[Triple]:
+        for function, value in values.items():
+            score_uri = URIRef(f"{subject}_{function}")
+            yield subject, predicate, score_uri
+            yield score_uri, RDF.type, namespace.AlignmentScore
+            yield score_uri, namespace.hasAlignmentScoreFunction, namespace[f"AlignmentScore{function}"]
+            yield score_uri, namespace.score, _decimal(value)
 
-    # alignment data
     alignment_uri = URIRef(f"{namespace}{instance}")
-    graph.add((alignment_uri, RDF.type, namespace.Alignment))
-    graph.add((alignment_uri, namespace.gapCharacter, Literal("-")))
+    yield from scores(
+        alignment_uri,
+        namespace.hasAlignmentScore,
+        {
+            "GapsPercentage": stats.gap_fraction,
+            "PercentIdentity": stats.percent_identity,
+            "SOP": stats.sum_of_pairs,
+        },
+    )
+
+    for sequence in alignment.sequences:
+        yield from scores(
+            URIRef(f"{namespace}{instance}_{sequence.name}"),
+            namespace.hasSequenceScore,
+            {
+                "GapsPercentage": stats.sequence_gap_fraction[sequence.row],
+                "PercentIdentity": stats.sequence_percent_identity[sequence.row],
+            },
+        )
+
+    # number of pairs of sequences, to normalise column sum-of-pairs scores
+    pairs = max(len(alignment) * (len(alignment) - 1) // 2, 1)
+    for i in range(alignment.width):
+        column_uri = URIRef(f"{namespace}{instance}_column{i + 1}")
+        yield alignment_uri, namespace.hasColumn, column_uri
+        yield column_uri, RDF.type, namespace.AlignmentColumn
+        yield column_uri, namespace.atSequenceIndex, Literal(i + 1)
+        yield column_uri, namespace.consensusCharacter, Literal(stats.consensus[i])
+
+        column_scores = {
+            "NongapsPercentage": 1 - stats.column_gap_fraction[i],
+            "SOP": stats.column_sum_of_pairs[i] / pairs,
+            "ShannonEntropy": stats.column_entropy[i],
+        }
+        for function, value in column_scores.items():
+            score_uri = URIRef(f"{column_uri}_{function}")
+            yield column_uri, namespace.hasColumnScore, score_uri
+            yield score_uri, RDF.type, namespace.ColumnScore
+            yield score_uri, namespace.hasColumnScoreFunction, namespace[f"ColumnScore{function}"]
+            yield score_uri, namespace.score, _decimal(value)
+
+
+def _typed(value: str, cast: type) -> Literal:
+    """
+    Returns a numeric literal (`xsd:integer` or `xsd:decimal`, given `cast`), or a plain literal if `value` is not a
+    number.
+    """
+    try:
+        return Literal(cast(value))
+    except (TypeError, ValueError, ArithmeticError):
+        return Literal(value)
 
-    # sub alignment data
-    subalignment_uri = URIRef(f"{namespace}{instance}_subalignment")
-    graph.add((alignment_uri, namespace.hasSubAlignment, subalignment_uri))
-    graph.add((subalignment_uri, RDF.type, namespace.Sub_Alignment))
-    graph.add((subalignment_uri, namespace.subAlignmentName, Literal(instance)))
 
-    for record in AlignIO.read(filepath, "fasta"):
-        seq_uri = URIRef(f"{namespace}{instance}_{record.name}")
-        graph.add((subalignment_uri, namespace.hasSequence, seq_uri))
-        graph.add((seq_uri, namespace.identifier, Literal(record.name)))
+def _decimal(value: float) -> Literal:
+    return Literal(Decimal(f"{value:.4f}"), datatype=XSD.decimal) if isinstance(value, float) else Literal(int(value))
+
+
+def _streamed_triples(part: Alignment) -> Iterator[Triple]:
+    """
+    Yields RDF triples for a part of an alignment read by a streaming reader (see `salon.readers.STREAMING_READERS`):
+    either the triples of its single sequence, or those of the whole alignment (without sequences).
+    """
+    if part.sequences:
+        return itertools.chain.from_iterable(sequence_triples(part, sequence) for sequence in part.sequences)
+    return alignment_triples(part)
+
 
-        if True:  # TODO: check if protein or dna
-            graph.add((seq_uri, RDF.type, namespace.ProteinAlignmentSequence))
+def iter_triples(filepath: str) -> Iterator[Triple]:
+    """
+    Yields RDF triples for every alignment in an input file. Formats with a streaming reader (e.g., MACSIM/XML) are
+    read one sequence at a time, so that memory use does not depend on the number of sequences.
+
+    :param filepath: Input file path (see `salon.readers.READERS`).
+    :return: Iterator over RDF triples.
+    """
+    stream = get_streaming_reader(filepath)
+    if stream is not None:
+        return itertools.chain.from_iterable(map(_streamed_triples, stream(filepath)))
+    return itertools.chain.from_iterable(map(alignment_triples, read_alignments(filepath)))
+
+
+def to_graph(filepath: str) -> Graph:
+    """
+    Transforms every alignment in an input file into an RDF graph.
+
+    :param filepath: Input file path (see `salon.readers.READERS`).
+    :return: RDF graph.
+    """
+    sink = GraphSink()
+    sink.addN(iter_triples(filepath))
+    return sink.graph
 
-        graph.add((seq_uri, namespace.sequence, Literal(record.seq.upper())))
-        graph.add((seq_uri, namespace.length, Literal(len(record))))
-        graph.add((seq_uri, namespace.accessionNumber, Literal(record.id.upper())))
 
-    return graph
+# kept for backwards compatibility
+from_macsim_xml_instance = from_fasta = to_graph
+
+
+def convert(
+    input_path: str,
+    output_path: str,
+    stats: bool = False,
+    ontology: str = None,
+    index: bool = False,
+    dedup: bool = False,
+) -> int:
+    """
+    Transforms every alignment in an input file into RDF and writes it to `output_path`. N-Quads outputs get one
+    named graph per alignment.
+
+    :param input_path: Input file path (see `salon.readers.READERS`).
+    :param output_path: Output file path.
+    :param stats: Whether to add the alignment metrics (see `statistics_triples`).
+    :param ontology: Path to the ontology whose SWRL rules (and property and class axioms) are materialized for each
+        alignment, if any (see `salon.reasoner.Reasoner`).
+    :param index: Whether to write the feature index and coordinate maps of every alignment alongside the output
+        (see `salon.intervals.FeatureIndex`).
+    :param dedup: Whether ungapped residues are written once, as shared resources in the default graph, and linked
+        from the sequences (see `residue_triples`).
+    :return: Number of triples written.
+    """
+    stream = get_streaming_reader(input_path)
+    if stream is not None and not (stats or ontology or index or dedup):
+        # every other option needs whole alignments
+        count = 0
+        with open_sink(output_path) as sink:
+            for part in stream(input_path):
+                sink.set_graph(URIRef(f"{settings.ONTOLOGY_IRI}{part.name}"))
+                count += sink.addN(_streamed_triples(part))
+        return count
+
+    reasoner = load_reasoner(ontology) if ontology else None
+    features = FeatureIndex()
+    digests = set()
+
+    count = 0
+    with open_sink(output_path) as sink:
+        for alignment in read_alignments(input_path):
+            if index:
+                features.add(alignment)
+            if dedup:
+                sink.set_graph(None)
+                count += sink.addN(residue_triples(alignment, digests))
+            sink.set_graph(URIRef(f"{settings.ONTOLOGY_IRI}{alignment.name}"))
+            triples = alignment_triples(alignment, dedup=dedup)
+            if stats:
+                triples = itertools.chain(triples, statistics_triples(alignment))
+            if reasoner is None:
+                count += sink.addN(triples)
+                continue
+
+            triples = list(triples)
+            count += sink.addN(triples)
+            count += sink.addN(sorted(reasoner.infer(triples)))
+
+    if index:
+        features.save(index_path(output_path))
+    return count
+
+
+def _convert_task(
+    input_path: str,
+    output_path: str,
+    stats: bool = False,
+    ontology: str = None,
+    index: bool = False,
+    dedup: bool = False,
+) -> Tuple[int, float]:
+    """
+    Process pool task, returns the number of triples written and elapsed time (seconds).
+    """
+    start = time.perf_counter()
+    triples = convert(input_path, output_path, stats=stats, ontology=ontology, index=index, dedup=dedup)
+    return triples, time.perf_counter() - start
+
+
+def _copy_part(part: TextIO, merged: TextIO, seen: Set[str] = None) -> None:
+    """
+    Appends a partial N-Quads output to the merged one, skipping the shared residues already in it (if `seen`, the
+    set of their statements, is given).
+    """
+    if seen is None:
+        shutil.copyfileobj(part, merged)
+        return
+
+    prefix = f"<{settings.ONTOLOGY_IRI}residues-"
+    for line in part:
+        if line.startswith(prefix):
+            if line in seen:
+                continue
+            seen.add(line)
+        merged.write(line)
+
+
+def _find_inputs(input_path: str) -> List[str]:
+    """
+    Returns the alignment files in a directory or matching a glob pattern, sorted by name.
+    """
+    if Path(input_path).is_dir():
+        candidates = Path(input_path).iterdir()
+    else:
+        candidates = map(Path, glob.glob(input_path, recursive=True))
+    return sorted(str(path) for path in candidates if path.is_file() and is_supported(str(path)))
+
+
+def check_alignment_names(input_paths: List[str]) -> None:
+    """
+    Checks that no two input files are named after the same alignment (see `alignment_name`), e.g., `a.fasta` and
+    `nested/a.fasta`, as both alignments would share their URIs (and named graph), i.e., be merged into one. Names
+    given within files (e.g., `#=GF ID` annotations of Stockholm files) are not checked.
+
+    :raise ValueError: If many input files are named after the same alignment.
+    """
+    names = {}
+    for path in input_paths:
+        other = names.setdefault(alignment_name(path), path)
+        if other != path:
+            raise ValueError(f"{other} and {path} would both be parsed as alignment {alignment_name(path)}")
+
+
+def output_files(input_paths: List[str], output_dir: str, output_format: str = "nt") -> Dict[str, str]:
+    """
+    Returns the per-file output path of each input file in batch mode (see `parse_batch`).
+
+    :raise ValueError: If many input files would be written to the same output file (e.g., `a.fasta` and `a.xml`).
+    """
+    outputs, written = {}, {}
+    for path in input_paths:
+        outputs[path] = output = str(Path(output_dir, f"{alignment_name(path)}.{output_format}"))
+        # compared regardless of case, as file names may not be case-sensitive
+        other = written.setdefault(output.casefold(), path)
+        if other != path:
+            raise ValueError(f"{other} and {path} would both be written to {output}")
+    return outputs
+
+
+def parse_batch(
+    input_paths: List[str],
+    output_path: str,
+    output_format: str = "nt",
+    workers: int = None,
+    stats: bool = False,
+    ontology: str = None,
+    index: bool = False,
+    dedup: bool = False,
+) -> dict:
+    """
+    Transforms many input alignments across a pool of processes. If `output_path` is an N-Quads file (optionally
+    compressed), every alignment is merged into it within its own named graph; otherwise, `output_path` is used as
+    output directory and each alignment is written to a file named after the input one (see `alignment_name`), with
+    extension `output_format`.
+
+    Failures are reported (and returned) without stopping the batch. With `dedup`, residues shared by many input
+    files are only written once to merged outputs.
+
+    :return: Mapping of input file path to either number of triples and elapsed time or raised exception.
+    :raise ValueError: If many input files are named after the same alignment (see `check_alignment_names`) or would
+        be written to the same output file.
+    """
+    extension, _ = split_suffix(output_path)
+    merge = extension == "nq"
+
+    check_alignment_names(input_paths)
+
+    if not merge:
+        outputs = output_files(input_paths, output_path, output_format)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if merge:
+            outputs = {path: str(Path(tmp, f"{i}.nq")) for i, path in enumerate(input_paths)}
+        else:
+            Path(output_path).mkdir(parents=True, exist_ok=True)
+
+        results = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_convert_task, path, outputs[path], stats, ontology, index, dedup): path
+                for path in input_paths
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    results[path] = triples, seconds = future.result()
+                    click.echo(f"{path}: {triples} triples in {seconds:.2f}s")
+                except Exception as e:
+                    results[path] = e
+                    click.echo(f"{path}: failed ({e!r})", err=True)
+
+        if merge:
+            features, seen = FeatureIndex(), set() if dedup else None
+            with open_text(output_path, "wt") as merged:
+                for path in input_paths:
+                    if not isinstance(results[path], Exception):
+                        with open(outputs[path], encoding="utf-8") as part:
+                            _copy_part(part, merged, seen)
+                        if index:
+                            features.update(FeatureIndex.load(index_path(outputs[path])))
+            if index:
+                features.save(index_path(output_path))
+
+    return results
 
 
 @click.command()
 @click.option(
     "--input-path",
     "-i",
-    help="Input file path (FASTA, MACSIM/XML)",
+    help="Input file path (MACSIM/XML, FASTA, A2M/A3M, Stockholm, Clustal, PHYLIP; optionally .gz, .bz2, .xz or .zst "
+    "compressed), or directory or glob pattern (quoted) of input files for batch mode.",
+)
+@click.option(
+    "--output-path",
+    "-o",
+    default=None,
+    help="Output file path. N-Triples/N-Quads outputs (.nt, .nq, optionally .gz, .bz2, .xz or .zst compressed) and "
+    "Turtle outputs (.ttl) are streamed to disk as triples are produced, any other syntax is built in memory. In "
+    "batch mode, either an N-Quads file to merge every alignment into (one named graph each) or an output directory.  [default: output.ttl, or output/ in batch mode]",
+)
+@click.option(
+    "--output-format",
+    "-f",
+    default="nt",
+    show_default=True,
+    help="Extension of per-file outputs in batch mode (e.g., ttl, nt, nt.gz).",
+)
+@click.option("--workers", "-w", type=int, default=None, help="Number of worker processes in batch mode.")
+@click.option(
+    "--stats",
+    is_flag=True,
+    help="Compute alignment metrics (percent identity, gap fraction, sum-of-pairs and column conservation) and add "
+    "them as alignment, sequence and column scores.",
+)
+@click.option(
+    "--infer",
+    is_flag=True,
+    help="Materialize the facts inferred by the SWRL rules (and property and class axioms) of the ontology for each "
+    "alignment, so that no reasoner is needed at query time (e.g., on Virtuoso).",
+)
+@click.option(
+    "--ontology",
+    default="SALON.owl",
+    show_default=True,
+    type=click.Path(dir_okay=False),
+    help="Ontology (RDF/XML) whose rules are materialized with --infer.",
+)
+@click.option(
+    "--index",
+    is_flag=True,
+    help="Write an index of sequence features (by alignment column) and of column/residue coordinate maps alongside "
+    "the output (<output>.index), see `saloncli features`.",
+)
+@click.option(
+    "--dedup",
+    is_flag=True,
+    help="Store the ungapped residues of every distinct sequence once (identified by their content hash) and link "
+    "sequences to them along with their gap runs, instead of writing the aligned sequence of each.",
 )
-@click.option("--output-path", "-o", default="output.ttl", help="Output file path.")
-def parse(input_path: str, output_path: str):
+def parse(
+    input_path: str,
+    output_path: str,
+    output_format: str,
+    workers: int,
+    stats: bool,
+    infer: bool,
+    ontology: str,
+    index: bool,
+    dedup: bool,
+):
     """
-    Supported formats: MACSIM/XML, FASTA.
+    Supported formats: MACSIM/XML, FASTA, A2M/A3M, Stockholm, Clustal, PHYLIP.
     """
-    in_extension = Path(input_path).suffix.lower()
-    out_extension = Path(output_path).suffix[1:].lower()
-
-    if in_extension == ".xml":
-        graph = from_macsim_xml_instance(input_path)
-    elif in_extension == ".fa" or in_extension == ".fasta":
-        graph = from_fasta(input_path)
-    else:
-        raise ValueError("Input file not supported, try one of these extensions instead: .xml, .fasta, .fa")
-
-    graph.serialize(destination=output_path, format=out_extension)
+    ontology = ontology if infer else None
+    if Path(input_path).is_file():
+        convert(input_path, output_path or "output.ttl", stats=stats, ontology=ontology, index=index, dedup=dedup)
+        return
+
+    input_paths = _find_inputs(input_path)
+    if not input_paths:
+        raise click.BadParameter(f"No input files found in {input_path}", param_hint="--input-path")
+
+    output_path = output_path or "output"
+    try:
+        check_alignment_names(input_paths)
+        if split_suffix(output_path)[0] != "nq":
+            output_files(input_paths, output_path, output_format)
+    except ValueError as e:
+        raise click.BadParameter(f"{e}, so either of them must be renamed", param_hint="--input-path")
+
+    start = time.perf_counter()
+    results = parse_batch(
+        input_paths,
+        output_path,
+        output_format=output_format,
+        workers=workers,
+        stats=stats,
+        ontology=ontology,
+        index=index,
+        dedup=dedup,
+    )
+    failures = sum(isinstance(result, Exception) for result in results.values())
+
+    click.echo(
+        f"Parsed {len(results) - failures} of {len(results)} files in {time.perf_counter() - start:.2f}s "
+        f"({failures} failed)"
+    )
+    if failures:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+import logging
+import secrets
+import signal
+import sys
+
+import click
+
+from salon.server import SalonService, make_server
+from salon.server import serve as serve_forever
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to listen on.")
+@click.option("--port", "-p", default=8421, show_default=True, help="Port to listen on.")
+@click.option("--socket", "-s", "socket_path", help="Unix socket to listen on (instead of --host and --port).")
+@click.option(
+    "--token",
+    envvar="SALON_TOKEN",
+    help="Token that clients must send (in SALON_TOKEN) over TCP. A random one is generated (and printed) if not "
+    "given.  [env var: SALON_TOKEN]",
+)
+@click.option(
+    "--root",
+    type=click.Path(exists=True, file_okay=False),
+    default=".",
+    show_default=True,
+    help="Directory that commands may be run within (i.e., clients' working directory), with its subdirectories. "
+    "Paths given to commands are not checked, so this is not a sandbox.",
+)
+@click.option(
+    "--ontology",
+    default="SALON.owl",
+    show_default=True,
+    type=click.Path(dir_okay=False),
+    help="Ontology whose snapshot and reasoner are loaded upfront (if found).",
+)
+@click.option(
+    "--result-cache/--no-result-cache",
+    default=True,
+    show_default=True,
+    help="Cache query results across commands (invalidated by the writes made through the service).",
+)
+def serve(host: str, port: int, socket_path: str, token: str, root: str, ontology: str, result_cache: bool):
+    """
+    Runs commands sent by `saloncli --server <address>` (or with SALON_SERVER set) in this process, so that imports,
+    repository connections and caches are set up once instead of on every call.
+    """
+    if not (socket_path or token):
+        token = secrets.token_urlsafe(32)
+        click.echo(f"Generated token: {token}")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    service = SalonService(ontology=ontology, result_cache=result_cache, root=root)
+    server = make_server(service, host=host, port=port, socket=socket_path, token=token)
+
+    address = f"unix://{socket_path}" if socket_path else f"http://{host}:{server.server_address[1]}"
+    environment = f"SALON_SERVER={address}" if socket_path else f"SALON_SERVER={address} SALON_TOKEN=<token>"
+    click.echo(f"Serving on {address} (run commands with {environment} saloncli ...)")
+    # stopped gracefully (i.e., removing its socket) on termination too
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        serve_forever(server)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    serve()
@@ -1,3 +1,5 @@
+from pathlib import Path
+
 from pydantic import BaseSettings
 
 
@@ -5,11 +7,49 @@ class _BaseSettings(BaseSettings):
     ONTOLOGY_IRI: str = "https://w3id.org/salon#"
     ONTOLOGY_NAMESPACE: str = "salon"
 
+    # RDF repository backend: "stardog", "virtuoso" or "oxigraph" (embedded store, no server required)
+    BACKEND: str = "stardog"
+
     STARDOG_ENDPOINT: str = "http://localhost:5820"
     STARDOG_USERNAME: str = "admin"
     STARDOG_PASSWORD: str = "admin"
     STARDOG_DATABASE: str = "SALON"
 
+    VIRTUOSO_ENDPOINT: str = "http://localhost:8890/sparql-auth"
+    VIRTUOSO_USERNAME: str = "dba"
+    VIRTUOSO_PASSWORD: str = "dba"
+    VIRTUOSO_GRAPH: str = "https://w3id.org/salon"
+
+    # on-disk location of the embedded store (in memory if empty)
+    OXIGRAPH_PATH: str = str(Path.home() / ".cache" / "salon" / "oxigraph")
+
+    # federated queries to UniProt (can be replaced by a local stand-in for offline testing)
+    UNIPROT_ENDPOINT: str = "http://sparql.uniprot.org/sparql"
+
+    # local cache of UniProt lookups (time-to-live in seconds)
+    UNIPROT_CACHE_PATH: str = str(Path.home() / ".cache" / "salon" / "uniprot.sqlite")
+    UNIPROT_CACHE_TTL: int = 30 * 24 * 60 * 60
+    UNIPROT_CACHE_MAX_ENTRIES: int = 100000
+
+    # compiled ontology snapshots (see `salon.schema`), keyed by ontology hash
+    ONTOLOGY_SNAPSHOT_DIR: str = str(Path.home() / ".cache" / "salon" / "ontology")
+
+    # record of the statements loaded from each file, for incremental loads
+    MANIFEST_PATH: str = str(Path.home() / ".cache" / "salon" / "manifest.sqlite")
+
+    # in-memory cache of query results of repository clients, invalidated on writes (disabled if 0, time-to-live in
+    # seconds, no expiry if 0)
+    RESULT_CACHE_MAX_ENTRIES: int = 0
+    RESULT_CACHE_TTL: float = 300.0
+
+    # connection pool of repository clients
+    HTTP_TIMEOUT: float = 60.0
+    HTTP_MAX_CONNECTIONS: int = 10
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+
+    # maximum number of requests in flight at once
+    CONCURRENCY: int = 8
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,67 @@
+from typing import Optional
+
+from salon.config import settings
+from salon.database.cache import ResultCache, open_result_cache
+from salon.database.repository import RDFRepository
+from salon.database.stardog import Stardog
+from salon.database.virtuoso import Virtuoso
+
+BACKENDS = ("stardog", "virtuoso", "oxigraph")
+
+# repository kept open across commands by `saloncli serve` (see `salon.server`)
+_shared: Optional[RDFRepository] = None
+
+
+def share_repository(repository: Optional[RDFRepository]) -> None:
+    """
+    Makes `open_repository` return the given repository (instead of a new one) until called again with `None`, so
+    that its connections and caches are reused by every command run in this process.
+    """
+    global _shared
+    if repository is not None:
+        repository.keep_alive = True
+    _shared = repository
+
+
+def open_repository(backend: str = None, cache: ResultCache = None) -> RDFRepository:
+    """
+    Returns the RDF repository client of a backend, configured from settings.
+
+    :param backend: One of `BACKENDS` (default: `BACKEND` setting).
+    :param cache: Result cache to use (default: as configured in settings, see `salon.database.cache`).
+    :return: Repository, or the shared one if any (see `share_repository`) and neither `backend` nor `cache` is given.
+    """
+    if _shared is not None and backend is None and cache is None:
+        return _shared
+
+    backend = (backend or settings.BACKEND).lower()
+    pool = dict(
+        timeout=settings.HTTP_TIMEOUT,
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        result_cache=cache if cache is not None else open_result_cache(),
+    )
+
+    if backend == "stardog":
+        return Stardog(
+            endpoint=settings.STARDOG_ENDPOINT,
+            database=settings.STARDOG_DATABASE,
+            username=settings.STARDOG_USERNAME,
+            password=settings.STARDOG_PASSWORD,
+            **pool,
+        )
+    if backend == "virtuoso":
+        return Virtuoso(
+            endpoint=settings.VIRTUOSO_ENDPOINT,
+            database=settings.VIRTUOSO_GRAPH,
+            username=settings.VIRTUOSO_USERNAME,
+            password=settings.VIRTUOSO_PASSWORD,
+            **pool,
+        )
+    if backend == "oxigraph":
+        # optional dependency, only imported when used
+        from salon.database.oxigraph import Oxigraph
+
+        return Oxigraph(settings.OXIGRAPH_PATH or None, result_cache=pool["result_cache"])
+
+    raise ValueError(f"Unknown backend: {backend} (expected one of {', '.join(BACKENDS)})")
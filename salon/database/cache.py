@@ -0,0 +1,136 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+from salon.config import settings
+
+# string literals and IRIs (kept as they are), or runs of whitespace (collapsed)
+_TOKEN = re.compile(r'("""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|<[^<>\s]*>)|\s+')
+
+# dataset clauses, which restrict the graphs read by a query
+_DATASET_CLAUSE = re.compile(r"\bFROM\s+(?:NAMED\s+)?<([^<>\s]*)>", re.IGNORECASE)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Returns the query text with every run of whitespace (outside literals) collapsed, so that queries differing only
+    in layout share cache entries.
+    """
+    return _TOKEN.sub(lambda match: match.group(1) or " ", query).strip()
+
+
+def query_graphs(query: str) -> Optional[FrozenSet[str]]:
+    """
+    Returns the named graphs read by a query, as given by its dataset clauses (`FROM` and `FROM NAMED`), or `None` if
+    it has none (i.e., it may read the whole dataset).
+    """
+    graphs = frozenset(_DATASET_CLAUSE.findall(query))
+    return graphs or None
+
+
+class ResultCache:
+    """
+    In-memory LRU cache of query results, keyed by dataset (i.e., repository endpoint and database) and normalized
+    query text. Entries expire after `ttl` seconds (if given), and the least recently used ones are evicted whenever
+    the cache holds more than `max_entries`.
+
+    Entries are invalidated by writes to their dataset (see `invalidate`). Queries with dataset clauses only depend on
+    the named graphs they list, so writes to other graphs keep them; any other query may read every graph (e.g., if
+    the default graph is their union) and is dropped by any write. Writes made by other processes are not seen, so
+    `ttl` bounds how stale results can be.
+
+    Cached results are shared, and must not be modified by callers. The cache is thread-safe, so that it can be shared
+    by many repositories (e.g., of a long-running service).
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+        # (dataset, query) -> (expiry time, graphs read, result)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Optional[FrozenSet[str]], dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, dataset: str, query: str) -> Optional[dict]:
+        """
+        Returns the cached result of a query, or `None` if not found (or expired).
+        """
+        key = (dataset, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, dataset: str, query: str, result: dict) -> None:
+        """
+        Stores the result of a query, evicting the least recently used entries if needed.
+        """
+        expires = time.monotonic() + self.ttl if self.ttl else float("inf")
+        key = (dataset, normalize_query(query))
+        with self._lock:
+            self._entries[key] = (expires, query_graphs(query), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, dataset: str, graphs: Iterable[str] = None) -> None:
+        """
+        Drops the entries of a dataset affected by a write.
+
+        :param graphs: Named graphs written to (an empty iterable for the default graph only). Every entry of the
+            dataset is dropped if not given, e.g., after arbitrary updates.
+        """
+        graphs = None if graphs is None else frozenset(graphs)
+        with self._lock:
+            stale = [
+                key
+                for key, (_, read, _) in self._entries.items()
+                if key[0] == dataset and (graphs is None or read is None or read & graphs)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    @property
+    def stats(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses ({self.hit_rate:.0%} hit rate), "
+            f"{self.invalidations} invalidated, {self.evictions} evicted"
+        )
+
+
+def open_result_cache() -> Optional[ResultCache]:
+    """
+    Returns the result cache configured in settings, or `None` if disabled (i.e., `RESULT_CACHE_MAX_ENTRIES` is 0).
+    """
+    if settings.RESULT_CACHE_MAX_ENTRIES <= 0:
+        return None
+    return ResultCache(max_entries=settings.RESULT_CACHE_MAX_ENTRIES, ttl=settings.RESULT_CACHE_TTL or None)
@@ -0,0 +1,148 @@
+import asyncio
+import functools
+import gzip
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, Iterator, Optional, Union
+
+from salon.database.repository import RDFRepository
+from salon.schema import load_snapshot
+from salon.sink import Triple, nt_term, open_text, split_suffix
+
+try:
+    import pyoxigraph
+except ImportError:
+    pyoxigraph = None
+
+XSD_STRING = "http://www.w3.org/2001/XMLSchema#string"
+
+
+def _term(term) -> dict:
+    """
+    Returns an Oxigraph term in the SPARQL JSON results format.
+    """
+    if isinstance(term, pyoxigraph.NamedNode):
+        return {"type": "uri", "value": term.value}
+    if isinstance(term, pyoxigraph.BlankNode):
+        return {"type": "bnode", "value": term.value}
+
+    binding = {"type": "literal", "value": term.value}
+    if term.language:
+        binding["xml:lang"] = term.language
+    elif term.datatype.value != XSD_STRING:
+        binding["datatype"] = term.datatype.value
+    return binding
+
+
+class Oxigraph(RDFRepository):
+    """
+    Embedded (in-process) Oxigraph graph store, kept on disk at `path` (or in memory if no path is given). Queries and
+    updates run without any server nor network round-trip, which makes it suitable for offline pipelines and tests,
+    and as a latency baseline against remote stores.
+
+    Requires pyoxigraph (`pip install saloncli[oxigraph]`).
+    """
+
+    union_default_graph = True
+
+    def __init__(self, path: str = None, **kwargs):
+        if pyoxigraph is None:
+            raise ImportError("pyoxigraph is required by the embedded backend, try: pip install pyoxigraph")
+        super().__init__(endpoint=path or ":memory:", database="default", **kwargs)
+
+        if path:
+            Path(path).mkdir(parents=True, exist_ok=True)
+        self.store = pyoxigraph.Store(path)
+
+    def init(self, filename: str):
+        """
+        Initialize the database by loading the ontology (from the N-Triples payload of its snapshot, see
+        `salon.schema`) into the default graph.
+        """
+        self.store.clear_graph(pyoxigraph.DefaultGraph())
+        self.store.bulk_load(gzip.decompress(load_snapshot(filename).ntriples), format=pyoxigraph.RdfFormat.N_TRIPLES)
+        self.store.flush()
+        self._invalidate()
+
+    def bulk_add(
+        self,
+        triples_or_file: Union[str, Path, Iterable[Union[str, Triple]]],
+        graph: Optional[str] = None,
+        replace: bool = False,
+    ):
+        """
+        Adds RDF data to the store without SPARQL parsing.
+
+        :param triples_or_file: Either path to an RDF file (optionally compressed) or iterable of triples, given as
+            rdflib terms or N-Triples statements.
+        :param graph: Named graph URI to add the data to (default graph if none).
+        :param replace: Whether the named graph is cleared first.
+        """
+        if replace and not graph:
+            raise ValueError("Only named graphs can be replaced")
+
+        to_graph = pyoxigraph.NamedNode(graph) if graph else None
+        if replace:
+            self.store.remove_graph(to_graph)
+
+        if isinstance(triples_or_file, (str, Path)):
+            extension, _ = split_suffix(str(triples_or_file))
+            with open_text(str(triples_or_file), "rb") as f:
+                self.store.bulk_load(f, format=pyoxigraph.RdfFormat.from_extension(extension), to_graph=to_graph)
+        else:
+            lines = (
+                triple if isinstance(triple, str) else " ".join(map(nt_term, triple)) for triple in triples_or_file
+            )
+            data = "".join(f"{line} .\n" for line in lines)
+            self.store.load(data, format=pyoxigraph.RdfFormat.N_TRIPLES, to_graph=to_graph)
+        self._invalidate([graph] if graph else ())
+
+    def _solutions(self, query: str):
+        self._log("query", query)
+        # the default graph is the union of every named graph (i.e., alignment), as in databases created by Stardog
+        return self.store.query(query, use_default_graph_as_union=True)
+
+    def _query(self, query: str) -> dict:
+        solutions = self._solutions(query)
+        if isinstance(solutions, pyoxigraph.QueryBoolean):
+            return {"head": {}, "boolean": bool(solutions)}
+
+        variables = [variable.value for variable in solutions.variables]
+        return {"head": {"vars": variables}, "results": {"bindings": [self._bindings(s, variables) for s in solutions]}}
+
+    @staticmethod
+    def _bindings(solution, variables) -> Dict[str, dict]:
+        return {variable: _term(solution[variable]) for variable in variables if solution[variable] is not None}
+
+    def _update(self, query: str) -> None:
+        self._log("update query", query)
+        self.store.update(query)
+
+    def query_iter(self, query: str, page_size: int = None) -> Iterator[Dict[str, dict]]:
+        """
+        Performs a `SELECT` query against the store and yields its solutions as they are computed. `page_size` is
+        ignored, as results are never sent over the network.
+        """
+        solutions = self._solutions(query)
+        variables = [variable.value for variable in solutions.variables]
+        for solution in solutions:
+            yield self._bindings(solution, variables)
+
+    async def _aquery(self, query: str) -> dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self._query, query))
+
+    async def _aupdate(self, query: str) -> None:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self._update, query))
+
+    async def aquery_iter(self, query: str, page_size: int = None) -> AsyncIterator[Dict[str, dict]]:
+        """
+        Asynchronous counterpart of `query_iter`. Solutions are computed in process, so they are yielded without
+        awaiting.
+        """
+        for bindings in self.query_iter(query, page_size):
+            yield bindings
+
+    def close(self) -> None:
+        self.store.flush()
+        super().close()
@@ -0,0 +1,107 @@
+import functools
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+import click
+from rdflib import Literal, URIRef
+
+from salon.sink import nt_term
+
+# template parameters, e.g., `$alignment`
+_PARAMETER = re.compile(r"\$([A-Za-z_]\w*)")
+
+# characters not allowed in IRIs (see the IRIREF production of SPARQL 1.1)
+_INVALID_IRI = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+
+Value = Union[str, int, float, URIRef, Literal]
+
+
+def is_iri(value: str) -> bool:
+    """
+    Returns whether a value can be written as an IRI in SPARQL (and N-Triples) without escaping.
+    """
+    return bool(value) and not _INVALID_IRI.search(value)
+
+
+class IRIType(click.ParamType):
+    """
+    Command-line parameter holding an IRI (e.g., of a sequence), checked before it is bound to any query.
+    """
+
+    name = "iri"
+
+    def convert(self, value, param, ctx):
+        if not is_iri(value):
+            self.fail(f"{value!r} is not a valid IRI", param, ctx)
+        return value
+
+
+IRI = IRIType()
+
+
+def sparql_term(value: Value) -> str:
+    """
+    Returns the SPARQL representation of a parameter value. Strings and `URIRef` are taken as IRIs, any other value
+    as literal (escaped, so that values can never change the structure of a query).
+
+    :raise ValueError: If an IRI contains characters not allowed in SPARQL.
+    """
+    if isinstance(value, Literal):
+        return nt_term(value)
+    if isinstance(value, str):
+        if not is_iri(value):
+            raise ValueError(f"Invalid IRI: {value!r}")
+        return f"<{value}>"
+    return nt_term(Literal(value))
+
+
+class QueryTemplate:
+    """
+    SPARQL query compiled once, whose `$name` parameters are bound to values on each call. Parameters bound to many
+    values (e.g., in `VALUES ?seq { $seqs }`) are rendered as a list of terms, so that a single query covers a whole
+    batch. Rendered queries are cached by parameter values, so that repeated calls neither re-render them nor send
+    different texts (and plans) to the server for the same values.
+
+    `$name` is reserved for parameters, so templates must use `?name` for SPARQL variables.
+    """
+
+    def __init__(self, text: str, cache_size: int = 1024):
+        tokens = _PARAMETER.split(text)
+        # literal text parts, interleaved with parameter names
+        self.parts: Tuple[str, ...] = tuple(tokens[0::2])
+        self.parameters: Tuple[str, ...] = tuple(tokens[1::2])
+        self._render = functools.lru_cache(maxsize=cache_size)(self._render_uncached)
+
+    def _render_uncached(self, values: Tuple[Tuple[str, ...], ...]) -> str:
+        chunks = [self.parts[0]]
+        for terms, part in zip(values, self.parts[1:]):
+            chunks.append(" ".join(terms))
+            chunks.append(part)
+        return "".join(chunks)
+
+    def render(self, **params: Union[Value, Iterable[Value]]) -> str:
+        """
+        Returns the query with every parameter bound. Parameters given many values (any iterable but strings) are
+        rendered as a space-separated list of terms, without duplicates.
+
+        :raise KeyError: If any parameter is not given.
+        """
+        bound: Dict[str, Tuple[str, ...]] = {}
+        for name in set(self.parameters):
+            value = params[name]
+            if isinstance(value, (str, int, float, Literal)):
+                bound[name] = (sparql_term(value),)
+            else:
+                bound[name] = tuple(dict.fromkeys(map(sparql_term, value)))
+        return self._render(tuple(bound[name] for name in self.parameters))
+
+    @property
+    def cache_info(self):
+        return self._render.cache_info()
+
+
+def batches(values: Sequence[Value], batch_size: int) -> List[Sequence[Value]]:
+    """
+    Splits parameter values into batches of at most `batch_size` values, each bound to one query.
+    """
+    return [values[i : i + batch_size] for i in range(0, len(values), batch_size)]
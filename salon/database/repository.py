@@ -1,23 +1,348 @@
+import asyncio
+import logging
 from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+import httpx
+
+from salon.database.cache import ResultCache
+from salon.database.results import TSVReader, iter_tsv_bindings
+from salon.sink import Triple, nt_term
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+async def gather_bounded(aws: Iterable[Awaitable[T]], concurrency: int = 8) -> List[T]:
+    """
+    Awaits every awaitable in `aws` concurrently, with at most `concurrency` of them in flight at once.
+
+    :return: Results, in the same order as `aws`.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(bounded(aw) for aw in aws))
 
 
 class RDFRepository(ABC):
-    def __init__(self, endpoint: str, database: str, username: str = None, password: str = None):
+    """
+    Base class for RDF repositories. Every repository keeps one long-lived HTTP client, so that connections (and
+    authentication) are reused across requests; call `close` (or use the repository as a context manager) to release
+    them.
+
+    Both blocking (`query`, `update`) and asynchronous (`aquery`, `aupdate`) methods are provided; the latter run on a
+    pooled `httpx.AsyncClient` and should be used to keep many independent requests in flight at once (see
+    `gather_bounded`).
+
+    Large `SELECT` results should be consumed through `query_iter` (or `aquery_iter`), which streams rows as they
+    arrive instead of loading the whole result set in memory.
+
+    Results of `query` and `aquery` are kept in `result_cache`, if given, so that repeated reads are served without any
+    request; entries are invalidated by every write made through the repository (`update`, `bulk_add`, `drop_graph`
+    and `init`). Streamed results are never cached. Subclasses implement the uncached `_query`, `_update`, `_aquery`
+    and `_aupdate` methods.
+    """
+
+    # whether queries read the union of every named graph (e.g., alignment) as default graph, so that triples loaded
+    # into named graphs are found by unscoped queries
+    union_default_graph = False
+
+    def __init__(
+        self,
+        endpoint: str,
+        database: str,
+        username: str = None,
+        password: str = None,
+        timeout: float = 60.0,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 10,
+        result_cache: ResultCache = None,
+    ):
         self.endpoint = endpoint
         self.database = database
         self.username = username
         self.password = password
+        self.result_cache = result_cache
+        # whether pooled connections outlive `close` (e.g., for repositories shared across commands, see `salon.server`)
+        self.keep_alive = False
 
-    @abstractmethod
-    async def query(self, query: str) -> dict:
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+
+    def _auth(self) -> Optional[httpx.Auth]:
         """
-        Performs a query against the database.
+        Returns the authentication scheme used by the HTTP client.
         """
-        pass
+        if self.username:
+            return httpx.BasicAuth(self.username, self.password)
+        return None
 
-    @abstractmethod
-    async def update(self, query: str) -> None:
+    @property
+    def client(self) -> httpx.Client:
+        """
+        Pooled HTTP client, created on first use.
+        """
+        if self._client is None:
+            self._client = httpx.Client(auth=self._auth(), timeout=self.timeout, limits=self.limits)
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """
+        Pooled asynchronous HTTP client, created on first use.
+        """
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(auth=self._auth(), timeout=self.timeout, limits=self.limits)
+        return self._async_client
+
+    @property
+    def dataset(self) -> str:
+        """
+        Identifier of the database, shared by every client of the same endpoint and database.
+        """
+        return f"{self.endpoint}/{self.database}"
+
+    def close(self) -> None:
+        """
+        Closes every pooled connection, unless `keep_alive` is set.
+        """
+        if self.keep_alive:
+            return
+        if self.result_cache is not None:
+            logger.info("Result cache: %s", self.result_cache.stats)
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        """
+        Closes every pooled connection, including those of the asynchronous client. The latter is always closed, as it
+        is bound to the running event loop.
+        """
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    def query(self, query: str) -> dict:
+        """
+        Performs a query against the database, or returns its cached result.
+        """
+        if self.result_cache is None:
+            return self._query(query)
+
+        result = self.result_cache.get(self.dataset, query)
+        if result is None:
+            result = self._query(query)
+            self.result_cache.put(self.dataset, query, result)
+        return result
+
+    def update(self, query: str) -> None:
         """
         Performs an update query against the database.
         """
+        result = self._update(query)
+        self._invalidate()
+        return result
+
+    async def aquery(self, query: str) -> dict:
+        """
+        Performs a query against the database without blocking the event loop, or returns its cached result.
+        """
+        if self.result_cache is None:
+            return await self._aquery(query)
+
+        result = self.result_cache.get(self.dataset, query)
+        if result is None:
+            result = await self._aquery(query)
+            self.result_cache.put(self.dataset, query, result)
+        return result
+
+    async def aupdate(self, query: str) -> None:
+        """
+        Performs an update query against the database without blocking the event loop.
+        """
+        result = await self._aupdate(query)
+        self._invalidate()
+        return result
+
+    def _invalidate(self, graphs: Iterable[str] = None) -> None:
+        """
+        Drops the cached results affected by a write to the given named graphs (see `ResultCache.invalidate`), or by
+        any write if not given.
+        """
+        if self.result_cache is not None:
+            self.result_cache.invalidate(self.dataset, graphs)
+
+    @abstractmethod
+    def _query(self, query: str) -> dict:
+        pass
+
+    @abstractmethod
+    def _update(self, query: str) -> None:
+        pass
+
+    @abstractmethod
+    async def _aquery(self, query: str) -> dict:
+        pass
+
+    @abstractmethod
+    async def _aupdate(self, query: str) -> None:
         pass
+
+    def init(self, filename: str):
+        """
+        Initialize the database by creating the required schema (i.e., loading the ontology in `filename`).
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support initialisation, load the ontology instead")
+
+    def bulk_add(
+        self,
+        triples_or_file: Union[str, Path, Iterable[Union[str, Triple]]],
+        graph: Optional[str] = None,
+        replace: bool = False,
+    ):
+        """
+        Adds RDF data to the database. By default, triples are sent as a single SPARQL `INSERT DATA` update (preceded
+        by `DROP SILENT GRAPH` if `replace` is set); repositories override it with their native bulk-loading API.
+
+        :param triples_or_file: Iterable of triples, given as rdflib terms or N-Triples statements (RDF files are
+            only supported by native implementations).
+        :param graph: Named graph URI to add the data to (default graph if none).
+        :param replace: Whether the named graph is cleared first, within the same update.
+        """
+        if isinstance(triples_or_file, (str, Path)):
+            raise NotImplementedError(f"{type(self).__name__} does not support loading RDF files")
+        if replace and not graph:
+            raise ValueError("Only named graphs can be replaced")
+
+        self.bulk_add_graphs({graph: triples_or_file}, replaced=[graph] if replace else ())
+
+    def bulk_add_graphs(
+        self,
+        graphs: Dict[Optional[str], Iterable[Union[str, Triple]]],
+        replaced: Iterable[str] = (),
+    ):
+        """
+        Adds RDF data to many graphs at once (see `bulk_add`), so that either every graph or none is written. By
+        default, triples are sent as a single SPARQL update, which drops the `replaced` named graphs first.
+
+        :param graphs: Mapping of named graph URI (`None` for the default graph) to triples.
+        :param replaced: Named graphs cleared first.
+        """
+        replaced = list(replaced)
+        operations = [f"DROP SILENT GRAPH <{graph}>" for graph in replaced]
+        for graph, triples_or_file in graphs.items():
+            if isinstance(triples_or_file, (str, Path)):
+                raise NotImplementedError(f"{type(self).__name__} does not support loading RDF files")
+            triples = " .\n".join(
+                triple if isinstance(triple, str) else " ".join(map(nt_term, triple)) for triple in triples_or_file
+            )
+            operations.append(
+                f"INSERT DATA {{ GRAPH <{graph}> {{ {triples} }} }}" if graph else f"INSERT DATA {{ {triples} }}"
+            )
+        self._update(" ;\n".join(operations))
+        self._invalidate({graph for graph in [*graphs, *replaced] if graph})
+
+    def drop_graph(self, graph: str) -> None:
+        """
+        Removes a named graph (e.g., an alignment) and all of its triples, if it exists.
+        """
+        self._update(f"DROP SILENT GRAPH <{graph}>")
+        self._invalidate([graph])
+
+    def _select_request(self, query: str) -> dict:
+        """
+        Returns the keyword arguments of the HTTP request that runs a `SELECT` query and streams its results in the
+        SPARQL TSV format.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming queries")
+
+    @staticmethod
+    def _paginate(query: str, limit: int, offset: int) -> str:
+        return f"{query.rstrip()}\nLIMIT {limit}\nOFFSET {offset}"
+
+    def query_iter(self, query: str, page_size: int = None) -> Iterator[Dict[str, dict]]:
+        """
+        Performs a `SELECT` query against the database and yields its solutions (in the SPARQL JSON results format)
+        as they are received.
+
+        :param page_size: If given, the query is sent many times with `LIMIT`/`OFFSET` clauses appended, so that no
+            more than `page_size` rows are requested at once (for servers that cap result sizes). The query must then
+            be sorted (`ORDER BY`) for pages to be consistent, and must not have its own `LIMIT` or `OFFSET`.
+        """
+        offset = 0
+        while True:
+            rows = 0
+            paginated = self._paginate(query, page_size, offset) if page_size else query
+            with self.client.stream("POST", **self._select_request(paginated)) as r:
+                r.raise_for_status()
+                for bindings in iter_tsv_bindings(r.iter_lines()):
+                    rows += 1
+                    yield bindings
+
+            if not page_size or rows < page_size:
+                return
+            offset += page_size
+
+    async def aquery_iter(self, query: str, page_size: int = None) -> AsyncIterator[Dict[str, dict]]:
+        """
+        Asynchronous counterpart of `query_iter`.
+        """
+        offset = 0
+        while True:
+            rows = 0
+            paginated = self._paginate(query, page_size, offset) if page_size else query
+            async with self.async_client.stream("POST", **self._select_request(paginated)) as r:
+                r.raise_for_status()
+                reader = TSVReader()
+                async for line in r.aiter_lines():
+                    for bindings in reader.feed(line):
+                        rows += 1
+                        yield bindings
+
+            if not page_size or rows < page_size:
+                return
+            offset += page_size
+
+    @staticmethod
+    def _log(kind: str, query: str) -> None:
+        """
+        Logs (a summary of) the query about to be sent. The full query text is only logged at debug level.
+        """
+        logger.info("Running %s (%d characters)", kind, len(query))
+        logger.debug("%s", query)
@@ -0,0 +1,126 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+# media type of SPARQL 1.1 tab-separated values results
+TSV_MEDIA_TYPE = "text/tab-separated-values"
+
+_LITERAL_PATTERN = re.compile(r'^"(.*)"(?:@([\w-]+)|\^\^<([^>]*)>)?$', re.DOTALL)
+_ESCAPE_PATTERN = re.compile(r"\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))")
+_ESCAPES = {"t": "\t", "n": "\n", "r": "\r", "b": "\b", "f": "\f", '"': '"', "'": "'", "\\": "\\"}
+
+_INTEGER_PATTERN = re.compile(r"^[+-]?\d+$")
+_DECIMAL_PATTERN = re.compile(r"^[+-]?\d*\.\d+$")
+_DOUBLE_PATTERN = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)[eE][+-]?\d+$")
+
+
+def _unescape(value: str) -> str:
+    def replace(match) -> str:
+        short, long, char = match.groups()
+        if short or long:
+            return chr(int(short or long, 16))
+        return _ESCAPES.get(char, char)
+
+    return _ESCAPE_PATTERN.sub(replace, value)
+
+
+def parse_tsv_term(value: str) -> Optional[dict]:
+    """
+    Parses an RDF term of a SPARQL TSV result, which follows the Turtle syntax.
+
+    :return: Term in the SPARQL JSON results format, e.g., `{"type": "uri", "value": "..."}` (`None` if unbound).
+    """
+    if not value:
+        return None
+    if value.startswith("<") and value.endswith(">"):
+        return {"type": "uri", "value": value[1:-1]}
+    if value.startswith("_:"):
+        return {"type": "bnode", "value": value[2:]}
+
+    match = _LITERAL_PATTERN.match(value)
+    if match:
+        lexical, language, datatype = match.groups()
+        term = {"type": "literal", "value": _unescape(lexical)}
+        if language:
+            term["xml:lang"] = language
+        elif datatype:
+            term["datatype"] = datatype
+        return term
+
+    # abbreviated numeric and boolean literals
+    if _INTEGER_PATTERN.match(value):
+        return {"type": "literal", "value": value, "datatype": XSD + "integer"}
+    if _DECIMAL_PATTERN.match(value):
+        return {"type": "literal", "value": value, "datatype": XSD + "decimal"}
+    if _DOUBLE_PATTERN.match(value):
+        return {"type": "literal", "value": value, "datatype": XSD + "double"}
+    if value in ("true", "false"):
+        return {"type": "literal", "value": value, "datatype": XSD + "boolean"}
+
+    raise ValueError(f"Invalid RDF term in TSV results: {value}")
+
+
+def tsv_variables(header: str) -> List[str]:
+    """
+    Returns the variable names in the header line of SPARQL TSV results.
+    """
+    return [variable.lstrip("?$") for variable in header.rstrip("\r\n").split("\t")]
+
+
+def parse_tsv_row(variables: List[str], line: str) -> Dict[str, dict]:
+    """
+    Parses a row of SPARQL TSV results.
+
+    :return: Solution in the SPARQL JSON results format (unbound variables are left out).
+    """
+    bindings = {}
+    for variable, value in zip(variables, line.rstrip("\r\n").split("\t")):
+        term = parse_tsv_term(value)
+        if term is not None:
+            bindings[variable] = term
+    return bindings
+
+
+class TSVReader:
+    """
+    Parses SPARQL TSV results fed line by line (e.g., as received), shared by blocking and asynchronous iterators.
+    Blank lines are skipped, unless they are rows of a single variable left unbound (i.e., followed by other rows).
+    """
+
+    def __init__(self):
+        self.variables: Optional[List[str]] = None
+        # blank lines not known yet to be rows
+        self._blank = 0
+
+    def feed(self, line: str) -> List[Dict[str, dict]]:
+        """
+        Parses the next line of the results.
+
+        :return: Solutions completed by the line, in the SPARQL JSON results format.
+        """
+        if self.variables is None:
+            if line.strip():
+                self.variables = tsv_variables(line)
+            return []
+
+        if not line.rstrip("\r\n"):
+            if len(self.variables) == 1:
+                self._blank += 1
+            return []
+
+        solutions = [{} for _ in range(self._blank)]
+        self._blank = 0
+        solutions.append(parse_tsv_row(self.variables, line))
+        return solutions
+
+
+def iter_tsv_bindings(lines: Iterable[str]) -> Iterator[Dict[str, dict]]:
+    """
+    Parses SPARQL TSV results line by line (see `TSVReader`).
+
+    :return: Iterator of solutions, in the SPARQL JSON results format.
+    """
+    reader = TSVReader()
+    for line in lines:
+        yield from reader.feed(line)
@@ -1,66 +1,214 @@
+import contextlib
+import functools
+import gzip
 import json
+import logging
+import shutil
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Optional, Union
 
-import requests
-from SPARQLWrapper import JSON, SPARQLWrapper
+import httpx
 
 from salon.database.repository import RDFRepository
+from salon.database.results import TSV_MEDIA_TYPE
+from salon.schema import load_snapshot
+from salon.sink import Triple, nt_term, split_suffix
+
+# maps RDF syntax suffixes to media types
+MEDIA_TYPES = {
+    "nt": "application/n-triples",
+    "nq": "application/n-quads",
+    "ttl": "text/turtle",
+    "trig": "application/trig",
+    "xml": "application/rdf+xml",
+    "rdf": "application/rdf+xml",
+    "owl": "application/rdf+xml",
+    "jsonld": "application/ld+json",
+}
+
+logger = logging.getLogger(__name__)
 
 
 class Stardog(RDFRepository):
     """
-    SPARQLWrapper for Stardog graph store.
+    HTTP client for Stardog graph store.
     """
 
-    def init(self, filename: str):
+    @functools.cached_property
+    def union_default_graph(self) -> bool:
         """
-        Initialize the database by creating the required schema.
+        Whether the database queries the union of every named graph as default graph, i.e., whether its
+        `query.all.graphs` option is set (as on databases created with `init`). Options are read once, and taken as
+        unset if they cannot be read (e.g., without admin permissions).
         """
-        session = requests.Session()
-        session.auth = (self.username, self.password)
+        try:
+            r = self.client.get(f"{self.endpoint}/admin/databases/{self.database}/options")
+            r.raise_for_status()
+            return str(r.json().get("query.all.graphs")).lower() == "true"
+        except (httpx.HTTPError, ValueError, AttributeError) as e:
+            logger.warning(
+                "Cannot read options of database %s, assuming query.all.graphs is unset (%s)", self.database, e
+            )
+            return False
 
+    def init(self, filename: str):
+        """
+        Initialize the database by creating the required schema. The ontology is uploaded as the gzip-compressed
+        N-Triples payload of its snapshot (see `salon.schema`), so that the server does not parse RDF/XML.
+        """
+        payload = f"{Path(filename).stem}.nt.gz"
         meta = {
             "dbname": self.database,
-            "options": {"search.enabled": "true"},
-            "files": [{"filename": filename}],
+            # the default graph is the union of every named graph (i.e., alignment), so that queries need not be scoped
+            "options": {"search.enabled": "true", "query.all.graphs": "true"},
+            "files": [{"filename": payload}],
         }
 
         params = [
             ("root", (None, json.dumps(meta), "application/json")),
-            (
-                filename,
-                (
-                    filename,
-                    open(filename),
-                    "application/rdf+xml",
-                    {"Content-Encoding": None},
-                ),
-            ),
+            (payload, (payload, load_snapshot(filename).ntriples, "application/n-triples")),
         ]
+        r = self.client.post(f"{self.endpoint}/admin/databases", files=params)
+        self.__dict__.pop("union_default_graph", None)
+        self._invalidate()
+        return r.status_code, r.reason_phrase
 
-        r = session.post(f"{self.endpoint}/admin/databases", files=params)
-        return r.status_code, r.reason
-
-    def update(self, query: str) -> dict:
-        sparql = SPARQLWrapper(f"{self.endpoint}/{self.database}/update")
-        sparql.setReturnFormat(JSON)
-        sparql.setMethod("POST")
-        sparql.setQuery(query)
-
-        if self.username:
-            sparql.setCredentials(self.username, self.password)
-
-        print(f"Running update query:\n{query}")
-
-        return sparql.query().convert()
-
-    def query(self, query: str) -> dict:
-        sparql = SPARQLWrapper(f"{self.endpoint}/{self.database}/query")
-        sparql.setReturnFormat(JSON)
-        sparql.setQuery(query)
+    def begin(self) -> str:
+        """
+        Starts a new transaction.
 
-        if self.username:
-            sparql.setCredentials(self.username, self.password)
+        :return: Transaction identifier.
+        """
+        r = self.client.post(f"{self.endpoint}/{self.database}/transaction/begin")
+        r.raise_for_status()
+        return r.text.strip()
+
+    def commit(self, transaction: str) -> None:
+        r = self.client.post(f"{self.endpoint}/{self.database}/transaction/commit/{transaction}")
+        r.raise_for_status()
+
+    def rollback(self, transaction: str) -> None:
+        r = self.client.post(f"{self.endpoint}/{self.database}/transaction/rollback/{transaction}")
+        r.raise_for_status()
+
+    def bulk_add(
+        self,
+        triples_or_file: Union[str, Path, Iterable[Union[str, Triple]]],
+        graph: Optional[str] = None,
+        replace: bool = False,
+    ):
+        """
+        Adds RDF data to the database within a single transaction through Stardog's HTTP API, which skips SPARQL
+        parsing on the server. Request bodies are sent gzip-compressed.
 
-        print(f"Running query:\n{query}")
+        :param triples_or_file: Either path to an RDF file (optionally gzip compressed) or iterable of triples, given
+            as rdflib terms or N-Triples statements.
+        :param graph: Named graph URI to add the data to (default graph if none).
+        :param replace: Whether the named graph is cleared first, within the same transaction.
+        """
+        if replace and not graph:
+            raise ValueError("Only named graphs can be replaced")
+        self.bulk_add_graphs({graph: triples_or_file}, replaced=[graph] if replace else ())
+
+    def bulk_add_graphs(
+        self,
+        graphs: Dict[Optional[str], Union[str, Path, Iterable[Union[str, Triple]]]],
+        replaced: Iterable[str] = (),
+    ):
+        """
+        Adds RDF data to many graphs within a single transaction (see `bulk_add`), so that either every graph or none
+        is written.
+        """
+        replaced = list(replaced)
+        with contextlib.ExitStack() as stack:
+            bodies = {}
+            for graph, triples_or_file in graphs.items():
+                body = stack.enter_context(tempfile.TemporaryFile())
+                bodies[graph] = body, self._compress(triples_or_file, body)
+
+            transaction = self.begin()
+            try:
+                for graph in replaced:
+                    r = self.client.post(
+                        f"{self.endpoint}/{self.database}/{transaction}/clear", params={"graph-uri": graph}
+                    )
+                    r.raise_for_status()
+                for graph, (body, headers) in bodies.items():
+                    r = self.client.post(
+                        f"{self.endpoint}/{self.database}/{transaction}/add",
+                        params={"graph-uri": graph} if graph else None,
+                        content=body,
+                        headers=headers,
+                    )
+                    r.raise_for_status()
+                self.commit(transaction)
+            except Exception:
+                self.rollback(transaction)
+                raise
+        self._invalidate({graph for graph in [*graphs, *replaced] if graph})
+
+    @staticmethod
+    def _compress(triples_or_file: Union[str, Path, Iterable[Union[str, Triple]]], body: BinaryIO) -> Dict[str, str]:
+        """
+        Writes RDF data gzip-compressed to a request body (rewound afterwards).
 
-        return sparql.query().convert()
+        :return: Request headers.
+        """
+        headers = {"Content-Encoding": "gzip"}
+        if isinstance(triples_or_file, (str, Path)):
+            extension, compression = split_suffix(str(triples_or_file))
+            headers["Content-Type"] = MEDIA_TYPES.get(extension, "application/n-triples")
+            if compression not in (None, ".gz"):
+                raise ValueError(f"Unsupported compression for bulk loading: {compression}")
+            with open(triples_or_file, "rb") as f:
+                if compression == ".gz":
+                    shutil.copyfileobj(f, body)
+                else:
+                    with gzip.GzipFile(fileobj=body, mode="wb") as compressed:
+                        shutil.copyfileobj(f, compressed)
+        else:
+            headers["Content-Type"] = MEDIA_TYPES["nt"]
+            with gzip.GzipFile(fileobj=body, mode="wb") as compressed:
+                for triple in triples_or_file:
+                    line = triple if isinstance(triple, str) else " ".join(map(nt_term, triple))
+                    compressed.write(f"{line} .\n".encode("utf-8"))
+        body.seek(0)
+        return headers
+
+    def _update_request(self, query: str) -> dict:
+        self._log("update query", query)
+        return dict(
+            url=f"{self.endpoint}/{self.database}/update",
+            content=query.encode("utf-8"),
+            headers={"Content-Type": "application/sparql-update"},
+        )
+
+    def _query_request(self, query: str) -> dict:
+        self._log("query", query)
+        return dict(
+            url=f"{self.endpoint}/{self.database}/query",
+            data={"query": query},
+            headers={"Accept": "application/sparql-results+json"},
+        )
+
+    def _select_request(self, query: str) -> dict:
+        return {**self._query_request(query), "headers": {"Accept": TSV_MEDIA_TYPE}}
+
+    def _update(self, query: str) -> None:
+        r = self.client.post(**self._update_request(query))
+        r.raise_for_status()
+
+    def _query(self, query: str) -> dict:
+        r = self.client.post(**self._query_request(query))
+        r.raise_for_status()
+        return r.json()
+
+    async def _aupdate(self, query: str) -> None:
+        r = await self.async_client.post(**self._update_request(query))
+        r.raise_for_status()
+
+    async def _aquery(self, query: str) -> dict:
+        r = await self.async_client.post(**self._query_request(query))
+        r.raise_for_status()
+        return r.json()
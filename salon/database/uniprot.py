@@ -0,0 +1,161 @@
+import functools
+from typing import Dict, Iterable, List, Optional
+
+from salon.cache import UniProtCache
+from salon.database.queries import QueryTemplate, is_iri
+from salon.database.repository import RDFRepository
+from salon.database.results import TSV_MEDIA_TYPE
+
+PDB_IRI = "http://rdf.wwpdb.org/pdb/"
+UNIPROT_IRI = "http://purl.uniprot.org/uniprot/"
+TAXONOMY_IRI = "http://purl.uniprot.org/taxonomy/"
+
+
+@functools.lru_cache(maxsize=None)
+def _proteins_template(by_pdb: bool) -> QueryTemplate:
+    """
+    Returns the (compiled) query for the protein records of either PDB entries `$pdbs` or UniProt proteins
+    `$proteins`.
+    """
+    if by_pdb:
+        values = "VALUES ?pdb { $pdbs }\n            ?protein rdfs:seeAlso ?pdb ."
+    else:
+        values = "VALUES ?protein { $proteins }"
+    return QueryTemplate(
+        """
+        PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
+        PREFIX skos:<http://www.w3.org/2004/02/skos/core#>
+        PREFIX up:<http://purl.uniprot.org/core/>
+        SELECT ?protein ?pdb ?name ?mnemonic ?organism ?organismName ?gene ?reviewed ?existence
+        WHERE {
+            """
+        + values
+        + """
+            ?protein a up:Protein ;
+                     up:mnemonic ?mnemonic ;
+                     up:organism ?organism ;
+                     up:reviewed ?reviewed ;
+                     up:existence ?existence .
+            OPTIONAL { ?protein up:recommendedName/up:fullName ?name }
+            OPTIONAL { ?protein up:encodedBy/skos:prefLabel ?gene }
+            OPTIONAL { ?organism up:scientificName ?organismName }
+        }
+    """
+    )
+
+
+class UniProt(RDFRepository):
+    """
+    Read-only client for the UniProt SPARQL endpoint. Protein records are looked up in `cache` (if given) first, so
+    that the endpoint is only queried for misses.
+    """
+
+    def __init__(self, endpoint: str, cache: Optional[UniProtCache] = None, **kwargs):
+        super().__init__(endpoint, database=None, **kwargs)
+        self.cache = cache
+
+    def _query_request(self, query: str) -> dict:
+        self._log("query", query)
+        return dict(
+            url=self.endpoint,
+            data={"query": query},
+            headers={"Accept": "application/sparql-results+json"},
+        )
+
+    def _select_request(self, query: str) -> dict:
+        return {**self._query_request(query), "headers": {"Accept": TSV_MEDIA_TYPE}}
+
+    def _query(self, query: str) -> dict:
+        r = self.client.post(**self._query_request(query))
+        r.raise_for_status()
+        return r.json()
+
+    async def _aquery(self, query: str) -> dict:
+        r = await self.async_client.post(**self._query_request(query))
+        r.raise_for_status()
+        return r.json()
+
+    def _update(self, query: str) -> None:
+        raise NotImplementedError("UniProt endpoint is read-only")
+
+    async def _aupdate(self, query: str) -> None:
+        raise NotImplementedError("UniProt endpoint is read-only")
+
+    @staticmethod
+    def _record(bindings: dict) -> dict:
+        def value(name: str) -> Optional[str]:
+            return bindings.get(name, {}).get("value")
+
+        return {
+            "accession": value("protein")[len(UNIPROT_IRI) :],
+            "protein": value("protein"),
+            "name": value("name"),
+            "mnemonic": value("mnemonic"),
+            "organism": value("organism"),
+            "organism_id": value("organism")[len(TAXONOMY_IRI) :],
+            "organism_name": value("organismName"),
+            "gene": value("gene"),
+            "reviewed": value("reviewed") in ("true", "1"),
+            "existence": value("existence"),
+        }
+
+    async def proteins_by_pdb(self, pdb_ids: Iterable[str]) -> Dict[str, List[dict]]:
+        """
+        Returns the UniProt protein records linked to each PDB identifier (none for identifiers that cannot be part of
+        an IRI).
+        """
+        pdb_ids = [pdb_id.upper() for pdb_id in pdb_ids]
+        found = self._cached(f"pdb:{pdb_id}" for pdb_id in pdb_ids)
+        records = {pdb_id: found[f"pdb:{pdb_id}"] for pdb_id in pdb_ids if f"pdb:{pdb_id}" in found}
+        # identifiers come from the input alignments, so they are checked before building IRIs out of them
+        records.update({pdb_id: [] for pdb_id in pdb_ids if not is_iri(f"{PDB_IRI}{pdb_id}")})
+
+        missing = [pdb_id for pdb_id in dict.fromkeys(pdb_ids) if pdb_id not in records]
+        if missing:
+            query = _proteins_template(by_pdb=True).render(pdbs=[f"{PDB_IRI}{pdb_id}" for pdb_id in missing])
+            res = await self.aquery(query)
+
+            fetched, proteins = {pdb_id: {} for pdb_id in missing}, {}
+            for bindings in res["results"]["bindings"]:
+                record = self._record(bindings)
+                # keeps the first row of proteins with many names or genes
+                fetched[bindings["pdb"]["value"][len(PDB_IRI) :]].setdefault(record["accession"], record)
+                proteins.setdefault(f"uniprot:{record['accession']}", record)
+
+            fetched = {pdb_id: list(found.values()) for pdb_id, found in fetched.items()}
+            self._store({**proteins, **{f"pdb:{pdb_id}": found for pdb_id, found in fetched.items()}})
+            records.update(fetched)
+
+        return records
+
+    async def proteins(self, accessions: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """
+        Returns the UniProt protein record of each accession (`None` if not found, or if it cannot be part of an IRI).
+        """
+        accessions = list(accessions)
+        found = self._cached(f"uniprot:{ac}" for ac in accessions)
+        records = {ac: found[f"uniprot:{ac}"] for ac in accessions if f"uniprot:{ac}" in found}
+        records.update({ac: None for ac in accessions if not is_iri(f"{UNIPROT_IRI}{ac}")})
+
+        missing = [ac for ac in dict.fromkeys(accessions) if ac not in records]
+        if missing:
+            query = _proteins_template(by_pdb=False).render(proteins=[f"{UNIPROT_IRI}{ac}" for ac in missing])
+            res = await self.aquery(query)
+
+            fetched = {ac: None for ac in missing}
+            for bindings in res["results"]["bindings"]:
+                record = self._record(bindings)
+                # keeps the first row of proteins with many names or genes
+                fetched[record["accession"]] = fetched[record["accession"]] or record
+
+            self._store({f"uniprot:{ac}": record for ac, record in fetched.items()})
+            records.update(fetched)
+
+        return records
+
+    def _cached(self, keys: Iterable[str]) -> dict:
+        return self.cache.get_many(keys) if self.cache else {}
+
+    def _store(self, items: dict) -> None:
+        if self.cache:
+            self.cache.put_many(items)
@@ -1,27 +1,36 @@
+import logging
 import re
-from typing import Dict
+from typing import Dict, Optional
 
 import httpx
 from httpx import Response
 
 from salon.database.repository import RDFRepository
+from salon.database.results import TSV_MEDIA_TYPE
+
+logger = logging.getLogger(__name__)
 
 
 class Virtuoso(RDFRepository):
     """
-    SPARQLWrapper for Virtuoso graph store.
+    HTTP client for Virtuoso graph store, through its SPARQL endpoint (with HTTP digest authentication).
     """
 
     COMMENTS_PATTERN = re.compile(r"(^|\n)\s*#.*?\n")
 
-    def __init__(self, endpoint: str, database: str, username: str = None, password: str = None):
-        super().__init__(endpoint, database, username, password)
+    def __init__(self, endpoint: str, database: str, username: str = None, password: str = None, **kwargs):
+        super().__init__(endpoint, database, username, password, **kwargs)
 
         self.parameters: Dict[str, str] = {}
         self.headers: Dict[str, str] = {}
 
         self._setup_request()
 
+    def _auth(self) -> Optional[httpx.Auth]:
+        if self.username:
+            return httpx.DigestAuth(self.username, self.password)
+        return None
+
     def _setup_request(self) -> None:
         self._add_parameter("default-graph-uri", self.database)
         self._add_parameter("User-Agent", "salon")
@@ -31,69 +40,91 @@ class Virtuoso(RDFRepository):
             "application/sparql-results+json,application/json,text/javascript,application/javascript",
         )
 
-    def query(self, query: str) -> dict:
+    def _query(self, query: str) -> dict:
         """
         Run 'SELECT' query with http Auth DIGEST and return results in JSON format.
         Protocol details at http://www.w3.org/TR/sparql11-protocol/#query-operation
         """
-        self._add_parameter("query", query)
-        req = self._get()
-
-        # convert to json and return bindings
-        result = {}
-        if not req.is_error:
-            result = req.json()
-            result = result["results"]["bindings"]
+        self._log("query", query)
 
-        self._remove_parameter("query")
-
-        return result
+        # parameters are copied, as the repository may be shared by many threads (see `salon.server`)
+        req = self.client.post(
+            self.endpoint,
+            params={**self.parameters, "query": query},
+            headers=self.headers,
+        )
+        return self._results(req)
 
-    def update(self, query: str) -> None:
+    def _update(self, query: str) -> None:
         """
         Run 'INSERT' update query with http Auth DIGEST.
         Protocol details at http://www.w3.org/TR/sparql11-protocol/#update-operation
         """
-        self._add_header("Content-Type", "application/sparql-update")
+        self._log("update query", query)
 
-        req = self._post_directly(query)
+        req = self.client.post(
+            self.endpoint,
+            content=query,
+            params=self.parameters,
+            headers={**self.headers, "Content-Type": "application/sparql-update"},
+        )
+        self._raise_for_status(req)
+
+    def _select_request(self, query: str) -> dict:
+        self._log("query", query)
+        return dict(
+            url=self.endpoint,
+            params={**self.parameters, "query": query},
+            headers={**self.headers, "Accept": TSV_MEDIA_TYPE},
+        )
 
-        # convert to json and return bindings
-        result = {}
-        if not req.is_error:
-            result = req.json()
-            result = result["results"]["bindings"]
+    async def _aquery(self, query: str) -> dict:
+        """
+        Asynchronous counterpart of `_query`.
+        """
+        self._log("query", query)
 
-        self._remove_header("Content-Type")
+        req = await self.async_client.post(
+            self.endpoint,
+            params={**self.parameters, "query": query},
+            headers=self.headers,
+        )
+        return self._results(req)
 
-        return result
+    async def _aupdate(self, query: str) -> None:
+        """
+        Asynchronous counterpart of `_update`.
+        """
+        self._log("update query", query)
 
-    def _post_directly(self, query: str) -> Response:
-        auth = httpx.DigestAuth(self.username, self.password)
-        with httpx.Client(timeout=12000) as client:
-            req = client.post(
-                self.endpoint,
-                data=query,
-                params=self.parameters,
-                headers=self.headers,
-                auth=auth,
-            )
-        if req.is_error:
-            print(req.text, req.status_code)
-        return req
-
-    def _get(self) -> Response:
-        auth = httpx.DigestAuth(self.username, self.password)
-        with httpx.Client() as client:
-            req = client.post(
-                self.endpoint,
-                params=self.parameters,
-                headers=self.headers,
-                auth=auth,
-            )
+        req = await self.async_client.post(
+            self.endpoint,
+            content=query,
+            params=self.parameters,
+            headers={**self.headers, "Content-Type": "application/sparql-update"},
+        )
+        self._raise_for_status(req)
+
+    @classmethod
+    def _results(cls, req: Response) -> dict:
+        """
+        Returns the results of a query response, in the SPARQL JSON results format.
+
+        :raise httpx.HTTPStatusError: If the query failed, so that failures are neither taken as empty results nor
+            cached (see `RDFRepository.query`).
+        """
+        cls._raise_for_status(req)
+        return req.json()
+
+    @staticmethod
+    def _raise_for_status(req: Response) -> None:
+        """
+        Raises `httpx.HTTPStatusError` if a request failed, so that failed writes are never taken as applied (nor
+        failed queries as empty results).
+        """
         if req.is_error:
-            print(req.text, req.status_code)
-        return req
+            logger.error("%s %s", req.text, req.status_code)
+        req.raise_for_status()
 
     def _add_header(self, param: str, value: str) -> None:
         """
@@ -0,0 +1,243 @@
+import pickle
+from bisect import bisect_right
+from typing import Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from salon.alignment import Alignment
+
+T = TypeVar("T")
+
+# subtrees up to this level are scanned linearly
+_LEAF_LEVEL = 3
+
+
+class IntervalTree(Generic[T]):
+    """
+    Static interval tree over closed intervals of integers, each with a payload. Intervals are kept sorted by start in
+    flat lists, which implicitly form a balanced binary tree augmented with the maximum end of every subtree (as in
+    cgranges), so that overlap queries take O(log n + k) time for k matches.
+    """
+
+    __slots__ = ("starts", "ends", "maxes", "payloads", "levels")
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, T]] = ()):
+        intervals = sorted(intervals, key=lambda interval: (interval[0], interval[1]))
+        self.starts = [start for start, _, _ in intervals]
+        # half-open ends
+        self.ends = [stop + 1 for _, stop, _ in intervals]
+        self.payloads = [payload for _, _, payload in intervals]
+        self.maxes = list(self.ends)
+        self.levels = self._index()
+
+    def _index(self) -> int:
+        n = len(self.starts)
+        if not n:
+            return -1
+
+        last_i, last = 0, 0
+        for i in range(0, n, 2):
+            last_i, last = i, self.ends[i]
+
+        k = 1
+        while 1 << k <= n:
+            x = 1 << (k - 1)
+            for i in range((x << 1) - 1, n, x << 2):
+                left = self.maxes[i - x]
+                right = self.maxes[i + x] if i + x < n else last
+                self.maxes[i] = max(self.ends[i], left, right)
+            last_i = last_i - x if (last_i >> k) & 1 else last_i + x
+            if last_i < n and self.maxes[last_i] > last:
+                last = self.maxes[last_i]
+            k += 1
+        return k - 1
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlap(self, start: int, stop: int) -> Iterator[T]:
+        """
+        Yields the payloads of the intervals overlapping the closed interval [`start`, `stop`], sorted by start.
+        """
+        n, end = len(self.starts), stop + 1
+        if self.levels < 0:
+            return
+
+        found = []
+        stack = [((1 << self.levels) - 1, self.levels, False)]
+        while stack:
+            x, k, visited = stack.pop()
+            if k <= _LEAF_LEVEL:
+                i0 = x >> k << k
+                for i in range(i0, min(i0 + (1 << (k + 1)) - 1, n)):
+                    if self.starts[i] >= end:
+                        break
+                    if start < self.ends[i]:
+                        found.append(i)
+            elif not visited:
+                y = x - (1 << (k - 1))
+                stack.append((x, k, True))
+                if y >= n or self.maxes[y] > start:
+                    stack.append((y, k - 1, False))
+            elif x < n and self.starts[x] < end:
+                if start < self.ends[x]:
+                    found.append(x)
+                stack.append((x + (1 << (k - 1)), k - 1, False))
+
+        for i in sorted(found):
+            yield self.payloads[i]
+
+
+class SegmentMap:
+    """
+    Offset map between the alignment columns and the residue positions (both 1-based) of an aligned sequence, stored
+    as the runs of consecutive residues (i.e., ungapped segments): first column, first residue position and length
+    of each. Translations take O(log s) time for s segments.
+    """
+
+    __slots__ = ("columns", "residues", "lengths")
+
+    def __init__(self, columns: List[int], residues: List[int], lengths: List[int]):
+        self.columns = columns
+        self.residues = residues
+        self.lengths = lengths
+
+    @classmethod
+    def from_alignment(cls, alignment: Alignment, row: int) -> "SegmentMap":
+        columns = alignment.residue_columns(row)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(columns) != 1) + 1)) if len(columns) else np.zeros(0)
+        starts = starts.astype(np.int64)
+        lengths = np.diff(np.append(starts, len(columns)))
+        return cls((columns[starts] + 1).tolist(), (starts + 1).tolist(), lengths.tolist())
+
+    def __len__(self) -> int:
+        """
+        Number of residues.
+        """
+        return self.residues[-1] + self.lengths[-1] - 1 if self.residues else 0
+
+    def to_residue(self, column: int) -> Optional[int]:
+        """
+        Returns the residue position at an alignment column (`None` at gaps).
+        """
+        i = bisect_right(self.columns, column) - 1
+        if i < 0 or column >= self.columns[i] + self.lengths[i]:
+            return None
+        return self.residues[i] + column - self.columns[i]
+
+    def to_column(self, residue: int) -> Optional[int]:
+        """
+        Returns the alignment column of a residue position (`None` if out of the sequence).
+        """
+        i = bisect_right(self.residues, residue) - 1
+        if i < 0 or residue > len(self):
+            return None
+        return self.columns[i] + residue - self.residues[i]
+
+
+class FeatureRecord:
+    """
+    Sequence feature located both in residue positions and alignment columns (closed, 1-based intervals).
+    """
+
+    __slots__ = ("sequence", "position", "ftype", "fnote", "fscore", "start", "stop", "first_column", "last_column")
+
+    def __init__(
+        self,
+        sequence: str,
+        position: int,
+        ftype: str,
+        fnote: str,
+        fscore: str,
+        start: int,
+        stop: int,
+        first_column: int,
+        last_column: int,
+    ):
+        self.sequence = sequence
+        self.position = position
+        self.ftype = ftype
+        self.fnote = fnote
+        self.fscore = fscore
+        self.start = start
+        self.stop = stop
+        self.first_column = first_column
+        self.last_column = last_column
+
+
+class AlignmentIndex:
+    """
+    Coordinate maps of every sequence of an alignment, and interval tree of their features by alignment column.
+    """
+
+    __slots__ = ("name", "maps", "features")
+
+    def __init__(self, alignment: Alignment):
+        self.name = alignment.name
+        self.maps: Dict[str, SegmentMap] = {}
+
+        intervals = []
+        for sequence in alignment.sequences:
+            segments = self.maps[sequence.name] = SegmentMap.from_alignment(alignment, sequence.row)
+            for i, feature in enumerate(sequence.features):
+                try:
+                    start, stop = int(feature.fstart), int(feature.fstop)
+                except (TypeError, ValueError):
+                    continue
+                first, last = segments.to_column(start), segments.to_column(stop)
+                if first is None or last is None or first > last:
+                    continue
+                record = FeatureRecord(
+                    sequence.name, i, feature.ftype, feature.fnote, feature.fscore, start, stop, first, last
+                )
+                intervals.append((first, last, record))
+        self.features = IntervalTree(intervals)
+
+    def overlap(self, first_column: int, last_column: int, ftype: str = None, fnote: str = None) -> List[FeatureRecord]:
+        """
+        Returns the features overlapping a range of alignment columns, optionally of a given type and note (e.g.,
+        `STRUCT` and `HELIX`).
+        """
+        return [
+            record
+            for record in self.features.overlap(first_column, last_column)
+            if (ftype is None or record.ftype == ftype) and (fnote is None or record.fnote == fnote)
+        ]
+
+
+class FeatureIndex:
+    """
+    Persistent index of the features and coordinate maps of many alignments (e.g., those of a parse output), by
+    alignment name.
+    """
+
+    def __init__(self, alignments: Dict[str, AlignmentIndex] = None):
+        self.alignments = alignments or {}
+
+    def add(self, alignment: Alignment) -> None:
+        self.alignments[alignment.name] = AlignmentIndex(alignment)
+
+    def update(self, other: "FeatureIndex") -> None:
+        self.alignments.update(other.alignments)
+
+    def __getitem__(self, name: str) -> AlignmentIndex:
+        return self.alignments[name]
+
+    def __len__(self) -> int:
+        return len(self.alignments)
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            pickle.dump(self.alignments, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> "FeatureIndex":
+        with open(path, "rb") as f:
+            return cls(pickle.load(f))
+
+
+def index_path(output_path: str) -> str:
+    """
+    Returns the location of the feature index persisted alongside a parse output.
+    """
+    return f"{output_path}.index"
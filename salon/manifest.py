@@ -0,0 +1,138 @@
+import hashlib
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+# statements of the same named graph (empty for the default graph) and subject, hashed and diffed together
+Unit = Tuple[str, str]
+
+# unit hashes are the sum (modulo 2^128) of the hashes of their statements, so that they do not depend on order
+_MODULUS = 1 << 128
+
+
+def statement_hash(statement: str) -> int:
+    """
+    Returns the hash of an N-Triples statement.
+    """
+    return int.from_bytes(hashlib.blake2b(statement.encode("utf-8"), digest_size=16).digest(), "big")
+
+
+def combine(hashes: Iterable[int]) -> int:
+    """
+    Combines many statement (or unit) hashes into an order-independent hash.
+    """
+    return sum(hashes) % _MODULUS
+
+
+def unit_hash(statements: Iterable[str]) -> int:
+    """
+    Returns the hash of the statements of a unit, each counted once.
+    """
+    return combine(map(statement_hash, set(statements)))
+
+
+class Manifest:
+    """
+    Persistent SQLite-backed record of the statements loaded from each source file into a database, grouped in units
+    of the same named graph and subject (i.e., one unit per alignment, sequence, feature and so on).
+
+    Every unit keeps a content hash and its (compressed) statements, so that re-loading a regenerated file only needs
+    to send the statements of the units whose hash changed, and to remove those no longer present. Named graphs (i.e.,
+    alignments) keep a hash of their units too.
+    """
+
+    def __init__(self, path: str, database: str):
+        self.path = path
+        self.database = database
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS units "
+            "(database TEXT NOT NULL, source TEXT NOT NULL, graph TEXT NOT NULL, subject TEXT NOT NULL, "
+            "hash TEXT NOT NULL, statements BLOB NOT NULL, PRIMARY KEY (database, source, graph, subject))"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS graphs "
+            "(database TEXT NOT NULL, source TEXT NOT NULL, graph TEXT NOT NULL, hash TEXT NOT NULL, "
+            "PRIMARY KEY (database, source, graph))"
+        )
+        self.connection.commit()
+
+    def hashes(self, source: str) -> Dict[Unit, int]:
+        """
+        Returns the hash of every unit loaded from `source`.
+        """
+        rows = self.connection.execute(
+            "SELECT graph, subject, hash FROM units WHERE database = ? AND source = ?", (self.database, source)
+        )
+        return {(graph, subject): int(value, 16) for graph, subject, value in rows}
+
+    def graph_hashes(self, source: str) -> Dict[str, int]:
+        """
+        Returns the hash of every named graph loaded from `source`.
+        """
+        rows = self.connection.execute(
+            "SELECT graph, hash FROM graphs WHERE database = ? AND source = ?", (self.database, source)
+        )
+        return {graph: int(value, 16) for graph, value in rows}
+
+    def statements(self, source: str, unit: Unit) -> Set[str]:
+        """
+        Returns the statements of a unit loaded from `source` (empty if none).
+        """
+        row = self.connection.execute(
+            "SELECT statements FROM units WHERE database = ? AND source = ? AND graph = ? AND subject = ?",
+            (self.database, source, *unit),
+        ).fetchone()
+        if row is None:
+            return set()
+        return set(zlib.decompress(row[0]).decode("utf-8").split("\n"))
+
+    def put(self, source: str, unit: Unit, statements: Optional[Set[str]]) -> None:
+        """
+        Records the statements of a unit, or removes it if `statements` is empty. Changes are only persisted on
+        `commit`.
+        """
+        if not statements:
+            self.connection.execute(
+                "DELETE FROM units WHERE database = ? AND source = ? AND graph = ? AND subject = ?",
+                (self.database, source, *unit),
+            )
+            return
+
+        value = unit_hash(statements)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO units (database, source, graph, subject, hash, statements) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                self.database,
+                source,
+                *unit,
+                f"{value:032x}",
+                zlib.compress("\n".join(sorted(statements)).encode("utf-8")),
+            ),
+        )
+
+    def put_graphs(self, source: str, hashes: Dict[str, int]) -> None:
+        """
+        Replaces the hashes of the named graphs loaded from `source`.
+        """
+        self.connection.execute("DELETE FROM graphs WHERE database = ? AND source = ?", (self.database, source))
+        self.connection.executemany(
+            "INSERT INTO graphs (database, source, graph, hash) VALUES (?, ?, ?, ?)",
+            ((self.database, source, graph, f"{value:032x}") for graph, value in hashes.items()),
+        )
+
+    def commit(self) -> None:
+        self.connection.commit()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,108 @@
+import importlib
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Union
+
+from salon.alignment import Alignment
+from salon.sink import COMPRESSIONS, split_suffix
+
+Reader = Callable[[str], Iterator[Alignment]]
+
+# maps input file extensions to alignment readers, given as "module:function" references so that each reader (and
+# its dependencies) is only imported when a file of its format is read
+READERS: Dict[str, Union[str, Reader]] = {
+    "xml": "salon.readers.macsim:read_macsim_xml",
+    "fa": "salon.readers.fasta:read_fasta",
+    "fasta": "salon.readers.fasta:read_fasta",
+    "a2m": "salon.readers.fasta:read_a2m",
+    "a3m": "salon.readers.fasta:read_a3m",
+    "sto": "salon.readers.stockholm:read_stockholm",
+    "sth": "salon.readers.stockholm:read_stockholm",
+    "stk": "salon.readers.stockholm:read_stockholm",
+    "stockholm": "salon.readers.stockholm:read_stockholm",
+    "aln": "salon.readers.alignio:read_clustal",
+    "clustal": "salon.readers.alignio:read_clustal",
+    "clw": "salon.readers.alignio:read_clustal",
+    "phy": "salon.readers.alignio:read_phylip",
+    "phylip": "salon.readers.alignio:read_phylip",
+}
+
+# readers that yield each sequence as soon as it is read, as a single-sequence alignment, followed by the alignment
+# without sequences (see `salon.readers.macsim.stream_macsim_xml`), by input file extension
+STREAMING_READERS: Dict[str, Union[str, Reader]] = {
+    "xml": "salon.readers.macsim:stream_macsim_xml",
+}
+
+
+def register_reader(extension: str, reader: Union[str, Reader], streaming_reader: Union[str, Reader] = None) -> None:
+    """
+    Registers the alignment reader of files with given extension (without the leading dot).
+
+    :param reader: Either a function that yields every alignment in a file, or a "module:function" reference to it.
+    :param streaming_reader: Reader that yields one sequence at a time, if any (see `STREAMING_READERS`).
+    """
+    extension = extension.lower().lstrip(".")
+    READERS[extension] = reader
+    if streaming_reader is not None:
+        STREAMING_READERS[extension] = streaming_reader
+    else:
+        STREAMING_READERS.pop(extension, None)
+
+
+def _resolve(readers: Dict[str, Union[str, Reader]], extension: str) -> Reader:
+    reader = readers[extension]
+    if isinstance(reader, str):
+        module, function = reader.split(":")
+        reader = readers[extension] = getattr(importlib.import_module(module), function)
+    return reader
+
+
+def get_reader(filepath: str) -> Reader:
+    """
+    Returns the alignment reader for given input file, importing it if needed. Compression suffixes are ignored.
+    """
+    extension, _ = split_suffix(filepath)
+    if extension not in READERS:
+        raise ValueError(
+            f"Input file not supported, try one of these extensions instead: {', '.join(f'.{e}' for e in READERS)} "
+            f"(optionally compressed as {', '.join(COMPRESSIONS)})"
+        )
+    return _resolve(READERS, extension)
+
+
+def get_streaming_reader(filepath: str) -> Optional[Reader]:
+    """
+    Returns the streaming reader for given input file (see `STREAMING_READERS`), or `None` if its format has none.
+    """
+    extension, _ = split_suffix(filepath)
+    if extension not in STREAMING_READERS:
+        return None
+    return _resolve(STREAMING_READERS, extension)
+
+
+def is_supported(filepath: str) -> bool:
+    """
+    Returns whether there is an alignment reader for given input file.
+    """
+    extension, _ = split_suffix(filepath)
+    return extension in READERS
+
+
+def alignment_name(filepath: str) -> str:
+    """
+    Returns the name of the alignment in given input file, i.e., its file name without extension nor compression
+    suffix.
+    """
+    name = Path(filepath).name
+    for _ in range(2):
+        stem, suffix = Path(name).stem, Path(name).suffix.lower()
+        if suffix in COMPRESSIONS or suffix[1:] in READERS:
+            name = stem
+    return name
+
+
+def read_alignments(filepath: str) -> Iterator[Alignment]:
+    """
+    Yields every alignment in an input file, one at a time. Compressed files (.gz, .bz2, .xz, .zst) are decompressed
+    on the fly.
+    """
+    return get_reader(filepath)(filepath)
@@ -0,0 +1,54 @@
+from typing import Iterator
+
+from Bio import AlignIO
+
+from salon.alignment import Alignment, SubAlignment
+from salon.readers import alignment_name
+from salon.sink import open_text
+
+
+def _read_alignio(filepath: str, format: str) -> Iterator[Alignment]:
+    """
+    Reads every alignment in a file supported by Biopython's `AlignIO`, which parses one alignment at a time. Every
+    sequence is part of a single sub-alignment named after the alignment. Residues are converted to uppercase.
+
+    :param format: `AlignIO` format name.
+    """
+    name = alignment_name(filepath)
+
+    with open_text(filepath) as f:
+        for i, records in enumerate(AlignIO.parse(f, format)):
+            alignment = Alignment(f"{name}_{i + 1}" if i else name)
+            subalignment = SubAlignment("subalignment", label=alignment.name)
+            alignment.subalignments.append(subalignment)
+
+            for record in records:
+                # TODO: check if protein or dna
+                alignment.append(
+                    str(record.seq).upper(),
+                    name=record.id,
+                    seq_type="Protein",
+                    accession=record.id.upper(),
+                    subalignments=(subalignment,),
+                )
+            yield alignment.close()
+
+
+def read_clustal(filepath: str) -> Iterator[Alignment]:
+    """
+    Reads an input alignment in Clustal format.
+
+    :param filepath: Input file in Clustal format.
+    :return: Iterator over the alignment in the file.
+    """
+    return _read_alignio(filepath, "clustal")
+
+
+def read_phylip(filepath: str) -> Iterator[Alignment]:
+    """
+    Reads the alignments in a (relaxed) PHYLIP file, i.e., with sequence names separated from residues by whitespace.
+
+    :param filepath: Input file in PHYLIP format.
+    :return: Iterator over the alignments in the file.
+    """
+    return _read_alignio(filepath, "phylip-relaxed")
@@ -0,0 +1,75 @@
+import re
+from typing import Callable, Iterator
+
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+
+from salon.alignment import Alignment, SubAlignment
+from salon.readers import alignment_name
+from salon.sink import open_text
+
+# lowercase residues of A3M sequences, i.e., insertions relative to the match columns
+_INSERTIONS_PATTERN = re.compile(r"[a-z]")
+
+
+def _read_fasta_like(filepath: str, residues: Callable[[str], str]) -> Iterator[Alignment]:
+    """
+    Reads an input alignment in a FASTA-like format, one record at a time. Every sequence is part of a single
+    sub-alignment named after the file.
+
+    :param residues: Function mapping the sequence of each record to the residues kept in the alignment.
+    """
+    name = alignment_name(filepath)
+
+    alignment = Alignment(name)
+    subalignment = SubAlignment("subalignment", label=name)
+    alignment.subalignments.append(subalignment)
+
+    with open_text(filepath) as f:
+        for title, sequence in SimpleFastaParser(line for line in f if not line.startswith("#")):
+            identifier = title.split(None, 1)[0] if title else ""
+            # TODO: check if protein or dna
+            alignment.append(
+                residues(sequence),
+                name=identifier,
+                seq_type="Protein",
+                accession=identifier.upper(),
+                subalignments=(subalignment,),
+            )
+
+    alignment.close()
+    if len(set(alignment.lengths.tolist())) > 1:
+        raise ValueError(f"Sequences of {filepath} must all be the same length")
+
+    yield alignment
+
+
+def read_fasta(filepath: str) -> Iterator[Alignment]:
+    """
+    Reads an input alignment in FASTA format. Residues are converted to uppercase.
+
+    :param filepath: Input file in FASTA-like format.
+    :return: Iterator over the alignment in the file.
+    """
+    return _read_fasta_like(filepath, str.upper)
+
+
+def read_a2m(filepath: str) -> Iterator[Alignment]:
+    """
+    Reads an input alignment in A2M format. Residues are kept as they are: uppercase letters and ``-`` are match
+    columns, whereas lowercase letters and ``.`` are insertions.
+
+    :param filepath: Input file in A2M format.
+    :return: Iterator over the alignment in the file.
+    """
+    return _read_fasta_like(filepath, str)
+
+
+def read_a3m(filepath: str) -> Iterator[Alignment]:
+    """
+    Reads an input alignment in A3M format. Since insertions (lowercase letters) are not aligned in A3M, they are
+    dropped, and the alignment is made of the match columns only.
+
+    :param filepath: Input file in A3M format.
+    :return: Iterator over the alignment in the file.
+    """
+    return _read_fasta_like(filepath, lambda sequence: _INSERTIONS_PATTERN.sub("", sequence))
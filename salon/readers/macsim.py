@@ -0,0 +1,144 @@
+from typing import Iterator, Tuple
+
+from salon.alignment import Alignment, Feature, SubAlignment
+from salon.readers import alignment_name
+from salon.sink import open_text
+
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+def _macsim_sequence(alignment: Alignment, sequence, subalignments: Tuple[SubAlignment, ...]) -> None:
+    """
+    Adds a single MACSIM/XML ``<sequence>`` element to an alignment.
+
+    :param alignment: Alignment.
+    :param sequence: Sequence element.
+    :param subalignments: Sub-alignments the sequence belongs to.
+    """
+    seq_name = ""
+    for item in sequence.iterfind("seq-name"):
+        seq_name = item.text
+
+    residues = ""
+    for item in sequence.iterfind("seq-data"):
+        residues = item.text.strip()
+
+    features = [
+        Feature(
+            ftype=item.findtext("ftype"),
+            fnote=item.findtext("fnote"),
+            fstart=item.findtext("fstart"),
+            fstop=item.findtext("fstop"),
+            fscore=item.findtext("fscore"),
+        )
+        for item in sequence.iter("fitem")
+    ]
+
+    accession, definition, organism = None, None, None
+    for info in sequence.iter("seq-info"):
+        for item in info.iterfind("accession"):
+            # item_alpha = re.sub(r'[\W_]+', '', item.text)  # keep only alphanumeric
+            accession = item.text
+        for item in info.iterfind("definition"):
+            definition = item.text.strip()
+        for item in info.iterfind("organism"):
+            organism = item.text.strip()
+
+    alignment.append(
+        residues,
+        name=seq_name,
+        seq_type=sequence.attrib["seq-type"],
+        accession=accession,
+        definition=definition,
+        organism=organism,
+        features=features,
+        subalignments=subalignments,
+    )
+
+
+def _iter_elements(filepath: str) -> Iterator[Tuple[str, object]]:
+    """
+    Reads an input alignment in MACSIM/XML format incrementally with `iterparse`, in a single pass: every child of an
+    ``<alignment>`` is visited once and dropped from the tree as soon as it has been consumed, so that no more than a
+    single ``<sequence>`` is held in memory at once.
+
+    :return: Iterator over tuples of the tag of each child of ``<alignment>`` and either its text (``<aln-name>`` and
+        ``<aln-score>``) or the element itself (``<sequence>``, only valid until the next one is read).
+    """
+    with open_text(filepath, "rb") as f:
+        context = ET.iterparse(f, events=("start", "end"))
+        _, root = next(context)
+
+        # nesting level of the open elements: <macsim> is 1, <alignment> is 2 and its children are 3
+        depth, element = 1, None
+        for event, elem in context:
+            if event == "start":
+                depth += 1
+                if depth == 2 and elem.tag == "alignment":
+                    element = elem
+                continue
+
+            depth -= 1
+            if depth == 1:
+                root.remove(elem)
+                element = None
+                continue
+            if depth != 2 or element is None:
+                # nested element, released together with its top-level parent
+                continue
+
+            if elem.tag in ("aln-name", "aln-score"):
+                yield elem.tag, elem.text
+            elif elem.tag == "sequence":
+                yield elem.tag, elem
+            element.remove(elem)
+
+
+def _read_macsim_xml(filepath: str, stream: bool) -> Iterator[Alignment]:
+    alignment = Alignment(alignment_name(filepath))
+
+    subalignment, subalignments = None, ()
+    for tag, value in _iter_elements(filepath):
+        if tag == "aln-name":
+            subalignment = SubAlignment(value.replace("/", "-"))
+            subalignments += (subalignment,)
+            alignment.subalignments.append(subalignment)
+        elif tag == "aln-score":
+            # scores are named after the sub-alignment they follow (i.e., its <aln-name>)
+            alignment.scores.append((subalignment, value))
+        elif stream:
+            part = Alignment(alignment.name)
+            _macsim_sequence(part, value, subalignments)
+            yield part.close()
+        else:
+            _macsim_sequence(alignment, value, subalignments)
+
+    yield alignment.close()
+
+
+def read_macsim_xml(filepath: str) -> Iterator[Alignment]:
+    """
+    Reads an input alignment in MACSIM/XML format. Sequences are added to the alignment as they are read, so that
+    only the compact alignment model is kept in memory (see `_iter_elements`).
+
+    :param filepath: Input file in MACSIM/XML format.
+    :return: Iterator over the alignment in the file.
+    """
+    return _read_macsim_xml(filepath, stream=False)
+
+
+def stream_macsim_xml(filepath: str) -> Iterator[Alignment]:
+    """
+    Reads an input alignment in MACSIM/XML format one sequence at a time, for consumers that never need the whole
+    alignment (e.g., plain conversion to RDF), so that memory use does not depend on the number of sequences.
+
+    Every sequence is yielded as soon as it is read, as part of an alignment of its own (with the name of the whole
+    one). The whole alignment, with every sub-alignment and score but without sequences, is yielded last.
+
+    :param filepath: Input file in MACSIM/XML format.
+    :return: Iterator over single-sequence alignments, followed by the alignment without sequences.
+    """
+    return _read_macsim_xml(filepath, stream=True)
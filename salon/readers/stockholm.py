@@ -0,0 +1,76 @@
+from typing import Dict, Iterator, List
+
+from salon.alignment import Alignment, SubAlignment
+from salon.readers import alignment_name
+from salon.sink import open_text
+
+
+def _alignment(name: str, sequences: Dict[str, List[str]], annotations: Dict[str, Dict[str, str]]) -> Alignment:
+    alignment = Alignment(name)
+    subalignment = SubAlignment("subalignment", label=name)
+    alignment.subalignments.append(subalignment)
+
+    for identifier, chunks in sequences.items():
+        annotation = annotations.get(identifier, {})
+        alignment.append(
+            "".join(chunks),
+            name=identifier,
+            seq_type="Protein",
+            accession=annotation.get("AC", identifier.split("/", 1)[0]),
+            definition=annotation.get("DE"),
+            organism=annotation.get("OS"),
+            subalignments=(subalignment,),
+        )
+
+    alignment.close()
+    if len(set(alignment.lengths.tolist())) > 1:
+        raise ValueError(f"Sequences of alignment {name} must all be the same length")
+    return alignment
+
+
+def read_stockholm(filepath: str) -> Iterator[Alignment]:
+    """
+    Reads every alignment in a Stockholm file (e.g., from Pfam) in a single pass, yielding each of them as soon as its
+    ``//`` terminator is read. Alignments are named after their ``#=GF ID`` annotation if present, or else after the
+    file (with a numeric suffix for every alignment but the first one). Sequence accession numbers, descriptions and
+    organisms are taken from ``#=GS`` annotations. Residues are kept as they are (i.e., lowercase letters and ``.``
+    denote insertions).
+
+    :param filepath: Input file in Stockholm format.
+    :return: Iterator over the alignments in the file.
+    :raise ValueError: If a sequence line has no residues.
+    """
+    name = alignment_name(filepath)
+
+    index, identifier = 0, None
+    sequences: Dict[str, List[str]] = {}
+    annotations: Dict[str, Dict[str, str]] = {}
+
+    with open_text(filepath) as f:
+        for number, line in enumerate(f, start=1):
+            line = line.rstrip("\n")
+            if line.startswith("//"):
+                if sequences:
+                    yield _alignment(identifier or (f"{name}_{index + 1}" if index else name), sequences, annotations)
+                    index += 1
+                identifier, sequences, annotations = None, {}, {}
+            elif line.startswith("#=GF ID"):
+                identifier = line[7:].strip()
+            elif line.startswith("#=GS"):
+                parts = line.split(None, 3)
+                if len(parts) == 4:
+                    _, sequence, feature, value = parts
+                    annotations.setdefault(sequence, {})[feature] = value.strip()
+            elif line.startswith("#") or not line.strip():
+                # other annotations (#=GF, #=GR, #=GC) and header
+                continue
+            else:
+                parts = line.split(None, 1)
+                if len(parts) != 2:
+                    raise ValueError(f"Sequence {parts[0]} has no residues ({filepath}, line {number})")
+                sequence, residues = parts
+                sequences.setdefault(sequence, []).append(residues.strip())
+
+    # last alignment is not terminated
+    if sequences:
+        yield _alignment(identifier or (f"{name}_{index + 1}" if index else name), sequences, annotations)
@@ -0,0 +1,390 @@
+import logging
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from rdflib import OWL, RDF, RDFS, Graph, Literal, Namespace, URIRef, Variable
+from rdflib.collection import Collection
+from rdflib.term import Node
+
+from salon.sink import Triple
+
+logger = logging.getLogger(__name__)
+
+SWRL = Namespace("http://www.w3.org/2003/11/swrl#")
+SWRLB = Namespace("http://www.w3.org/2003/11/swrlb#")
+SWRLA = Namespace("http://swrl.stanford.edu/ontologies/3.3/swrla.owl#")
+
+# triple pattern, whose terms may be variables
+Pattern = Tuple[Node, Node, Node]
+Binding = Dict[Variable, Node]
+
+
+def _number(term: Node) -> float:
+    if not isinstance(term, Literal):
+        raise ValueError(f"Not a literal: {term}")
+    return float(term)
+
+
+def _compare(operator: Callable[[float, float], bool]) -> Callable[[Node, Node], bool]:
+    def builtin(first: Node, second: Node) -> bool:
+        try:
+            return operator(_number(first), _number(second))
+        except ValueError:
+            return False
+
+    return builtin
+
+
+# SWRL built-ins, as predicates over the (bound) terms of their arguments
+BUILTINS = {
+    SWRLB.equal: lambda first, second: first == second,
+    SWRLB.notEqual: lambda first, second: first != second,
+    SWRLB.lessThan: _compare(lambda first, second: first < second),
+    SWRLB.lessThanOrEqual: _compare(lambda first, second: first <= second),
+    SWRLB.greaterThan: _compare(lambda first, second: first > second),
+    SWRLB.greaterThanOrEqual: _compare(lambda first, second: first >= second),
+}
+
+
+class Rule:
+    """
+    Horn rule: if every triple pattern in `body` matches (with built-ins holding for the variables bound), the
+    triples of `head` are inferred.
+    """
+
+    __slots__ = ("name", "body", "builtins", "head")
+
+    def __init__(
+        self,
+        name: str,
+        body: List[Pattern],
+        head: List[Pattern],
+        builtins: List[Tuple[URIRef, Tuple[Node, ...]]] = (),
+    ):
+        self.name = name
+        self.body = body
+        self.head = head
+        self.builtins = list(builtins)
+
+    def __repr__(self) -> str:
+        return f"Rule({self.name!r})"
+
+
+class TripleIndex:
+    """
+    Set of triples indexed by predicate and subject, and by predicate and object, so that every triple pattern (with
+    bound predicate) is matched through a single lookup. Indexes can be stacked on a (read-only) `parent` index, e.g.,
+    the facts of each alignment on top of those of the ontology.
+    """
+
+    def __init__(self, parent: "TripleIndex" = None):
+        self.parent = parent
+        self.triples: Set[Triple] = set()
+        self._objects: Dict[Tuple[Node, Node], Set[Node]] = {}
+        self._subjects: Dict[Tuple[Node, Node], Set[Node]] = {}
+        self._pairs: Dict[Node, Set[Tuple[Node, Node]]] = {}
+
+    def __contains__(self, triple: Triple) -> bool:
+        return triple in self.triples or (self.parent is not None and triple in self.parent)
+
+    def __len__(self) -> int:
+        return len(self.triples)
+
+    def add(self, triple: Triple) -> bool:
+        """
+        Adds a triple to the index.
+
+        :return: Whether the triple is new (i.e., not in this index nor its parents).
+        """
+        if triple in self:
+            return False
+
+        s, p, o = triple
+        self.triples.add(triple)
+        self._objects.setdefault((s, p), set()).add(o)
+        self._subjects.setdefault((p, o), set()).add(s)
+        self._pairs.setdefault(p, set()).add((s, o))
+        return True
+
+    def count(self, s: Optional[Node], p: Node, o: Optional[Node]) -> int:
+        """
+        Returns the number of triples with predicate `p` that match subject `s` and object `o` (any if `None`).
+        """
+        if s is not None and o is not None:
+            count = int((s, p, o) in self.triples)
+        elif s is not None:
+            count = len(self._objects.get((s, p), ()))
+        elif o is not None:
+            count = len(self._subjects.get((p, o), ()))
+        else:
+            count = len(self._pairs.get(p, ()))
+
+        if self.parent is not None:
+            count += self.parent.count(s, p, o)
+        return count
+
+    def match(self, s: Optional[Node], p: Node, o: Optional[Node]) -> Iterator[Triple]:
+        """
+        Yields the triples with predicate `p` that match subject `s` and object `o` (any if `None`).
+        """
+        if s is not None and o is not None:
+            if (s, p, o) in self.triples:
+                yield s, p, o
+        elif s is not None:
+            for obj in self._objects.get((s, p), ()):
+                yield s, p, obj
+        elif o is not None:
+            for subject in self._subjects.get((p, o), ()):
+                yield subject, p, o
+        else:
+            for subject, obj in self._pairs.get(p, ()):
+                yield subject, p, obj
+
+        if self.parent is not None:
+            yield from self.parent.match(s, p, o)
+
+
+def _resolve(term: Node, binding: Binding) -> Optional[Node]:
+    """
+    Returns the value of a pattern term under `binding` (`None` for unbound variables).
+    """
+    if isinstance(term, Variable):
+        return binding.get(term)
+    return term
+
+
+def _unify(pattern: Pattern, triple: Triple, binding: Binding) -> Optional[Binding]:
+    """
+    Extends `binding` so that `pattern` matches `triple`, or returns `None` if they conflict.
+    """
+    extended = binding
+    for term, value in zip(pattern, triple):
+        if isinstance(term, Variable):
+            bound = extended.get(term)
+            if bound is None:
+                if extended is binding:
+                    extended = dict(binding)
+                extended[term] = value
+            elif bound != value:
+                return None
+        elif term != value:
+            return None
+    return extended
+
+
+def _key(pattern: Pattern) -> Tuple[Node, Optional[Node]]:
+    """
+    Returns the key under which triples matching `pattern` are looked up: predicate, and class for `rdf:type`.
+    """
+    _, p, o = pattern
+    if p == RDF.type and not isinstance(o, Variable):
+        return p, o
+    return p, None
+
+
+class Reasoner:
+    """
+    Forward-chaining materializer of the SWRL rules (and property and class hierarchies) of an ontology.
+
+    Rules are evaluated semi-naively: each round only considers rule instantiations in which at least one body atom
+    matches a triple inferred (or added) in the previous round, and body atoms are joined through `TripleIndex`
+    lookups, most selective atom first, instead of scanning the whole graph. Facts of the ontology itself (e.g., score
+    cutoffs of score functions) are indexed once, and each batch of triples (e.g., an alignment) is materialized on
+    top of them independently.
+    """
+
+    def __init__(self, rules: List[Rule], facts: Iterable[Triple] = ()):
+        self.rules = rules
+        self.facts = TripleIndex()
+        for triple in facts:
+            self.facts.add(triple)
+
+        # rule body atoms that may match a triple, by lookup key
+        self._triggers: Dict[Tuple[Node, Optional[Node]], List[Tuple[Rule, int]]] = {}
+        for rule in rules:
+            for i, pattern in enumerate(rule.body):
+                self._triggers.setdefault(_key(pattern), []).append((rule, i))
+
+    @classmethod
+    def from_ontology(cls, graph: Graph) -> "Reasoner":
+        """
+        Builds a reasoner from the property and class axioms (see `axiom_rules`) and enabled SWRL rules (see
+        `swrl_rules`) of an ontology. Every other triple of the ontology is kept as fact.
+        """
+        return cls(axiom_rules(graph) + swrl_rules(graph), graph)
+
+    def infer(self, triples: Iterable[Triple]) -> Set[Triple]:
+        """
+        Materializes every triple entailed by the rules from `triples` (and the ontology facts).
+
+        :return: Inferred triples, not in `triples` nor in the ontology.
+        """
+        index = TripleIndex(parent=self.facts)
+        delta = [triple for triple in triples if index.add(triple)]
+
+        inferred = set()
+        while delta:
+            new = set()
+            for triple in delta:
+                for rule, i in self._triggered(triple):
+                    binding = _unify(rule.body[i], triple, {})
+                    if binding is None:
+                        continue
+                    rest = rule.body[:i] + rule.body[i + 1 :]
+                    for solution in self._solutions(rest, rule.builtins, binding, index, rule.head, new):
+                        for head in rule.head:
+                            values = tuple(_resolve(term, solution) for term in head)
+                            if None not in values and values not in index:
+                                new.add(values)
+
+            for triple in new:
+                index.add(triple)
+            inferred |= new
+            delta = list(new)
+
+        return inferred
+
+    def _triggered(self, triple: Triple) -> Iterator[Tuple[Rule, int]]:
+        """
+        Yields the rule body atoms that may match `triple`.
+        """
+        _, p, o = triple
+        yield from self._triggers.get((p, None), ())
+        if p == RDF.type:
+            yield from self._triggers.get((p, o), ())
+
+    def _solutions(
+        self,
+        patterns: List[Pattern],
+        builtins: List[Tuple[URIRef, Tuple[Node, ...]]],
+        binding: Binding,
+        index: TripleIndex,
+        head: List[Pattern] = (),
+        inferred: Set[Triple] = frozenset(),
+    ) -> Iterator[Binding]:
+        """
+        Yields every extension of `binding` under which `patterns` match in `index` and `builtins` hold. Extensions
+        that would only infer triples already known (i.e., in `index` or `inferred`) are skipped as soon as every
+        variable of `head` is bound.
+        """
+        if head:
+            values = [tuple(_resolve(term, binding) for term in pattern) for pattern in head]
+            if all(None not in triple and (triple in inferred or triple in index) for triple in values):
+                return
+
+        # built-ins are checked as soon as their arguments are bound, to prune joins early
+        pending = []
+        for builtin, arguments in builtins:
+            values = [_resolve(argument, binding) for argument in arguments]
+            if None in values:
+                pending.append((builtin, arguments))
+            elif not BUILTINS[builtin](*values):
+                return
+
+        if not patterns:
+            if not pending:
+                yield binding
+            return
+
+        # most selective pattern first, i.e., that with the fewest matches under the current binding
+        resolved = [tuple(_resolve(term, binding) for term in pattern) for pattern in patterns]
+        counts = [index.count(*terms) for terms in resolved]
+        i = counts.index(min(counts))
+        if not counts[i]:
+            return
+        pattern, rest = patterns[i], patterns[:i] + patterns[i + 1 :]
+
+        for triple in index.match(*resolved[i]):
+            extended = _unify(pattern, triple, binding)
+            if extended is not None:
+                yield from self._solutions(rest, pending, extended, index, head, inferred)
+
+
+def _swrl_term(graph: Graph, term: Node) -> Node:
+    if (term, RDF.type, SWRL.Variable) in graph:
+        return Variable(str(term).rsplit("#", 1)[-1])
+    return term
+
+
+def _swrl_atoms(graph: Graph, atoms: Node) -> Tuple[List[Pattern], List[Tuple[URIRef, Tuple[Node, ...]]]]:
+    """
+    Returns the triple patterns and built-ins of a SWRL atom list.
+    """
+    patterns, builtins = [], []
+    for atom in Collection(graph, atoms):
+        kind = graph.value(atom, RDF.type)
+        first = _swrl_term(graph, graph.value(atom, SWRL.argument1))
+        if kind == SWRL.ClassAtom:
+            patterns.append((first, RDF.type, graph.value(atom, SWRL.classPredicate)))
+        elif kind in (SWRL.IndividualPropertyAtom, SWRL.DatavaluedPropertyAtom):
+            second = _swrl_term(graph, graph.value(atom, SWRL.argument2))
+            patterns.append((first, graph.value(atom, SWRL.propertyPredicate), second))
+        elif kind == SWRL.BuiltinAtom:
+            builtin = graph.value(atom, SWRL.builtin)
+            if builtin not in BUILTINS:
+                raise ValueError(f"Unsupported SWRL built-in: {builtin}")
+            arguments = tuple(
+                _swrl_term(graph, argument) for argument in Collection(graph, graph.value(atom, SWRL.arguments))
+            )
+            builtins.append((builtin, arguments))
+        else:
+            raise ValueError(f"Unsupported SWRL atom: {kind}")
+    return patterns, builtins
+
+
+def swrl_rule(graph: Graph, imp: Node) -> Optional[Rule]:
+    """
+    Returns the rule of a SWRL implication (`swrl:Imp`), or `None` (with a warning) if it cannot be evaluated.
+    """
+    name = str(graph.value(imp, RDFS.label) or imp)
+    try:
+        body, builtins = _swrl_atoms(graph, graph.value(imp, SWRL.body))
+        head, head_builtins = _swrl_atoms(graph, graph.value(imp, SWRL.head))
+    except ValueError as e:
+        logger.warning("Skipping SWRL rule %s: %s", name, e)
+        return None
+
+    if head_builtins:
+        logger.warning("Skipping SWRL rule %s: built-ins in rule head", name)
+        return None
+    return Rule(name, body, head, builtins)
+
+
+def swrl_rules(graph: Graph) -> List[Rule]:
+    """
+    Returns the rules of the enabled SWRL implications of an ontology.
+    """
+    rules = []
+    for imp in graph.subjects(RDF.type, SWRL.Imp):
+        if graph.value(imp, SWRLA.isRuleEnabled) == Literal(False):
+            continue
+        rule = swrl_rule(graph, imp)
+        if rule is not None:
+            rules.append(rule)
+    return rules
+
+
+def axiom_rules(graph: Graph) -> List[Rule]:
+    """
+    Returns the rules of the property and class axioms of an ontology.
+    """
+    x, y = Variable("x"), Variable("y")
+
+    rules = []
+    for p, q in graph.subject_objects(OWL.inverseOf):
+        rules.append(Rule(f"{p} inverseOf {q}", [(x, p, y)], [(y, q, x)]))
+        rules.append(Rule(f"{q} inverseOf {p}", [(x, q, y)], [(y, p, x)]))
+    for p, q in graph.subject_objects(OWL.equivalentProperty):
+        rules.append(Rule(f"{p} equivalentProperty {q}", [(x, p, y)], [(x, q, y)]))
+        rules.append(Rule(f"{q} equivalentProperty {p}", [(x, q, y)], [(x, p, y)]))
+    for p, q in graph.subject_objects(RDFS.subPropertyOf):
+        if q not in (OWL.topObjectProperty, OWL.topDataProperty):
+            rules.append(Rule(f"{p} subPropertyOf {q}", [(x, p, y)], [(x, q, y)]))
+
+    for c, d in graph.subject_objects(RDFS.subClassOf):
+        if isinstance(c, URIRef) and isinstance(d, URIRef) and d != OWL.Thing:
+            rules.append(Rule(f"{c} subClassOf {d}", [(x, RDF.type, c)], [(x, RDF.type, d)]))
+    for c, d in graph.subject_objects(OWL.equivalentClass):
+        if isinstance(c, URIRef) and isinstance(d, URIRef):
+            rules.append(Rule(f"{c} equivalentClass {d}", [(x, RDF.type, c)], [(x, RDF.type, d)]))
+            rules.append(Rule(f"{d} equivalentClass {c}", [(x, RDF.type, d)], [(x, RDF.type, c)]))
+    return rules
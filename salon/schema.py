@@ -0,0 +1,101 @@
+import functools
+import gzip
+import hashlib
+import pickle
+from pathlib import Path
+from typing import List, Tuple
+
+from rdflib import Graph
+
+from salon import reasoner
+from salon.config import settings
+from salon.reasoner import Reasoner, Rule, axiom_rules, swrl_rules
+from salon.sink import Triple, nt_term
+
+# hash of the code that builds snapshots (i.e., this module and the rules of the reasoner), part of their location so
+# that snapshots built by any other version are never loaded
+SNAPSHOT_FORMAT = hashlib.blake2b(
+    Path(__file__).read_bytes() + Path(reasoner.__file__).read_bytes(), digest_size=8
+).hexdigest()
+
+
+def ontology_digest(path: str) -> str:
+    """
+    Returns the content hash of an ontology file.
+    """
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+class OntologySnapshot:
+    """
+    Compiled form of the ontology: rules (see `salon.reasoner`, including those of its class and property
+    hierarchies) and facts, plus its triples pre-serialized as gzip-compressed N-Triples (to upload it as is).
+    Snapshots are pickled, so that loading them does not require parsing RDF/XML.
+    """
+
+    __slots__ = ("digest", "rules", "facts", "ntriples")
+
+    def __init__(self, digest: str, graph: Graph):
+        self.digest = digest
+        self.rules: List[Rule] = axiom_rules(graph) + swrl_rules(graph)
+        self.facts: Tuple[Triple, ...] = tuple(graph)
+        self.ntriples = gzip.compress(
+            "".join(f"{nt_term(s)} {nt_term(p)} {nt_term(o)} .\n" for s, p, o in self.facts).encode("utf-8")
+        )
+
+
+def snapshot_path(ontology_path: str, digest: str) -> Path:
+    """
+    Returns the location of the snapshot of an ontology file with the given content hash (see also
+    `SNAPSHOT_FORMAT`).
+    """
+    return Path(settings.ONTOLOGY_SNAPSHOT_DIR, f"{Path(ontology_path).stem}-{digest}-{SNAPSHOT_FORMAT}.pickle")
+
+
+def compile_ontology(ontology_path: str) -> Tuple[OntologySnapshot, Path]:
+    """
+    Parses an ontology file (RDF/XML) and writes its snapshot.
+
+    :return: Snapshot and its location.
+    """
+    digest = ontology_digest(ontology_path)
+    graph = Graph()
+    graph.parse(ontology_path, format="xml")
+    snapshot = OntologySnapshot(digest, graph)
+
+    path = snapshot_path(ontology_path, digest)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # written to a temporary file first, so that concurrent readers never see partial snapshots
+    partial = path.with_suffix(f".{id(snapshot)}.tmp")
+    with partial.open("wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    partial.replace(path)
+    return snapshot, path
+
+
+def load_snapshot(ontology_path: str) -> OntologySnapshot:
+    """
+    Returns the snapshot of an ontology file, compiling it first if there is none for its current content.
+    """
+    path = snapshot_path(ontology_path, ontology_digest(ontology_path))
+    try:
+        with path.open("rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, AttributeError, EOFError):
+        pass
+    return compile_ontology(ontology_path)[0]
+
+
+def load_reasoner(ontology_path: str) -> Reasoner:
+    """
+    Returns the reasoner of an ontology file (from its snapshot), loaded once per process and ontology content, so
+    that long-running processes (see `salon.server`) pick up changes to the ontology.
+    """
+    return _load_reasoner(str(Path(ontology_path).resolve()), ontology_digest(ontology_path))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_reasoner(ontology_path: str, digest: str) -> Reasoner:
+    snapshot = load_snapshot(ontology_path)
+    return Reasoner(snapshot.rules, snapshot.facts)
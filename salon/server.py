@@ -0,0 +1,251 @@
+import contextlib
+import hmac
+import io
+import ipaddress
+import json
+import logging
+import os
+import socket as sockets
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional
+
+import click
+
+from salon.config import settings
+from salon.database.backends import open_repository, share_repository
+from salon.database.cache import ResultCache
+from salon.schema import load_reasoner
+
+logger = logging.getLogger(__name__)
+
+
+class SalonService:
+    """
+    Runs `saloncli` commands in a long-lived process, so that imports, connection pools and caches (query results,
+    compiled ontology and reasoner) are set up once instead of once per call. Every command shares the same
+    repository client (see `salon.database.backends.share_repository`).
+
+    Commands are run one at a time, within the working directory of the client that sent them (which must be within
+    `root`), and their output is captured and returned as a whole. Paths given as arguments (e.g., absolute ones) are
+    not confined to `root`, so it is not a sandbox: clients can read and write any file the service can.
+    """
+
+    def __init__(self, ontology: str = None, result_cache: bool = True, root: str = None):
+        """
+        :param ontology: Ontology whose reasoner is loaded upfront, if any.
+        :param result_cache: Whether query results are cached (with the size configured in settings, or 1024 entries
+            if disabled there).
+        :param root: Directory that commands may be run within, along with its subdirectories (default: current
+            working directory).
+        """
+        self.root = Path(root or os.getcwd()).resolve()
+
+        cache = None
+        if result_cache:
+            cache = ResultCache(
+                max_entries=settings.RESULT_CACHE_MAX_ENTRIES or 1024, ttl=settings.RESULT_CACHE_TTL or None
+            )
+        self.repository = open_repository(cache=cache)
+        share_repository(self.repository)
+
+        if ontology and Path(ontology).is_file():
+            load_reasoner(ontology)
+
+        self.started = time.time()
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def run(self, argv: List[str], cwd: str = None) -> dict:
+        """
+        Runs a command (as given in the command line, e.g., `["parse", "-i", "input.xml"]`).
+
+        :return: Exit code, and captured standard output and error.
+        """
+        # imported here, as commands import this module
+        from salon.cli import entry_point
+
+        if argv[:1] == ["serve"]:
+            return {"exit_code": 2, "stdout": "", "stderr": "Error: Cannot run serve within the service.\n"}
+
+        cwd = Path(cwd).resolve() if cwd else self.root
+        if not cwd.is_dir() or (cwd != self.root and self.root not in cwd.parents):
+            return {"exit_code": 2, "stdout": "", "stderr": f"Error: Cannot run commands outside of {self.root}.\n"}
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with self._lock, contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            self.requests += 1
+            previous = os.getcwd()
+            try:
+                os.chdir(cwd)
+                entry_point.main(args=argv, prog_name="saloncli", standalone_mode=False)
+                exit_code = 0
+            except click.ClickException as e:
+                e.show()
+                exit_code = e.exit_code
+            except click.Abort:
+                click.echo("Aborted!", err=True)
+                exit_code = 1
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else int(e.code is not None)
+            except Exception as e:
+                logger.exception("Command %s failed", argv)
+                click.echo(f"Error: {e!r}", err=True)
+                exit_code = 1
+            finally:
+                os.chdir(previous)
+
+        return {"exit_code": exit_code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+    def status(self) -> dict:
+        cache = self.repository.result_cache
+        return {
+            "backend": settings.BACKEND,
+            "dataset": self.repository.dataset,
+            "root": str(self.root),
+            "uptime": time.time() - self.started,
+            "requests": self.requests,
+            "result_cache": cache.stats if cache is not None else None,
+        }
+
+    def close(self) -> None:
+        share_repository(None)
+        self.repository.keep_alive = False
+        self.repository.close()
+
+
+def _is_loopback_host(host: str) -> bool:
+    """
+    Returns whether the value of a `Host` header names a loopback address, without resolving it (as names of other
+    sites may resolve to loopback addresses too, i.e., DNS rebinding).
+    """
+    host = host.rsplit(":", 1)[0] if host.count(":") == 1 else host
+    host = host.strip("[]")
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    JSON API of the service: `POST /run` with `{"argv": [...], "cwd": "..."}` runs a command (see `SalonService.run`),
+    and `GET /status` reports uptime and cache statistics. If the service has a `token`, every request must carry it
+    (as `Authorization: Bearer <token>`).
+
+    Requests sent by web browsers (i.e., with an `Origin` header), naming any host but a loopback one (if `local`) or
+    with a body other than JSON are refused, so that web pages can neither send commands nor read their output.
+    """
+
+    service: SalonService
+    token: Optional[str] = None
+    local: bool = True
+
+    def _authorized(self) -> bool:
+        if "Origin" in self.headers:
+            self._reply(403, {"error": "Cross-origin requests are not allowed"})
+            return False
+        if self.local and not _is_loopback_host(self.headers.get("Host", "")):
+            self._reply(403, {"error": f"Invalid host: {self.headers.get('Host')}"})
+            return False
+        if not self.token:
+            return True
+        given = self.headers.get("Authorization", "")
+        if hmac.compare_digest(given.encode("utf-8"), f"Bearer {self.token}".encode("utf-8")):
+            return True
+        self._reply(401, {"error": "Missing or invalid token"})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path != "/status":
+            return self._reply(404, {"error": f"Not found: {self.path}"})
+        self._reply(200, self.service.status())
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self.path != "/run":
+            return self._reply(404, {"error": f"Not found: {self.path}"})
+        if self.headers.get_content_type() != "application/json":
+            return self._reply(415, {"error": "Content-Type must be application/json"})
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            argv = [str(arg) for arg in request["argv"]]
+        except (ValueError, KeyError, TypeError) as e:
+            return self._reply(400, {"error": f"Invalid request: {e}"})
+        self._reply(200, self.service.run(argv, request.get("cwd")))
+
+    def _reply(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def address_string(self) -> str:
+        # clients of Unix sockets have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        Path(self.server_address).unlink(missing_ok=True)
+        super().server_bind()
+        # only reachable by the user running the service
+        os.chmod(self.server_address, 0o600)
+
+
+def is_loopback(host: str) -> bool:
+    """
+    Returns whether every address a host name resolves to is a loopback one (i.e., only reachable from this machine).
+    """
+    try:
+        addresses = {info[4][0] for info in sockets.getaddrinfo(host, None)}
+    except OSError:
+        return False
+    return bool(addresses) and all(ipaddress.ip_address(address.split("%", 1)[0]).is_loopback for address in addresses)
+
+
+def make_server(
+    service: SalonService, host: str = "127.0.0.1", port: int = 8421, socket: str = None, token: str = None
+) -> socketserver.BaseServer:
+    """
+    Returns the HTTP server of the service, listening either on `host`:`port` or on Unix socket `socket`.
+
+    :param token: Token that every request must carry. Required unless listening on a Unix socket (only accessible to
+        the user running the service), as anyone (or any local process) able to connect can run commands as that user.
+    :raise ValueError: If listening on TCP without token.
+    """
+    if not socket and not token:
+        raise ValueError(f"A token is required to listen on {host}:{port}")
+
+    local = bool(socket) or is_loopback(host)
+    handler = type("Handler", (_Handler,), {"service": service, "token": token, "local": local})
+    if socket:
+        return _UnixHTTPServer(socket, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(server: socketserver.BaseServer) -> None:
+    """
+    Serves requests (see `make_server`) until interrupted, then closes the server and removes its Unix socket, if any.
+    """
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if isinstance(server, _UnixHTTPServer):
+            Path(server.server_address).unlink(missing_ok=True)
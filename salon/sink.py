@@ -0,0 +1,254 @@
+import bz2
+import gzip
+import lzma
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import IO, Iterable, Optional, Tuple
+
+from rdflib import OWL, RDF, RDFS, XSD, BNode, Graph, Literal, Namespace, URIRef
+from rdflib.term import Node
+
+from salon.config import settings
+
+Triple = Tuple[Node, Node, Node]
+
+# maps RDF syntax suffixes to rdflib serialization formats
+FORMATS = {
+    "ttl": "turtle",
+    "turtle": "turtle",
+    "nt": "nt",
+    "nq": "nquads",
+    "xml": "xml",
+    "rdf": "xml",
+    "owl": "xml",
+    "n3": "n3",
+    "trig": "trig",
+    "jsonld": "json-ld",
+}
+
+COMPRESSIONS = (".gz", ".bz2", ".xz", ".zst")
+
+# local names written as prefixed names by `TurtleSink` (a subset of those allowed by Turtle)
+_LOCAL_NAME = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_-]*")
+
+_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"})
+
+
+def nt_term(term: Node) -> str:
+    """
+    Returns the N-Triples representation of an RDF term.
+    """
+    if isinstance(term, URIRef):
+        return f"<{term}>"
+    if isinstance(term, Literal):
+        lexical = f'"{str(term).translate(_ESCAPES)}"'
+        if term.language:
+            return f"{lexical}@{term.language}"
+        if term.datatype:
+            return f"{lexical}^^<{term.datatype}>"
+        return lexical
+    if isinstance(term, BNode):
+        return f"_:{term}"
+    raise TypeError(f"Unsupported RDF term: {term!r}")
+
+
+def split_suffix(path: str) -> Tuple[str, Optional[str]]:
+    """
+    Returns the RDF syntax suffix (without the leading dot) and compression suffix (if any) of a file path, e.g.,
+    ``("nt", ".gz")`` for ``output.nt.gz``.
+    """
+    suffixes = [suffix.lower() for suffix in Path(path).suffixes]
+    compression = None
+    if suffixes and suffixes[-1] in COMPRESSIONS:
+        compression = suffixes.pop()
+    return (suffixes[-1][1:] if suffixes else ""), compression
+
+
+def open_text(path: str, mode: str = "rt") -> IO:
+    """
+    Opens a (possibly compressed) file, in text mode unless `mode` says otherwise. Compression is inferred from the
+    file suffix.
+    """
+    _, compression = split_suffix(path)
+    kwargs = {} if "b" in mode else {"encoding": "utf-8"}
+    if compression == ".gz":
+        return gzip.open(path, mode, **kwargs)
+    if compression == ".bz2":
+        return bz2.open(path, mode, **kwargs)
+    if compression == ".xz":
+        return lzma.open(path, mode, **kwargs)
+    if compression == ".zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstandard is required to handle .zst files, try: pip install zstandard")
+        return zstandard.open(path, mode, **kwargs)
+    return open(path, mode, **kwargs)
+
+
+class TripleSink(ABC):
+    """
+    Destination of the triples emitted by the alignment parsers.
+    """
+
+    def addN(self, triples: Iterable[Triple]) -> int:
+        """
+        Adds every triple in `triples` to the sink.
+
+        :return: Number of triples added.
+        """
+        count = 0
+        for triple in triples:
+            self.add(triple)
+            count += 1
+        return count
+
+    @abstractmethod
+    def add(self, triple: Triple) -> None:
+        """
+        Adds a single triple to the sink.
+        """
+        pass
+
+    def set_graph(self, graph: Optional[URIRef]) -> None:
+        """
+        Sets the named graph of the triples added from now on. Ignored by sinks without named graphs support.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Flushes and releases the sink.
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class GraphSink(TripleSink):
+    """
+    Collects triples in an in-memory rdflib graph, serialized on close if a destination is given. Suitable for
+    small inputs and for RDF syntaxes that cannot be streamed (e.g., RDF/XML or JSON-LD).
+    """
+
+    def __init__(self, destination: str = None, format: str = "turtle"):
+        self.destination = destination
+        self.format = format
+
+        self.graph = Graph()
+        self.graph.bind(settings.ONTOLOGY_NAMESPACE, Namespace(settings.ONTOLOGY_IRI))
+
+    def add(self, triple: Triple) -> None:
+        self.graph.add(triple)
+
+    def close(self) -> None:
+        if self.destination:
+            self.graph.serialize(destination=self.destination, format=self.format)
+
+
+class NTriplesSink(TripleSink):
+    """
+    Writes triples to disk as they are produced, one N-Triples line each. If `quads` is set, lines are written as
+    N-Quads instead, within named graph `graph` (see `set_graph`).
+    """
+
+    def __init__(self, destination: str, graph: Optional[URIRef] = None, mode: str = "wt", quads: bool = None):
+        self.destination = destination
+        self.quads = graph is not None if quads is None else quads
+
+        self.set_graph(graph)
+        self._file = open_text(destination, mode)
+
+    def set_graph(self, graph: Optional[URIRef]) -> None:
+        if self.quads:
+            self.graph = graph
+            self._suffix = f" {nt_term(graph)} .\n" if graph is not None else " .\n"
+        else:
+            self.graph, self._suffix = None, " .\n"
+
+    def add(self, triple: Triple) -> None:
+        s, p, o = triple
+        self._file.write(f"{nt_term(s)} {nt_term(p)} {nt_term(o)}{self._suffix}")
+
+    def addN(self, triples: Iterable[Triple]) -> int:
+        count = 0
+        write, suffix = self._file.write, self._suffix
+        for s, p, o in triples:
+            write(f"{nt_term(s)} {nt_term(p)} {nt_term(o)}{suffix}")
+            count += 1
+        return count
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class TurtleSink(TripleSink):
+    """
+    Writes triples to disk as they are produced, in Turtle: IRIs of the ontology and RDF vocabularies are written as
+    prefixed names, and consecutive triples of the same subject as a single block. Unlike `GraphSink`, triples are
+    neither grouped by subject (beyond consecutive ones) nor deduplicated.
+    """
+
+    def __init__(self, destination: str, mode: str = "wt"):
+        self.destination = destination
+        self.prefixes = {
+            settings.ONTOLOGY_NAMESPACE: settings.ONTOLOGY_IRI,
+            "rdf": str(RDF),
+            "rdfs": str(RDFS),
+            "owl": str(OWL),
+            "xsd": str(XSD),
+        }
+
+        self._file = open_text(destination, mode)
+        self._file.writelines(f"@prefix {prefix}: <{iri}> .\n" for prefix, iri in self.prefixes.items())
+        self._subject = None
+
+    def _term(self, term: Node) -> str:
+        if isinstance(term, URIRef):
+            for prefix, iri in self.prefixes.items():
+                if term.startswith(iri) and _LOCAL_NAME.fullmatch(term, len(iri)):
+                    return f"{prefix}:{term[len(iri):]}"
+        elif isinstance(term, Literal) and term.datatype and not term.language:
+            return f'"{str(term).translate(_ESCAPES)}"^^{self._term(term.datatype)}'
+        return nt_term(term)
+
+    def add(self, triple: Triple) -> None:
+        s, p, o = triple
+        subject = self._term(s)
+        predicate = "a" if p == RDF.type else self._term(p)
+        if subject == self._subject:
+            self._file.write(f" ;\n    {predicate} {self._term(o)}")
+            return
+
+        self._file.write(f"{' .' if self._subject else ''}\n{subject} {predicate} {self._term(o)}")
+        self._subject = subject
+
+    def close(self) -> None:
+        if self._subject:
+            self._file.write(" .\n")
+        self._file.close()
+
+
+def open_sink(destination: str, graph: Optional[URIRef] = None) -> TripleSink:
+    """
+    Returns the sink for given output path. N-Triples and N-Quads outputs (optionally compressed with gzip, bzip2,
+    xz or zstd) and Turtle outputs are streamed to disk; any other RDF syntax is buffered in a graph.
+
+    :param destination: Output file path.
+    :param graph: Named graph for N-Quads outputs.
+    """
+    extension, compression = split_suffix(destination)
+    if extension == "nt":
+        return NTriplesSink(destination)
+    if extension == "nq":
+        return NTriplesSink(destination, graph=graph, quads=True)
+    if compression:
+        raise ValueError(f"Compressed output is only supported for N-Triples and N-Quads, got: {destination}")
+    if extension in ("ttl", "turtle"):
+        return TurtleSink(destination)
+    return GraphSink(destination, format=FORMATS.get(extension, extension))
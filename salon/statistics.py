@@ -0,0 +1,96 @@
+from typing import Tuple
+
+import numpy as np
+
+from salon.alignment import Alignment
+
+
+def _uppercase(residues: np.ndarray) -> np.ndarray:
+    return np.where((residues >= ord("a")) & (residues <= ord("z")), residues - 32, residues)
+
+
+def pairwise_identities(alignment: Alignment) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Counts, for every pair of sequences, the columns where both have a residue (aligned positions) and the columns
+    where both have the same residue (identities). Counts are computed as one matrix product per residue symbol, i.e.,
+    ``X_k @ X_k.T`` over the one-hot encoding ``X_k`` of symbol `k`, so that the cost is dominated by BLAS.
+
+    :return: Matrices (sequences x sequences) of identities and aligned positions.
+    """
+    residues = _uppercase(alignment.residues)
+    mask = alignment.residue_mask()
+
+    aligned = mask.astype(np.float32)
+    identities = np.zeros((len(alignment), len(alignment)), dtype=np.float32)
+    for symbol in np.unique(residues[mask]):
+        onehot = (residues == symbol).astype(np.float32)
+        identities += onehot @ onehot.T
+
+    return identities.astype(np.int64), (aligned @ aligned.T).astype(np.int64)
+
+
+def percent_identity(alignment: Alignment) -> np.ndarray:
+    """
+    Returns the percent identity matrix of an alignment, i.e., the percentage of identical residues over the aligned
+    positions (columns where neither sequence has a gap) of each pair of sequences.
+    """
+    identities, aligned = pairwise_identities(alignment)
+    return np.divide(100 * identities, aligned, out=np.zeros(identities.shape), where=aligned > 0)
+
+
+def column_sum_of_pairs(alignment: Alignment) -> np.ndarray:
+    """
+    Returns the sum-of-pairs score of each column, with identity scoring (1 per identical pair of residues, 0
+    otherwise; gaps never score).
+    """
+    _, counts = alignment.column_counts()
+    return (counts * (counts - 1) // 2).sum(axis=0)
+
+
+def shannon_entropy(alignment: Alignment) -> np.ndarray:
+    """
+    Returns the Shannon entropy (in bits) of the residue distribution of each column, ignoring gaps. Lower values
+    denote more conserved columns.
+    """
+    _, frequencies = alignment.column_frequencies()
+    logs = np.log2(frequencies, out=np.zeros(frequencies.shape), where=frequencies > 0)
+    return -(frequencies * logs).sum(axis=0) + 0.0
+
+
+class AlignmentStatistics:
+    """
+    Per-alignment, per-sequence and per-column metrics of an alignment, computed in batch over its residue matrix.
+    """
+
+    __slots__ = (
+        "gap_fraction",
+        "percent_identity",
+        "sum_of_pairs",
+        "sequence_gap_fraction",
+        "sequence_percent_identity",
+        "column_gap_fraction",
+        "column_sum_of_pairs",
+        "column_entropy",
+        "consensus",
+    )
+
+    def __init__(self, alignment: Alignment):
+        n = len(alignment)
+        gaps = alignment.gap_mask()
+
+        identity = percent_identity(alignment)
+        # mean identity to every other sequence (self-identity excluded)
+        upper = np.triu_indices(n, k=1)
+        self.percent_identity = float(identity[upper].mean()) if n > 1 else 0.0
+        self.sequence_percent_identity = (
+            (identity.sum(axis=1) - identity.diagonal()) / (n - 1) if n > 1 else np.zeros(n)
+        )
+
+        self.gap_fraction = float(gaps.mean()) if gaps.size else 0.0
+        self.sequence_gap_fraction = gaps.mean(axis=1) if gaps.size else np.zeros(n)
+        self.column_gap_fraction = alignment.gap_fraction()
+
+        self.column_sum_of_pairs = column_sum_of_pairs(alignment)
+        self.sum_of_pairs = int(self.column_sum_of_pairs.sum())
+        self.column_entropy = shannon_entropy(alignment)
+        self.consensus = alignment.consensus()
@@ -9,14 +9,17 @@ with open(join(basedir, "README.md"), encoding="utf-8") as f:
 
 install_requires = [
     "Biopython",
+    "numpy",
     "rdflib",
-    "SPARQLWrapper",
-    "requests",
+    "httpx",
     "click",
 ]
 extras_require = {
     "docs": install_requires + ["pylode"],
     "black": install_requires + ["isort", "black"],
+    "zstd": install_requires + ["zstandard"],
+    "oxigraph": install_requires + ["pyoxigraph"],
+    "test": install_requires + ["pytest", "pyoxigraph"],
 }
 
 setup(
@@ -29,7 +32,7 @@ setup(
     author_email="antoniobenitez@lcc.uma.es",
     license="MIT",
     url="https://github.com/benhid/SALON",
-    packages=find_packages(exclude=["test_"]),
+    packages=find_packages(exclude=["tests", "tests.*", "benchmarks"]),
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Science/Research",
@@ -41,7 +44,7 @@ setup(
     extras_require=extras_require,
     entry_points={
         "console_scripts": [
-            "saloncli=salon.cli:entry_point",
+            "saloncli=salon.client:main",
         ],
     },
 )
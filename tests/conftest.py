@@ -0,0 +1,134 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from salon.config import settings
+from salon.database.backends import open_repository
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+ONTOLOGY = Path(__file__).resolve().parent.parent / "SALON.owl"
+
+
+@pytest.fixture(autouse=True)
+def local_settings(tmp_path, monkeypatch):
+    """
+    Keeps caches, snapshots and stores of every test in its own temporary directory.
+    """
+    monkeypatch.setattr(settings, "ONTOLOGY_SNAPSHOT_DIR", str(tmp_path / "ontology"))
+    monkeypatch.setattr(settings, "MANIFEST_PATH", str(tmp_path / "manifest.sqlite"))
+    monkeypatch.setattr(settings, "UNIPROT_CACHE_PATH", str(tmp_path / "uniprot.sqlite"))
+    monkeypatch.setattr(settings, "OXIGRAPH_PATH", "")
+    monkeypatch.setattr(settings, "RESULT_CACHE_MAX_ENTRIES", 0)
+    return settings
+
+
+@pytest.fixture
+def oxigraph(local_settings, tmp_path, monkeypatch) -> str:
+    """
+    Uses an (empty) embedded Oxigraph store as backend.
+    """
+    pytest.importorskip("pyoxigraph")
+    monkeypatch.setattr(local_settings, "BACKEND", "oxigraph")
+    monkeypatch.setattr(local_settings, "OXIGRAPH_PATH", str(tmp_path / "oxigraph"))
+    return local_settings.OXIGRAPH_PATH
+
+
+def select(query: str) -> list:
+    """
+    Returns the bindings of a query to the configured repository.
+    """
+    # embedded stores are locked while open, so the repository is only kept open for each query
+    with open_repository() as repository:
+        return repository.query(query)["results"]["bindings"]
+
+
+@pytest.fixture
+def fasta(tmp_path) -> str:
+    """
+    Small FASTA alignment with gaps.
+    """
+    path = tmp_path / "small.fasta"
+    path.write_text(">seq1\nMK--LA.V\n>seq2\n-KTTLAAV\n>seq3\nMKTT--..\n")
+    return str(path)
+
+
+class StandIn:
+    """
+    Local HTTP server standing in for a remote store: records every request, and answers each with the response set
+    for the longest matching path prefix (200 with an empty body if none).
+    """
+
+    def __init__(self):
+        self.requests: List[dict] = []
+        self.responses: Dict[str, Tuple[int, str, bytes]] = {}
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._record()
+
+            def do_POST(self):
+                self._record()
+
+            def _record(self):
+                url = urlsplit(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                stand_in.requests.append(
+                    {
+                        "method": self.command,
+                        "path": url.path,
+                        "params": parse_qs(url.query),
+                        "headers": dict(self.headers),
+                        "body": body.decode("utf-8"),
+                    }
+                )
+
+                matches = [prefix for prefix in stand_in.responses if url.path.startswith(prefix)]
+                status, content_type, payload = (
+                    stand_in.responses[max(matches, key=len)] if matches else (200, "text/plain", b"")
+                )
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def respond(self, prefix: str, status: int = 200, body: Union[str, dict] = "") -> None:
+        """
+        Sets the response to requests whose path starts with `prefix`. Dictionaries are sent as JSON.
+        """
+        if isinstance(body, dict):
+            self.responses[prefix] = (status, "application/json", json.dumps(body).encode("utf-8"))
+        else:
+            self.responses[prefix] = (status, "text/plain", body.encode("utf-8"))
+
+    def paths(self) -> List[str]:
+        return [request["path"] for request in self.requests]
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in():
+    server = StandIn()
+    yield server
+    server.close()
@@ -0,0 +1,73 @@
+import numpy as np
+
+from salon.alignment import (
+    Alignment,
+    SubAlignment,
+    format_gap_runs,
+    insert_gaps,
+    parse_gap_runs,
+    residues_digest,
+)
+from salon.readers import read_alignments
+
+
+def test_residue_matrix(fasta):
+    (alignment,) = read_alignments(fasta)
+    assert len(alignment) == 3
+    assert alignment.width == 8
+    assert alignment.residues.dtype == np.uint8
+    assert [alignment.sequence(row) for row in alignment.rows()] == ["MK--LA.V", "-KTTLAAV", "MKTT--.."]
+    assert [alignment.ungapped(row) for row in alignment.rows()] == ["MKLAV", "KTTLAAV", "MKTT"]
+    assert alignment.gap_mask()[0].tolist() == [False, False, True, True, False, False, True, False]
+
+
+def test_ragged_rows():
+    alignment = Alignment("ragged")
+    alignment.append("MKTL", name="long")
+    alignment.append("MK", name="short")
+    alignment.close()
+    # shorter rows are padded, and padding counts as gaps
+    assert alignment.lengths.tolist() == [4, 2]
+    assert alignment.sequence(1) == "MK"
+    assert alignment.gap_fraction().tolist() == [0, 0, 0.5, 0.5]
+
+
+def test_rows_of_subalignment():
+    alignment = Alignment("split")
+    first, second = SubAlignment("first"), SubAlignment("second")
+    alignment.append("MK", name="a", subalignments=(first,))
+    alignment.append("MT", name="b", subalignments=(second,))
+    alignment.append("ML", name="c", subalignments=(first,))
+    alignment.close()
+    assert list(alignment.rows()) == [0, 1, 2]
+    assert alignment.rows(first) == [0, 2]
+    assert alignment.residue_positions(0).tolist() == [0, 1]
+
+
+def test_gap_runs(fasta):
+    (alignment,) = read_alignments(fasta)
+    assert alignment.gap_runs(0) == [(2, "-", 2), (4, ".", 1)]
+    assert alignment.gap_runs(1) == [(0, "-", 1)]
+    assert alignment.gap_runs(2) == [(4, "-", 2), (4, ".", 2)]
+    assert format_gap_runs(alignment.gap_runs(2)) == "4-2,4.2"
+
+
+def test_gap_runs_roundtrip(fasta):
+    (alignment,) = read_alignments(fasta)
+    for row in alignment.rows():
+        runs = parse_gap_runs(format_gap_runs(alignment.gap_runs(row)))
+        assert insert_gaps(alignment.ungapped(row), runs) == alignment.sequence(row)
+
+
+def test_gap_runs_without_gaps():
+    alignment = Alignment("ungapped")
+    alignment.append("MKTL", name="seq")
+    alignment.close()
+    assert alignment.gap_runs(0) == []
+    assert parse_gap_runs(format_gap_runs([])) == []
+    assert insert_gaps("MKTL", []) == "MKTL"
+
+
+def test_residues_digest():
+    assert residues_digest("MKTL") == residues_digest("MKTL")
+    assert residues_digest("MKTL") != residues_digest("MKTV")
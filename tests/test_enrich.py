@@ -0,0 +1,76 @@
+from urllib.parse import parse_qs
+
+from click.testing import CliRunner
+
+from salon.cli import entry_point
+from salon.database.uniprot import PDB_IRI, TAXONOMY_IRI, UNIPROT_IRI
+from tests.conftest import EXAMPLES, select
+
+# UniProt record of the PDB entry of the first sequence of BB11001
+PROTEINS = {
+    "head": {"vars": ["protein", "pdb", "name", "mnemonic", "organism", "reviewed", "existence"]},
+    "results": {
+        "bindings": [
+            {
+                "protein": {"type": "uri", "value": f"{UNIPROT_IRI}P09429"},
+                "pdb": {"type": "uri", "value": f"{PDB_IRI}1AAB"},
+                "name": {"type": "literal", "value": "High mobility group protein B1"},
+                "mnemonic": {"type": "literal", "value": "HMGB1_HUMAN"},
+                "organism": {"type": "uri", "value": f"{TAXONOMY_IRI}9606"},
+                "reviewed": {"type": "literal", "value": "true"},
+                "existence": {
+                    "type": "uri",
+                    "value": "http://purl.uniprot.org/core/Evidence_at_Protein_Level_Existence",
+                },
+            }
+        ]
+    },
+}
+
+
+def test_invalid_uri():
+    runner = CliRunner()
+    for command in ("enrich", "header"):
+        result = runner.invoke(entry_point, [command, "-x", "http://example.org/seq> } ; DROP ALL ; #"])
+        assert result.exit_code == 2
+        assert "is not a valid IRI" in result.output
+
+
+def test_invalid_uri_file(tmp_path):
+    path = tmp_path / "uris.txt"
+    path.write_text("http://example.org/seq1\nnot an iri\n")
+    result = CliRunner().invoke(entry_point, ["enrich", "--uri-file", str(path)])
+    assert result.exit_code == 2
+    assert "'not an iri' is not a valid IRI" in result.output
+
+
+def test_enrich(oxigraph, stand_in, local_settings, monkeypatch, tmp_path):
+    monkeypatch.setattr(local_settings, "UNIPROT_ENDPOINT", f"{stand_in.url}/sparql")
+    stand_in.respond("/sparql", body=PROTEINS)
+
+    output = str(tmp_path / "BB11001.nt")
+    runner = CliRunner()
+    result = runner.invoke(entry_point, ["parse", "-i", str(EXAMPLES / "BB11001.xml"), "-o", output])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(entry_point, ["load", "-i", output])
+    assert result.exit_code == 0, result.output
+
+    result = runner.invoke(entry_point, ["enrich", "--unenriched", "--no-cache", "-c", "1"])
+    assert result.exit_code == 0, result.output
+    assert "Requested enrichment of 4 sequence(s)" in result.output
+
+    # a single lookup for the whole batch of sequences
+    (request,) = stand_in.requests
+    query = parse_qs(request["body"])["query"][0]
+    assert f"<{PDB_IRI}1AAB>" in query and f"<{PDB_IRI}2LEF>" in query
+
+    enriched = select("SELECT ?seq ?protein WHERE { ?seq <https://w3id.org/salon#hasAssociationWith> ?protein }")
+    assert len(enriched) == 1
+    assert enriched[0]["protein"]["value"] == "salon:P09429"
+
+    # enriched sequences are skipped afterwards
+    stand_in.respond("/sparql", body={"head": {"vars": []}, "results": {"bindings": []}})
+    result = runner.invoke(entry_point, ["enrich", "--unenriched", "--no-cache"])
+    assert result.exit_code == 0, result.output
+    assert "Requested enrichment of 3 sequence(s)" in result.output
+    assert f"<{PDB_IRI}1AAB>" not in parse_qs(stand_in.requests[-1]["body"])["query"][0]
@@ -0,0 +1,62 @@
+from click.testing import CliRunner
+
+from salon.cli import entry_point
+from salon.command.header import _format_header, _sequence
+from tests.conftest import EXAMPLES, select
+
+SEQ = {
+    "UniqueIdentifier": {"value": "1aab_"},
+    "ProteinName": {"value": "High mobility group protein B1"},
+    "OrganismIdentifier": {"value": "9606"},
+}
+
+PROTEIN = {
+    "reviewed": True,
+    "mnemonic": "HMGB1_HUMAN",
+    "organism_name": "Homo sapiens",
+    "gene": "HMGB1",
+    "existence": "http://purl.uniprot.org/core/Evidence_at_Protein_Level_Existence",
+}
+
+
+def test_format_header():
+    assert _format_header(SEQ, PROTEIN) == (
+        ">sp|1aab_|HMGB1_HUMAN High mobility group protein B1 OS=Homo sapiens OX=9606 GN=HMGB1 PE=1"
+    )
+    # unknown existence levels are left out
+    assert _format_header(SEQ, {**PROTEIN, "existence": "http://purl.uniprot.org/core/Unknown"}).endswith("GN=HMGB1")
+    assert _format_header(SEQ, {**PROTEIN, "gene": None}) is None
+    assert _format_header(SEQ, None) is None
+
+
+def test_sequence():
+    assert _sequence({"Sequence": {"value": "MK--LA"}}) == "MK--LA"
+    assert _sequence({"Residues": {"value": "MKLA"}, "GapRuns": {"value": "2-2"}}) == "MK--LA"
+    assert _sequence({"Residues": {"value": "MKLA"}}) == ""
+    assert _sequence({}) == ""
+
+
+def test_missing_options():
+    result = CliRunner().invoke(entry_point, ["header"])
+    assert result.exit_code == 2
+    assert "Either --uri or --alignment is required" in result.output
+
+
+def test_export(oxigraph, tmp_path):
+    nt, fasta = str(tmp_path / "BB11001.nt"), str(tmp_path / "BB11001.fasta")
+    runner = CliRunner()
+    for dedup in ([], ["--dedup"]):
+        result = runner.invoke(entry_point, ["parse", "-i", str(EXAMPLES / "BB11001.xml"), "-o", nt, *dedup])
+        assert result.exit_code == 0, result.output
+        result = runner.invoke(entry_point, ["load", "-i", nt, "--replace"])
+        assert result.exit_code == 0, result.output
+
+        (alignment,) = select("SELECT ?a WHERE { ?a a <https://w3id.org/salon#Alignment> }")
+        result = runner.invoke(entry_point, ["header", "-a", alignment["a"]["value"], "-o", fasta, "--no-cache"])
+        assert result.exit_code == 0, result.output
+        assert "Exported 4 sequence(s)" in result.output
+
+        with open(fasta) as f:
+            lines = f.read().splitlines()
+        assert [line for line in lines if line.startswith(">")] == [">1aab_", ">1j46_A", ">1k99_A", ">2lef_A"]
+        assert len(lines) > 4 and all(0 < len(line) <= 60 for line in lines[1:])
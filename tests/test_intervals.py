@@ -0,0 +1,52 @@
+import random
+
+from salon.alignment import Alignment, Feature
+from salon.intervals import AlignmentIndex, FeatureIndex, IntervalTree, SegmentMap
+
+
+def test_interval_tree():
+    rng = random.Random(0)
+    intervals = []
+    for i in range(500):
+        start = rng.randint(0, 1000)
+        intervals.append((start, start + rng.randint(0, 50), i))
+    tree = IntervalTree(intervals)
+
+    for _ in range(100):
+        start = rng.randint(0, 1000)
+        stop = start + rng.randint(0, 30)
+        expected = {i for first, last, i in intervals if first <= stop and start <= last}
+        assert set(tree.overlap(start, stop)) == expected
+
+
+def test_empty_interval_tree():
+    assert list(IntervalTree().overlap(0, 10)) == []
+
+
+def _alignment() -> Alignment:
+    alignment = Alignment("A1")
+    # residues 1-3 at columns 2-4, residues 4-5 at columns 7-8
+    alignment.append("-MKT--LA", name="s1", features=[Feature("STRUCT", "HELIX", "2", "4", "0")])
+    alignment.append("MKTLAVVA", name="s2", features=[Feature("STRUCT", "STRAND", "6", "8", "0")])
+    return alignment.close()
+
+
+def test_segment_map():
+    segments = SegmentMap.from_alignment(_alignment(), 0)
+    assert len(segments) == 5
+    assert [segments.to_residue(column) for column in range(1, 9)] == [None, 1, 2, 3, None, None, 4, 5]
+    assert [segments.to_column(residue) for residue in range(1, 7)] == [2, 3, 4, 7, 8, None]
+
+
+def test_feature_index(tmp_path):
+    features = FeatureIndex()
+    features.add(_alignment())
+    features.save(str(tmp_path / "output.nt.index"))
+
+    index = FeatureIndex.load(str(tmp_path / "output.nt.index"))["A1"]
+    assert [(record.sequence, record.first_column, record.last_column) for record in index.overlap(1, 8)] == [
+        ("s1", 3, 7),
+        ("s2", 6, 8),
+    ]
+    assert [record.fnote for record in index.overlap(1, 5, ftype="STRUCT")] == ["HELIX"]
+    assert index.overlap(1, 5, fnote="STRAND") == []
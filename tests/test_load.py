@@ -0,0 +1,48 @@
+from click.testing import CliRunner
+
+from salon.cli import entry_point
+from tests.conftest import EXAMPLES
+
+
+def _load(local_settings, monkeypatch, stand_in, tmp_path, *args):
+    monkeypatch.setattr(local_settings, "BACKEND", "virtuoso")
+    monkeypatch.setattr(local_settings, "VIRTUOSO_ENDPOINT", f"{stand_in.url}/sparql-auth")
+    output = str(tmp_path / "BB11001.nt")
+
+    runner = CliRunner()
+    result = runner.invoke(entry_point, ["parse", "-i", str(EXAMPLES / "BB11001.xml"), "-o", output])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(entry_point, ["load", "-i", output, "--sparql", *args])
+    assert result.exit_code == 0, result.output
+    return [request["body"] for request in stand_in.requests]
+
+
+def test_virtuoso_loads_into_default_graph(local_settings, monkeypatch, stand_in, tmp_path):
+    # Virtuoso queries read VIRTUOSO_GRAPH only, so alignment graphs would be out of reach
+    updates = _load(local_settings, monkeypatch, stand_in, tmp_path)
+    assert updates
+    assert not any("GRAPH <" in update for update in updates)
+
+
+def test_virtuoso_graph_per_alignment(local_settings, monkeypatch, stand_in, tmp_path):
+    updates = _load(local_settings, monkeypatch, stand_in, tmp_path, "--graph-per-alignment")
+    assert all("GRAPH <https://w3id.org/salon#BB11001>" in update for update in updates)
+
+
+def test_stardog_graph_per_alignment(local_settings, monkeypatch, stand_in, tmp_path):
+    monkeypatch.setattr(local_settings, "BACKEND", "stardog")
+    monkeypatch.setattr(local_settings, "STARDOG_ENDPOINT", stand_in.url)
+    output = str(tmp_path / "BB11001.nt")
+    runner = CliRunner()
+    result = runner.invoke(entry_point, ["parse", "-i", str(EXAMPLES / "BB11001.xml"), "-o", output])
+    assert result.exit_code == 0, result.output
+
+    # only databases querying the union of every named graph get one graph per alignment by default
+    for options, graph in (({"query.all.graphs": "true"}, True), ({"query.all.graphs": "false"}, False)):
+        stand_in.requests.clear()
+        stand_in.respond("/admin/databases/SALON/options", body=options)
+        result = runner.invoke(entry_point, ["load", "-i", output, "--sparql"])
+        assert result.exit_code == 0, result.output
+        updates = [request["body"] for request in stand_in.requests if request["path"] == "/SALON/update"]
+        assert updates
+        assert all(("GRAPH <https://w3id.org/salon#BB11001>" in update) is graph for update in updates)
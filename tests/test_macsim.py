@@ -0,0 +1,24 @@
+from salon.readers import get_streaming_reader, read_alignments
+from tests.conftest import EXAMPLES
+
+
+def test_read_macsim():
+    alignments = list(read_alignments(str(EXAMPLES / "BB11001.xml")))
+    assert [alignment.name for alignment in alignments] == ["BB11001"]
+    assert len(alignments[0]) == 4
+
+
+def test_stream_macsim():
+    path = str(EXAMPLES / "BB11001.xml")
+    stream = get_streaming_reader(path)
+    assert stream is not None
+    assert get_streaming_reader("input.fasta") is None
+
+    (alignment,) = read_alignments(path)
+    *parts, whole = stream(path)
+    assert [len(part) for part in parts] == [1] * len(alignment)
+    assert [part.sequence(0) for part in parts] == [alignment.sequence(row) for row in alignment.rows()]
+    assert len(whole) == 0
+    assert [subalignment.name for subalignment in whole.subalignments] == [
+        subalignment.name for subalignment in alignment.subalignments
+    ]
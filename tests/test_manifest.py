@@ -0,0 +1,100 @@
+from salon.command.load import iter_deltas, load_incremental
+from salon.manifest import Manifest, combine, statement_hash
+
+ALIGNMENT = "<https://w3id.org/salon#A1>"
+TYPE = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>"
+
+
+def _write(path, *lines):
+    path.write_text("".join(f"{line} .\n" for line in lines))
+
+
+class _Recorder:
+    """
+    Repository stand-in that records updates.
+    """
+
+    def __init__(self):
+        self.updates = []
+
+    def update(self, query: str) -> None:
+        self.updates.append(query)
+
+
+def test_combine_is_order_independent():
+    hashes = [statement_hash(statement) for statement in ("a", "b", "c")]
+    assert combine(hashes) == combine(reversed(hashes))
+
+
+def test_iter_deltas(tmp_path):
+    source = tmp_path / "data.nt"
+    _write(
+        source,
+        f"{ALIGNMENT} {TYPE} <https://w3id.org/salon#Alignment>",
+        '<https://w3id.org/salon#A1_s1> <https://w3id.org/salon#identifier> "s1"',
+        '<https://w3id.org/salon#A1_s2> <https://w3id.org/salon#identifier> "s2"',
+    )
+
+    with Manifest(str(tmp_path / "manifest.sqlite"), "test") as manifest:
+        summary = load_incremental(_Recorder(), str(source), manifest)
+        assert summary == {"graphs": 1, "units": 3, "added": 3, "removed": 0}
+
+        # unchanged file: no deltas
+        assert list(iter_deltas(str(source), manifest)) == []
+
+        _write(
+            source,
+            f"{ALIGNMENT} {TYPE} <https://w3id.org/salon#Alignment>",
+            '<https://w3id.org/salon#A1_s1> <https://w3id.org/salon#identifier> "s1 (renamed)"',
+        )
+        deltas = {unit: (additions, removals) for unit, _, additions, removals in iter_deltas(str(source), manifest)}
+        assert deltas == {
+            (ALIGNMENT, "<https://w3id.org/salon#A1_s1>"): (
+                {'<https://w3id.org/salon#A1_s1> <https://w3id.org/salon#identifier> "s1 (renamed)"'},
+                {'<https://w3id.org/salon#A1_s1> <https://w3id.org/salon#identifier> "s1"'},
+            ),
+            (ALIGNMENT, "<https://w3id.org/salon#A1_s2>"): (
+                set(),
+                {'<https://w3id.org/salon#A1_s2> <https://w3id.org/salon#identifier> "s2"'},
+            ),
+        }
+
+        repository = _Recorder()
+        summary = load_incremental(repository, str(source), manifest)
+        assert summary == {"graphs": 1, "units": 2, "added": 1, "removed": 2}
+        assert len(repository.updates) == 1
+        assert repository.updates[0].startswith("DELETE DATA")
+        assert list(iter_deltas(str(source), manifest)) == []
+
+
+def test_duplicated_statements(tmp_path):
+    source = tmp_path / "data.nt"
+    statement = '<https://w3id.org/salon#A1_s1> <https://w3id.org/salon#identifier> "s1"'
+    _write(source, f"{ALIGNMENT} {TYPE} <https://w3id.org/salon#Alignment>", statement, statement)
+
+    with Manifest(str(tmp_path / "manifest.sqlite"), "test") as manifest:
+        summary = load_incremental(_Recorder(), str(source), manifest)
+        assert summary["added"] == 2
+        assert list(iter_deltas(str(source), manifest)) == []
+        assert load_incremental(_Recorder(), str(source), manifest)["units"] == 0
+
+
+def test_shared_residues_are_kept(tmp_path):
+    residues = '<https://w3id.org/salon#residues-0123> <https://w3id.org/salon#residues> "MKTL"'
+    sequence = (
+        "<https://w3id.org/salon#A1_s1> <https://w3id.org/salon#hasResidues> <https://w3id.org/salon#residues-0123>"
+    )
+    source = tmp_path / "data.nt"
+    _write(source, f"{ALIGNMENT} {TYPE} <https://w3id.org/salon#Alignment>", sequence, residues)
+
+    with Manifest(str(tmp_path / "manifest.sqlite"), "test") as manifest:
+        load_incremental(_Recorder(), str(source), manifest)
+
+        # residues may still be referenced by alignments of other files
+        _write(source, f"{ALIGNMENT} {TYPE} <https://w3id.org/salon#Alignment>")
+        repository = _Recorder()
+        summary = load_incremental(repository, str(source), manifest)
+        assert summary["removed"] == 1
+        assert sequence in repository.updates[0]
+        assert residues not in repository.updates[0]
+        assert list(iter_deltas(str(source), manifest)) == []
@@ -0,0 +1,28 @@
+from click.testing import CliRunner
+
+from salon.cli import entry_point
+from tests.conftest import EXAMPLES, select
+
+
+def _count(query: str) -> int:
+    return int(select(query)[0]["n"]["value"])
+
+
+def test_parse_and_load(oxigraph, tmp_path):
+    output = str(tmp_path / "BB11001.nt")
+    runner = CliRunner()
+
+    result = runner.invoke(entry_point, ["parse", "-i", str(EXAMPLES / "BB11001.xml"), "-o", output])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(entry_point, ["load", "-i", output])
+    assert result.exit_code == 0, result.output
+
+    assert _count("SELECT (COUNT(?g) AS ?n) WHERE { GRAPH ?g { ?a a <https://w3id.org/salon#Alignment> } }") == 1
+    sequences = _count("SELECT (COUNT(?s) AS ?n) WHERE { ?s a <https://w3id.org/salon#ProteinAlignmentSequence> }")
+    assert sequences == 4
+
+    # replacing the alignment does not duplicate its triples
+    before = len(select("SELECT * WHERE { GRAPH ?g { ?s ?p ?o } }"))
+    result = runner.invoke(entry_point, ["load", "-i", output, "--replace"])
+    assert result.exit_code == 0, result.output
+    assert len(select("SELECT * WHERE { GRAPH ?g { ?s ?p ?o } }")) == before
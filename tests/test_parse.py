@@ -0,0 +1,88 @@
+import itertools
+import shutil
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from salon.cli import entry_point
+from salon.command.parse import (
+    alignment_triples,
+    check_alignment_names,
+    convert,
+    iter_triples,
+    output_files,
+    parse_batch,
+)
+from salon.config import settings
+from salon.readers import read_alignments
+from tests.conftest import EXAMPLES
+
+
+def test_streamed_triples():
+    path = str(EXAMPLES / "BB11001.xml")
+    expected = set(itertools.chain.from_iterable(map(alignment_triples, read_alignments(path))))
+    streamed = list(iter_triples(path))
+    assert len(streamed) == len(expected)
+    assert set(streamed) == expected
+
+
+def test_convert(tmp_path):
+    path = str(EXAMPLES / "BB11001.xml")
+    streamed = convert(path, str(tmp_path / "streamed.nq"))
+    # --index needs whole alignments
+    whole = convert(path, str(tmp_path / "whole.nq"), index=True)
+    assert streamed == whole
+    assert sorted((tmp_path / "streamed.nq").read_text().splitlines()) == sorted(
+        (tmp_path / "whole.nq").read_text().splitlines()
+    )
+
+
+def test_batch_name_collisions(tmp_path, fasta):
+    inputs = tmp_path / "inputs"
+    (inputs / "nested").mkdir(parents=True)
+    for path in (inputs / "small.fasta", inputs / "nested" / "small.fasta", inputs / "other.fa", inputs / "Other.aln"):
+        shutil.copy(fasta, path)
+    paths = [str(inputs / "small.fasta"), str(inputs / "nested" / "small.fasta")]
+
+    with pytest.raises(ValueError, match="would both be parsed as alignment small"):
+        check_alignment_names(paths)
+    # different alignments, but the same output file on case-insensitive file systems
+    check_alignment_names([str(inputs / "other.fa"), str(inputs / "Other.aln")])
+    with pytest.raises(ValueError, match="would both be written to"):
+        output_files([str(inputs / "other.fa"), str(inputs / "Other.aln")], str(tmp_path / "output"))
+    assert output_files([str(inputs / "small.fasta"), str(inputs / "other.fa")], "output") == {
+        str(inputs / "small.fasta"): str(Path("output", "small.nt")),
+        str(inputs / "other.fa"): str(Path("output", "other.nt")),
+    }
+
+    # per-file and merged outputs alike, as both alignments would share their URIs
+    runner = CliRunner()
+    for output in (tmp_path / "out", tmp_path / "merged.nq"):
+        result = runner.invoke(entry_point, ["parse", "-i", str(inputs / "**" / "*.fasta"), "-o", str(output)])
+        assert result.exit_code == 2
+        assert "would both be parsed as alignment small" in result.output
+        assert not output.exists()
+        with pytest.raises(ValueError):
+            parse_batch(paths, str(output))
+
+
+def test_batch_merged(tmp_path, fasta):
+    inputs = tmp_path / "inputs"
+    (inputs / "nested").mkdir(parents=True)
+    shutil.copy(fasta, inputs / "small.fasta")
+    shutil.copy(fasta, inputs / "nested" / "other.fasta")
+
+    merged = tmp_path / "merged.nq"
+    result = CliRunner().invoke(entry_point, ["parse", "-i", str(inputs / "**" / "*.fasta"), "-o", str(merged)])
+    assert result.exit_code == 0, result.output
+    assert "Parsed 2 of 2 files" in result.output
+
+    # every alignment in its own named graph
+    graphs = {}
+    for line in merged.read_text().splitlines():
+        graphs.setdefault(line.rsplit(" ", 2)[-2], set()).add(line.split(" ", 1)[0])
+    assert set(graphs) == {f"<{settings.ONTOLOGY_IRI}small>", f"<{settings.ONTOLOGY_IRI}other>"}
+    assert f"<{settings.ONTOLOGY_IRI}small_seq1>" in graphs[f"<{settings.ONTOLOGY_IRI}small>"]
+    assert f"<{settings.ONTOLOGY_IRI}other_seq1>" in graphs[f"<{settings.ONTOLOGY_IRI}other>"]
+    assert not graphs[f"<{settings.ONTOLOGY_IRI}small>"] & graphs[f"<{settings.ONTOLOGY_IRI}other>"]
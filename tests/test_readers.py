@@ -0,0 +1,69 @@
+import gzip
+
+import pytest
+
+from salon.readers import (
+    READERS,
+    alignment_name,
+    get_reader,
+    is_supported,
+    read_alignments,
+    register_reader,
+)
+from salon.readers.fasta import read_fasta
+from salon.readers.stockholm import read_stockholm
+
+
+def test_get_reader():
+    assert get_reader("input.fasta.gz") is read_fasta
+    assert is_supported("input.sto.xz")
+    assert not is_supported("input.txt")
+    with pytest.raises(ValueError):
+        get_reader("input.txt")
+
+
+def test_alignment_name():
+    assert alignment_name("path/to/BB11001.xml") == "BB11001"
+    assert alignment_name("PF00001.sto.gz") == "PF00001"
+    assert alignment_name("notes.txt") == "notes.txt"
+
+
+def test_register_reader(monkeypatch):
+    monkeypatch.setitem(READERS, "custom", READERS["fasta"])
+    register_reader(".CUSTOM", "salon.readers.fasta:read_fasta")
+    assert get_reader("input.custom") is read_fasta
+
+
+def test_read_fasta(fasta):
+    (alignment,) = read_alignments(fasta)
+    assert alignment.name == "small"
+    assert [sequence.name for sequence in alignment.sequences] == ["seq1", "seq2", "seq3"]
+    assert alignment.width == 8
+    assert alignment.sequence(0) == "MK--LA.V"
+    assert alignment.ungapped(1) == "KTTLAAV"
+
+
+def test_read_compressed(fasta, tmp_path):
+    compressed = tmp_path / "small.fa.gz"
+    with open(fasta, "rb") as f:
+        compressed.write_bytes(gzip.compress(f.read()))
+    (alignment,) = read_alignments(str(compressed))
+    assert alignment.name == "small"
+    assert len(alignment) == 3
+
+
+def test_read_stockholm(tmp_path):
+    path = tmp_path / "PF00001.sto"
+    path.write_text(
+        "# STOCKHOLM 1.0\n#=GF ID first\n#=GS seq1/1-4 AC P12345.1\nseq1/1-4 MK-L\nseq2/2-5 MKT.\n//\n"
+        "# STOCKHOLM 1.0\nseq1 MK\nseq1 TL\n//\n"
+    )
+    first, second = read_stockholm(str(path))
+    assert first.name == "first"
+    assert [sequence.accession for sequence in first.sequences] == ["P12345.1", "seq2"]
+    assert second.name == "PF00001_2"
+
+    # sequence lines without residues
+    path.write_text("# STOCKHOLM 1.0\nseq1 MK-L\nseq2   \n//\n")
+    with pytest.raises(ValueError, match=r"seq2 has no residues \(.*PF00001.sto, line 3\)"):
+        list(read_stockholm(str(path)))
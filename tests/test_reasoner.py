@@ -0,0 +1,51 @@
+from rdflib import RDF, RDFS, Graph, Literal, Namespace, Variable
+
+from salon.reasoner import SWRLB, Reasoner, Rule, TripleIndex
+from salon.schema import load_reasoner
+from tests.conftest import ONTOLOGY
+
+E = Namespace("http://example.org/")
+x, y, z = Variable("x"), Variable("y"), Variable("z")
+
+
+def test_triple_index():
+    parent = TripleIndex()
+    parent.add((E.a, E.p, E.b))
+    index = TripleIndex(parent=parent)
+    assert not index.add((E.a, E.p, E.b))
+    assert index.add((E.a, E.p, E.c))
+    assert index.count(E.a, E.p, None) == 2
+    assert set(index.match(None, E.p, E.c)) == {(E.a, E.p, E.c)}
+
+
+def test_transitive_rule():
+    reasoner = Reasoner([Rule("transitive", [(x, E.p, y), (y, E.p, z)], [(x, E.p, z)])])
+    inferred = reasoner.infer([(E.a, E.p, E.b), (E.b, E.p, E.c), (E.c, E.p, E.d)])
+    assert inferred == {(E.a, E.p, E.c), (E.b, E.p, E.d), (E.a, E.p, E.d)}
+
+
+def test_builtin():
+    rule = Rule("high", [(x, E.score, y)], [(x, RDF.type, E.High)], [(SWRLB.greaterThan, (y, Literal(0.5)))])
+    inferred = Reasoner([rule]).infer([(E.a, E.score, Literal(0.9)), (E.b, E.score, Literal(0.1))])
+    assert inferred == {(E.a, RDF.type, E.High)}
+
+
+def test_ontology_axioms():
+    ontology = Graph()
+    ontology.add((E.Helix, RDFS.subClassOf, E.Structure))
+    ontology.add((E.Structure, RDFS.subClassOf, E.Feature))
+    reasoner = Reasoner.from_ontology(ontology)
+    assert reasoner.infer([(E.f, RDF.type, E.Helix)]) == {(E.f, RDF.type, E.Structure), (E.f, RDF.type, E.Feature)}
+
+
+def test_load_reasoner():
+    reasoner = load_reasoner(str(ONTOLOGY))
+    assert reasoner.rules
+    assert load_reasoner(str(ONTOLOGY)) is reasoner
+
+
+def test_constant_terms():
+    rule = Rule("constant", [(x, E.p, E.a)], [(x, E.q, E.b)])
+    reasoner = Reasoner([rule])
+    assert reasoner.infer([(E.s, E.p, E.other)]) == set()
+    assert reasoner.infer([(E.s, E.p, E.a)]) == {(E.s, E.q, E.b)}
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from salon.database.results import iter_tsv_bindings
+from salon.database.virtuoso import Virtuoso
+
+TSV = '?seq\t?ac\n<http://example.org/seq1>\t"1aab"\n<http://example.org/seq2>\t\n\n\n'
+
+
+def test_tsv_bindings():
+    assert list(iter_tsv_bindings(TSV.splitlines())) == [
+        {"seq": {"type": "uri", "value": "http://example.org/seq1"}, "ac": {"type": "literal", "value": "1aab"}},
+        {"seq": {"type": "uri", "value": "http://example.org/seq2"}},
+    ]
+    assert list(iter_tsv_bindings([])) == []
+    assert list(iter_tsv_bindings(["", "?s\t?p", "\t", ""])) == [{}]
+    # unbound rows of single variables are kept, trailing blank lines are not
+    assert list(iter_tsv_bindings(["?s", "<a>", "", "<b>", "", ""])) == [
+        {"s": {"type": "uri", "value": "a"}},
+        {},
+        {"s": {"type": "uri", "value": "b"}},
+    ]
+
+
+async def _collect(repository: Virtuoso, query: str, page_size: int) -> list:
+    async with repository:
+        return [bindings async for bindings in repository.aquery_iter(query, page_size=page_size)]
+
+
+@pytest.mark.parametrize("page_size", [None, 5])
+def test_streamed_queries(stand_in, page_size):
+    stand_in.respond("/sparql", body=TSV)
+    query = "SELECT ?seq ?ac WHERE { ?seq ?p ?ac } ORDER BY ?seq"
+    with Virtuoso(f"{stand_in.url}/sparql", "https://w3id.org/salon") as repository:
+        streamed = list(repository.query_iter(query, page_size=page_size))
+        assert asyncio.run(_collect(repository, query, page_size)) == streamed
+    assert streamed == list(iter_tsv_bindings(TSV.splitlines()))
+    # trailing blank lines are not taken as rows, which would otherwise fill up pages
+    assert len(stand_in.requests) == 2
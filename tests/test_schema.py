@@ -0,0 +1,26 @@
+import pickle
+
+from salon import schema
+from tests.conftest import ONTOLOGY
+
+
+def test_snapshot_roundtrip():
+    snapshot, path = schema.compile_ontology(str(ONTOLOGY))
+    assert path == schema.snapshot_path(str(ONTOLOGY), snapshot.digest)
+    assert schema.SNAPSHOT_FORMAT in path.name
+
+    loaded = schema.load_snapshot(str(ONTOLOGY))
+    assert [rule.name for rule in loaded.rules] == [rule.name for rule in snapshot.rules]
+    assert loaded.facts == snapshot.facts
+
+
+def test_snapshot_of_other_code_is_ignored(monkeypatch):
+    snapshot, path = schema.compile_ontology(str(ONTOLOGY))
+    # same ontology, built by another version of SALON
+    monkeypatch.setattr(schema, "SNAPSHOT_FORMAT", "0" * 16)
+    stale = schema.snapshot_path(str(ONTOLOGY), snapshot.digest)
+    assert stale != path
+    stale.write_bytes(pickle.dumps("stale"))
+    monkeypatch.undo()
+
+    assert isinstance(schema.load_snapshot(str(ONTOLOGY)), schema.OntologySnapshot)
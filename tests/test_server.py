@@ -0,0 +1,96 @@
+import http.client
+import threading
+from socketserver import BaseServer
+
+import pytest
+
+from salon.client import TOKEN_ENV, request, run_remote
+from salon.server import SalonService, is_loopback, make_server, serve
+from tests.conftest import EXAMPLES
+
+
+@pytest.fixture
+def service(local_settings, monkeypatch, tmp_path):
+    monkeypatch.setattr(local_settings, "BACKEND", "oxigraph")
+    (tmp_path / "work").mkdir()
+    service = SalonService(result_cache=True, root=str(tmp_path / "work"))
+    yield service
+    service.close()
+
+
+def _start(service, **kwargs) -> BaseServer:
+    server = make_server(service, **kwargs)
+    threading.Thread(target=serve, args=(server,), daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def server(service, tmp_path):
+    server = _start(service, socket=str(tmp_path / "salon.sock"))
+    yield f"unix://{tmp_path / 'salon.sock'}"
+    server.shutdown()
+
+
+def test_round_trip(server, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path / "work")
+    assert run_remote(server, ["parse", "-i", str(EXAMPLES / "BB11001.xml"), "-o", "BB11001.nt"]) == 0
+    assert (tmp_path / "work" / "BB11001.nt").exists()
+    assert run_remote(server, ["load", "-i", "BB11001.nt"]) == 0
+    assert "Loaded" in capsys.readouterr().out
+
+    assert run_remote(server, ["load", "--no-such-option"]) == 2
+    assert "No such option" in capsys.readouterr().err
+    assert request(server, "GET", "/status")["requests"] == 3
+
+
+def test_working_directory_outside_root(server, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    assert run_remote(server, ["parse", "-i", str(EXAMPLES / "BB11001.xml"), "-o", "BB11001.nt"]) == 2
+    assert "outside of" in capsys.readouterr().err
+    assert not (tmp_path / "BB11001.nt").exists()
+
+
+def test_token(service, monkeypatch):
+    server = _start(service, host="127.0.0.1", port=0, token="secret")
+    address = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with pytest.raises(RuntimeError, match="token"):
+            request(address, "GET", "/status")
+        monkeypatch.setenv(TOKEN_ENV, "secret")
+        assert request(address, "GET", "/status")["requests"] == 0
+    finally:
+        server.shutdown()
+
+
+def test_tcp_requires_token(service):
+    assert is_loopback("127.0.0.1")
+    assert is_loopback("localhost")
+    assert not is_loopback("0.0.0.0")
+    for host in ("127.0.0.1", "0.0.0.0"):
+        with pytest.raises(ValueError, match="token is required"):
+            make_server(service, host=host, port=0)
+
+
+def _post(port: int, headers: dict, body: bytes = b'{"argv": ["--help"]}') -> int:
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    try:
+        connection.request("POST", "/run", body=body, headers={"Authorization": "Bearer secret", **headers})
+        return connection.getresponse().status
+    finally:
+        connection.close()
+
+
+def test_browser_requests(service):
+    server = _start(service, host="127.0.0.1", port=0, token="secret")
+    port = server.server_address[1]
+    json = {"Content-Type": "application/json"}
+    try:
+        assert _post(port, json) == 200
+        # simple cross-origin requests, which web pages can send without preflight
+        assert _post(port, {"Content-Type": "text/plain"}) == 415
+        assert _post(port, {**json, "Origin": "http://example.org"}) == 403
+        # DNS rebinding, i.e., a site whose name resolves to a loopback address
+        assert _post(port, {**json, "Host": f"example.org:{port}"}) == 403
+        assert _post(port, {**json, "Host": f"localhost:{port}"}) == 200
+    finally:
+        server.shutdown()
@@ -0,0 +1,101 @@
+import gzip
+
+import pytest
+from rdflib import RDF, RDFS, XSD, BNode, Graph, Literal, URIRef
+
+from salon.sink import (
+    GraphSink,
+    NTriplesSink,
+    TurtleSink,
+    nt_term,
+    open_sink,
+    open_text,
+    split_suffix,
+)
+
+S, P = URIRef("https://w3id.org/salon#s"), URIRef("https://w3id.org/salon#p")
+G = URIRef("https://w3id.org/salon#g")
+
+
+def test_nt_term():
+    assert nt_term(S) == "<https://w3id.org/salon#s>"
+    assert nt_term(BNode("b0")) == "_:b0"
+    assert nt_term(Literal('say "hi"\n\\')) == r'"say \"hi\"\n\\"'
+    assert nt_term(Literal("hola", lang="es")) == '"hola"@es'
+    assert nt_term(Literal(3)) == f'"3"^^<{XSD.integer}>'
+
+
+def test_split_suffix():
+    assert split_suffix("output.nt.gz") == ("nt", ".gz")
+    assert split_suffix("output.NQ") == ("nq", None)
+    assert split_suffix("output") == ("", None)
+
+
+def test_ntriples_sink(tmp_path):
+    destination = str(tmp_path / "output.nt")
+    with NTriplesSink(destination) as sink:
+        assert sink.addN([(S, P, Literal("a")), (S, P, Literal("b"))]) == 2
+        # ignored without named graphs support
+        sink.set_graph(G)
+        sink.add((S, P, Literal("c")))
+
+    with open(destination) as f:
+        assert f.read().splitlines() == [f'{nt_term(S)} {nt_term(P)} "{value}" .' for value in "abc"]
+
+
+def test_nquads_sink(tmp_path):
+    destination = str(tmp_path / "output.nq.gz")
+    with open_sink(destination) as sink:
+        sink.add((S, P, Literal("a")))
+        sink.set_graph(G)
+        sink.add((S, P, Literal("b")))
+
+    with gzip.open(destination, "rt") as f:
+        assert f.read().splitlines() == [
+            f'{nt_term(S)} {nt_term(P)} "a" .',
+            f'{nt_term(S)} {nt_term(P)} "b" {nt_term(G)} .',
+        ]
+    with open_text(destination) as f:
+        assert len(f.readlines()) == 2
+
+
+def test_graph_sink(tmp_path):
+    destination = str(tmp_path / "output.xml")
+    sink = open_sink(destination)
+    assert isinstance(sink, GraphSink)
+    with sink:
+        sink.add((S, P, Literal("a")))
+    assert (S, P, Literal("a")) in sink.graph
+
+
+def test_turtle_sink(tmp_path):
+    destination = str(tmp_path / "output.ttl")
+    triples = [
+        (S, RDF.type, URIRef("https://w3id.org/salon#Alignment")),
+        (S, P, Literal(3)),
+        (S, P, Literal('say "hi"', lang="en")),
+        (URIRef("https://w3id.org/salon#-x"), P, BNode("b0")),
+        (S, RDFS.label, Literal("again")),
+    ]
+    sink = open_sink(destination)
+    assert isinstance(sink, TurtleSink)
+    with sink:
+        assert sink.addN(triples) == 5
+
+    with open(destination) as f:
+        assert f.read().splitlines()[-6:] == [
+            "",
+            "salon:s a salon:Alignment ;",
+            '    salon:p "3"^^xsd:integer ;',
+            '    salon:p "say \\"hi\\""@en .',
+            "<https://w3id.org/salon#-x> salon:p _:b0 .",
+            'salon:s rdfs:label "again" .',
+        ]
+    graph = Graph().parse(destination, format="turtle")
+    assert len(graph) == 5
+    assert (S, P, Literal(3)) in graph
+
+
+def test_compressed_output_requires_line_based_syntax(tmp_path):
+    with pytest.raises(ValueError):
+        open_sink(str(tmp_path / "output.ttl.gz"))
@@ -0,0 +1,91 @@
+import httpx
+import pytest
+
+from salon.database.stardog import Stardog
+
+TRIPLES = [
+    "<http://example.org/s> <http://example.org/p> <http://example.org/o>",
+    '<http://example.org/s> <http://example.org/p> "literal"',
+]
+
+
+@pytest.fixture
+def stardog(stand_in):
+    stand_in.respond("/SALON/transaction/begin", 200, "tx1")
+    with Stardog(stand_in.url, "SALON") as repository:
+        yield repository
+
+
+def test_bulk_add(stand_in, stardog):
+    stardog.bulk_add(TRIPLES, graph="https://w3id.org/salon#A1", replace=True)
+
+    assert stand_in.paths() == [
+        "/SALON/transaction/begin",
+        "/SALON/tx1/clear",
+        "/SALON/tx1/add",
+        "/SALON/transaction/commit/tx1",
+    ]
+    add = stand_in.requests[2]
+    assert add["params"] == {"graph-uri": ["https://w3id.org/salon#A1"]}
+    assert add["headers"]["Content-Type"] == "application/n-triples"
+    assert add["body"] == "".join(f"{triple} .\n" for triple in TRIPLES)
+
+
+def test_bulk_add_rolls_back_failed_adds(stand_in, stardog):
+    stand_in.respond("/SALON/tx1/add", 400, "Invalid RDF")
+    with pytest.raises(httpx.HTTPStatusError):
+        stardog.bulk_add(TRIPLES)
+    assert stand_in.paths() == ["/SALON/transaction/begin", "/SALON/tx1/add", "/SALON/transaction/rollback/tx1"]
+
+
+def test_bulk_add_rolls_back_failed_commits(stand_in, stardog):
+    stand_in.respond("/SALON/transaction/commit", 500, "Commit failed")
+    with pytest.raises(httpx.HTTPStatusError):
+        stardog.bulk_add(TRIPLES)
+    assert stand_in.paths()[-1] == "/SALON/transaction/rollback/tx1"
+
+
+def test_bulk_add_file(stand_in, stardog, tmp_path):
+    path = tmp_path / "data.nt"
+    path.write_text("".join(f"{triple} .\n" for triple in TRIPLES))
+    stardog.bulk_add(str(path))
+    add = stand_in.requests[1]
+    assert add["params"] == {}
+    assert add["body"] == path.read_text()
+
+
+@pytest.mark.parametrize(
+    "status, options, expected",
+    [(200, {"query.all.graphs": True}, True), (200, {"query.all.graphs": False}, False), (403, {}, False)],
+)
+def test_union_default_graph(stand_in, stardog, status, options, expected):
+    stand_in.respond("/admin/databases/SALON/options", status, options)
+    assert stardog.union_default_graph is expected
+    # options are read once
+    assert stardog.union_default_graph is expected
+    assert stand_in.paths() == ["/admin/databases/SALON/options"]
+
+
+def test_bulk_add_graphs(stand_in, stardog):
+    graphs = {"https://w3id.org/salon#A1": TRIPLES[:1], "https://w3id.org/salon#A2": TRIPLES[1:]}
+    stardog.bulk_add_graphs(graphs, replaced=["https://w3id.org/salon#A2"])
+    # every graph within the same transaction
+    assert stand_in.paths() == [
+        "/SALON/transaction/begin",
+        "/SALON/tx1/clear",
+        "/SALON/tx1/add",
+        "/SALON/tx1/add",
+        "/SALON/transaction/commit/tx1",
+    ]
+    assert [request["params"]["graph-uri"] for request in stand_in.requests[1:4]] == [
+        ["https://w3id.org/salon#A2"],
+        ["https://w3id.org/salon#A1"],
+        ["https://w3id.org/salon#A2"],
+    ]
+
+
+def test_bulk_add_graphs_rolls_back_every_graph(stand_in, stardog):
+    stand_in.respond("/SALON/tx1/add", 400, "Invalid RDF")
+    with pytest.raises(httpx.HTTPStatusError):
+        stardog.bulk_add_graphs({"https://w3id.org/salon#A1": TRIPLES, "https://w3id.org/salon#A2": TRIPLES})
+    assert stand_in.paths() == ["/SALON/transaction/begin", "/SALON/tx1/add", "/SALON/transaction/rollback/tx1"]
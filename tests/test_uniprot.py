@@ -0,0 +1,27 @@
+import asyncio
+from urllib.parse import parse_qs
+
+from salon.database.uniprot import PDB_IRI, UniProt
+
+EMPTY = {"head": {"vars": []}, "results": {"bindings": []}}
+
+
+async def _proteins_by_pdb(endpoint: str, pdb_ids):
+    async with UniProt(endpoint) as uniprot:
+        return await uniprot.proteins_by_pdb(pdb_ids)
+
+
+def test_invalid_identifiers_are_not_queried(stand_in):
+    stand_in.respond("/sparql", body=EMPTY)
+    records = asyncio.run(_proteins_by_pdb(f"{stand_in.url}/sparql", ["1a00", "1a00> } ; #"]))
+    assert records == {"1A00": [], "1A00> } ; #": []}
+
+    (request,) = stand_in.requests
+    query = parse_qs(request["body"])["query"][0]
+    assert f"VALUES ?pdb {{ <{PDB_IRI}1A00> }}" in query
+
+
+def test_only_invalid_identifiers(stand_in):
+    records = asyncio.run(_proteins_by_pdb(f"{stand_in.url}/sparql", ["bad id"]))
+    assert records == {"BAD ID": []}
+    assert stand_in.requests == []
@@ -0,0 +1,67 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from salon.database.cache import ResultCache
+from salon.database.virtuoso import Virtuoso
+
+QUERY = "SELECT * WHERE { ?s ?p ?o }"
+
+
+@pytest.fixture
+def virtuoso(stand_in):
+    with Virtuoso(f"{stand_in.url}/sparql-auth", "https://w3id.org/salon") as repository:
+        yield repository
+
+
+def test_update(stand_in, virtuoso):
+    virtuoso.update("INSERT DATA { <http://example.org/s> <http://example.org/p> 1 }")
+    (request,) = stand_in.requests
+    assert request["headers"]["Content-Type"] == "application/sparql-update"
+    assert request["body"].startswith("INSERT DATA")
+    # headers of later requests are left as they were
+    assert "Content-Type" not in virtuoso.headers
+
+
+def test_failed_update_raises(stand_in, virtuoso):
+    stand_in.respond("/sparql-auth", 500, "Virtuoso 37000 Error SP030: SPARQL compiler")
+    with pytest.raises(httpx.HTTPStatusError):
+        virtuoso.update("INSERT DATA { broken }")
+
+
+async def _aupdate(repository: Virtuoso, query: str) -> None:
+    async with repository:
+        await repository.aupdate(query)
+
+
+def test_failed_async_update_raises(stand_in, virtuoso):
+    stand_in.respond("/sparql-auth", 500, "Virtuoso 37000 Error SP030: SPARQL compiler")
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(_aupdate(virtuoso, "INSERT DATA { broken }"))
+
+
+def test_failed_query_raises(stand_in):
+    cache = ResultCache()
+    with Virtuoso(f"{stand_in.url}/sparql-auth", "https://w3id.org/salon", result_cache=cache) as virtuoso:
+        stand_in.respond("/sparql-auth", 500, "Virtuoso 08C01 Error CL: Cluster: No connection")
+        with pytest.raises(httpx.HTTPStatusError):
+            virtuoso.query(QUERY)
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(virtuoso.aquery(QUERY))
+        # failures are not cached, so results are fetched once the server is back
+        assert len(cache) == 0
+        stand_in.respond("/sparql-auth", body={"head": {"vars": ["s"]}, "results": {"bindings": [{"s": {}}]}})
+        assert len(virtuoso.query(QUERY)["results"]["bindings"]) == 1
+
+
+def test_concurrent_queries(stand_in, virtuoso):
+    stand_in.respond("/sparql-auth", body={"head": {"vars": []}, "results": {"bindings": []}})
+    queries = [f"SELECT * WHERE {{ ?s ?p {i} }}" for i in range(20)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(virtuoso.query, queries))
+
+    # every request carries its own query, and none is left behind for later requests
+    assert sorted(request["params"]["query"][0] for request in stand_in.requests) == sorted(queries)
+    assert "query" not in virtuoso.parameters